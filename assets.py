@@ -0,0 +1,204 @@
+"""
+ZenStatus - Asset Weights
+=========================
+Job-level asset probing for page weight.
+
+Pages report the images, scripts and stylesheets they reference; asset URLs
+are interned across the whole job so the shared logo, CSS and JS bundles are
+sized once, not once per page. Sizes come from a HEAD request's
+Content-Length, falling back to a one-byte ranged GET (Content-Range total),
+run concurrently and kept in a process-wide LRU cache shared between jobs.
+"""
+
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from transport import fetch
+
+
+ASSET_TYPES = ('image', 'script', 'stylesheet')
+# Assets sized per job (the most widely used ones first)
+MAX_PROBED_ASSETS = 5000
+# Sizes remembered across jobs
+MAX_CACHED_SIZES = 20000
+# Heaviest assets listed per page
+HEAVIEST_PER_PAGE = 5
+PROBE_WORKERS = 8
+# Seconds between checks for a cancelled job while probes run
+PROBE_POLL = 1.0
+
+_size_cache = OrderedDict()
+_size_cache_lock = threading.Lock()
+
+
+def _cached_size(url):
+    with _size_cache_lock:
+        if url in _size_cache:
+            _size_cache.move_to_end(url)
+            return True, _size_cache[url]
+    return False, None
+
+
+def _store_size(url, size):
+    with _size_cache_lock:
+        _size_cache[url] = size
+        _size_cache.move_to_end(url)
+        while len(_size_cache) > MAX_CACHED_SIZES:
+            _size_cache.popitem(last=False)
+
+
+def probe_asset_size(url, timeout=5, headers=None):
+    """Size of an asset in bytes without downloading it, or None if the server does not say."""
+    try:
+        resp = fetch('HEAD', url, timeout=timeout, headers=headers)
+        length = resp.headers.get('Content-Length')
+        if resp.status_code < 400 and length and length.isdigit() and int(length) > 0:
+            return int(length)
+    except requests.exceptions.RequestException:
+        pass
+
+    range_headers = dict(headers or {})
+    range_headers['Range'] = 'bytes=0-0'
+    try:
+        with fetch('GET', url, timeout=timeout, headers=range_headers, stream=True) as resp:
+            if resp.status_code == 206:
+                total = resp.headers.get('Content-Range', '').rsplit('/', 1)[-1]
+                if total.isdigit():
+                    return int(total)
+            elif resp.status_code < 400:
+                length = resp.headers.get('Content-Length')
+                if length and length.isdigit():
+                    return int(length)
+    except requests.exceptions.RequestException:
+        pass
+    return None
+
+
+class AssetIndex:
+    """
+    Assets referenced by the pages of one audit job.
+
+    add_page() interns a page's asset URLs; probe() sizes every unique asset
+    once; page_weight() then combines a page's HTML size with its assets.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.urls = []
+        self.types = []
+        self.usage = array('I')
+        self.pages = {}
+        self.sizes = {}
+
+    def add_page(self, url, assets):
+        """Record the (url, type) assets referenced by a page."""
+        page_assets = array('I')
+        seen = set()
+        for asset_url, asset_type in assets or ():
+            asset = self.ids.get(asset_url)
+            if asset is None:
+                asset = self.ids[asset_url] = len(self.urls)
+                self.urls.append(asset_url)
+                self.types.append(asset_type)
+                self.usage.append(0)
+            if asset not in seen:
+                seen.add(asset)
+                self.usage[asset] += 1
+                page_assets.append(asset)
+        self.pages[url] = page_assets
+
+    def probe(self, submit=None, timeout=5, headers=None, cancelled=None):
+        """
+        Size the job's unique assets concurrently (cached sizes are reused).
+        submit(fn, *args) runs the probes (default: a pool of PROBE_WORKERS threads).
+        Yields the number of assets sized so far, so callers can keep a stream
+        alive; stops early once the `cancelled` event is set.
+        """
+        order = sorted(range(len(self.urls)), key=self.usage.__getitem__, reverse=True)[:MAX_PROBED_ASSETS]
+        pending = []
+        for asset in order:
+            found, size = _cached_size(self.urls[asset])
+            if found:
+                self.sizes[asset] = size
+            else:
+                pending.append(asset)
+        done = len(order) - len(pending)
+        yield done
+        if not pending:
+            return
+
+        pool = None
+        if submit is None:
+            pool = ThreadPoolExecutor(max_workers=PROBE_WORKERS)
+            submit = pool.submit
+        try:
+            futures = {
+                submit(probe_asset_size, self.urls[asset], timeout, headers): asset
+                for asset in pending
+            }
+            remaining = set(futures)
+            while remaining and (cancelled is None or not cancelled.is_set()):
+                finished, remaining = wait(remaining, timeout=PROBE_POLL, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    asset = futures[future]
+                    if future.cancelled():
+                        continue
+                    size = future.result()
+                    self.sizes[asset] = size
+                    if size is not None:
+                        _store_size(self.urls[asset], size)
+                    done += 1
+                yield done
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def page_weight(self, url, html_kb=0):
+        """Total weight and heaviest assets of a page after probe()."""
+        page_assets = self.pages.get(url)
+        if page_assets is None:
+            return {}
+        total_bytes = 0
+        unsized = 0
+        sized = []
+        for asset in page_assets:
+            size = self.sizes.get(asset)
+            if size is None:
+                unsized += 1
+                continue
+            total_bytes += size
+            sized.append((size, asset))
+        sized.sort(reverse=True)
+        return {
+            'asset_count': len(page_assets),
+            'unsized_assets': unsized,
+            'asset_weight_kb': round(total_bytes / 1024, 1),
+            'page_weight_kb': round((html_kb or 0) + total_bytes / 1024, 1),
+            'heaviest_assets': [
+                {'url': self.urls[asset], 'type': self.types[asset], 'kb': round(size / 1024, 1)}
+                for size, asset in sized[:HEAVIEST_PER_PAGE]
+            ],
+        }
+
+    def summary(self, limit=20):
+        """Job-wide asset totals and the heaviest shared assets."""
+        sized = [(size, asset) for asset, size in self.sizes.items() if size is not None]
+        sized.sort(reverse=True)
+        by_type = {asset_type: 0 for asset_type in ASSET_TYPES}
+        for size, asset in sized:
+            by_type[self.types[asset]] = by_type.get(self.types[asset], 0) + size
+        return {
+            'unique_assets': len(self.urls),
+            'sized_assets': len(sized),
+            'total_kb': round(sum(size for size, _ in sized) / 1024, 1),
+            'kb_by_type': {asset_type: round(total / 1024, 1) for asset_type, total in by_type.items()},
+            'heaviest': [
+                {'url': self.urls[asset], 'type': self.types[asset], 'kb': round(size / 1024, 1),
+                 'pages': self.usage[asset]}
+                for size, asset in sized[:limit]
+            ],
+        }
@@ -0,0 +1,1450 @@
+"""
+ZenStatus - Audit Engine
+========================
+Fetching and auditing pages, independent of the web app.
+
+Holds the per-site caches (robots.txt, sitemap status), audit_website() and
+sitemap discovery, plus AuditJob, which folds streamed page results into the
+job-level indexes (scores, keywords, duplicates, link graph, assets).
+check_sites.py (Flask routes) and cli.py (headless batch runs) both drive
+jobs through run_audit_job(). BeautifulSoup is imported on first use so
+importing this module stays cheap.
+"""
+
+import gzip
+import json
+import re
+import threading
+import time
+import uuid
+import weakref
+import xml.etree.ElementTree as ET
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from datetime import datetime
+from urllib.parse import urlparse, urljoin
+
+import requests
+
+from assets import AssetIndex
+from crawler import BloomFilter, HostThrottle, normalize_url
+from executor import audit_executor
+from hostcontrol import MAX_HOST_LIMIT, HostCircuitBreaker, HostConcurrency, parse_retry_after, url_host
+from fingerprints import DuplicateIndex
+from keywords import KeywordIndex, count_terms, top_terms
+from linkgraph import LinkGraph
+from robots import ALLOW_ALL, RobotsMatcher
+from resultcache import ResultCache, configured_ttl
+from rules import ResultTable, evaluate_job_rules, evaluate_row, is_fetched
+from sampling import DEFAULT_SAMPLE_SIZE, SitemapSampler
+from scoring import AuditAggregator
+from transport import fetch
+
+
+# Cache for site-level data (robots.txt, sitemap status)
+site_cache = {}
+
+# Spaces out page fetches for hosts that set a robots.txt Crawl-delay
+host_throttle = HostThrottle()
+
+# Fails pages of hosts that stopped responding fast instead of waiting out timeouts
+host_breaker = HostCircuitBreaker()
+
+# Pages fetched from one host at once, adapted to its latency and 429/503 answers
+host_limiter = HostConcurrency()
+
+# Jobs created in this process, so queue units leased here can tell their job was cancelled
+local_jobs = weakref.WeakValueDictionary()
+
+# Recent page results shared by all jobs of this process (in-flight coalescing + short TTL)
+audit_cache = ResultCache(max_entries=500, ttl=configured_ttl())
+status_cache = ResultCache(max_entries=5000, ttl=configured_ttl())
+
+# Detail lists of summary-only audits, by (job ID, URL), fetched on demand
+# for the page detail view; bounded so detail views cannot grow memory
+MAX_KEPT_DETAILS = 200
+DETAIL_TTL = 600
+detail_cache = ResultCache(max_entries=MAX_KEPT_DETAILS, ttl=DETAIL_TTL)
+
+# Pages of one job in flight at most; host_limiter decides how many of them
+# each host actually gets (the shared executor bounds the total)
+JOB_CONCURRENCY = int(MAX_HOST_LIMIT)
+
+# Times a throttled (429/503) page is put back before its response is reported
+MAX_THROTTLE_RETRIES = 3
+THROTTLE_STATUSES = (429, 503)
+THROTTLE_POLL = 0.25
+# Longest wait for running pages before checking for a cancelled job again
+CANCEL_POLL = 1.0
+# URLs a job takes ahead of its running pages, so hosts that are paused or at
+# their limit do not hold up the others
+MAX_BACKLOG = 100
+
+# Entries of the page detail lists (images, render-blocking resources)
+MAX_IMAGE_DETAILS = 100
+MAX_RENDER_BLOCKING_DETAILS = 50
+
+# URLs remembered (in a Bloom filter) to skip repeats while sampling a sitemap tree
+SAMPLE_DEDUP_CAPACITY = 1000000
+
+
+def update_site_cache_sitemap(base_url, sitemap_url, url_count=0):
+    """
+    Update the site cache to indicate that a sitemap was successfully found.
+    This is called after successfully crawling a sitemap to prevent false "No sitemap" warnings.
+    """
+    parsed = urlparse(base_url)
+    domain = f"{parsed.scheme}://{parsed.netloc}"
+    
+    # Get existing cache or create new entry
+    if domain in site_cache:
+        site_cache[domain]['has_sitemap'] = True
+        site_cache[domain]['sitemap_url'] = sitemap_url
+        if url_count > 0:
+            site_cache[domain]['sitemap_url_count'] = url_count
+    else:
+        # Create a new cache entry if it doesn't exist
+        site_cache[domain] = {
+            'has_robots_txt': False,
+            'robots_txt_content': '',
+            'robots_rules': [],
+            'has_sitemap': True,
+            'sitemap_url': sitemap_url,
+            'sitemap_url_count': url_count
+        }
+
+
+def fetch_robots(domain, result, timeout=10, headers=None):
+    """
+    Fetch and compile a domain's robots.txt into the site info dict `result`.
+    The compiled matcher is stored as 'robots_matcher' and its Crawl-delay is
+    registered with the fetch throttle.
+    """
+    result['robots_matcher'] = ALLOW_ALL
+    try:
+        robots_url = f"{domain}/robots.txt"
+        resp = requests.get(robots_url, timeout=timeout, headers=headers)
+        if resp.status_code == 200 and 'text' in resp.headers.get('Content-Type', ''):
+            result['has_robots_txt'] = True
+            result['robots_txt_content'] = resp.text[:2000]  # First 2000 chars
+            
+            # Raw rule lines for display
+            rules = []
+            robots_sitemap = ''
+            for line in resp.text.split('\n'):
+                line = line.strip()
+                if line.startswith('Disallow:') or line.startswith('Allow:'):
+                    rules.append(line)
+                elif line.startswith('Sitemap:'):
+                    sitemap_match = line.split(':', 1)
+                    if len(sitemap_match) > 1:
+                        robots_sitemap = sitemap_match[1].strip()
+            result['robots_rules'] = rules[:20]  # First 20 rules
+            # The last Sitemap: line, unless a sitemap was already found for the site
+            if robots_sitemap and not result.get('sitemap_url'):
+                result['sitemap_url'] = robots_sitemap
+            result['robots_matcher'] = RobotsMatcher.from_text(resp.text)
+    except:
+        pass
+    result['crawl_delay'] = result['robots_matcher'].crawl_delay
+    host_throttle.set_delay(urlparse(domain).netloc.lower(), result['crawl_delay'])
+    return result['robots_matcher']
+
+
+def get_robots_matcher(url, timeout=10):
+    """
+    Compiled robots.txt matcher for a URL's site, fetched once per domain.
+    Sites cached without robots.txt data (see update_site_cache_sitemap) are completed here.
+    """
+    parsed = urlparse(url)
+    domain = f"{parsed.scheme}://{parsed.netloc}"
+    site = site_cache.get(domain)
+    if site is None:
+        return get_site_info(url, timeout=timeout)['robots_matcher']
+    if 'robots_matcher' not in site:
+        if host_breaker.is_open(url):
+            return ALLOW_ALL
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+        fetch_robots(domain, site, timeout=timeout, headers=headers)
+    return site['robots_matcher']
+
+
+def robots_allowed(url):
+    """True if robots.txt allows fetching the URL."""
+    return get_robots_matcher(url).allowed(url)
+
+
+def get_site_info(base_url, timeout=10):
+    """
+    Get site-level information: robots.txt and sitemap.xml status.
+    Results are cached per domain.
+    """
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    
+    parsed = urlparse(base_url)
+    domain = f"{parsed.scheme}://{parsed.netloc}"
+    
+    if domain in site_cache:
+        return site_cache[domain]
+    
+    result = {
+        'has_robots_txt': False,
+        'robots_txt_content': '',
+        'robots_rules': [],
+        'robots_matcher': ALLOW_ALL,
+        'crawl_delay': None,
+        'has_sitemap': False,
+        'sitemap_url': '',
+        'sitemap_url_count': 0
+    }
+    
+    # A host that stopped responding would only add timeouts; report defaults without caching them
+    if host_breaker.is_open(base_url):
+        return result
+    
+    # Check robots.txt
+    fetch_robots(domain, result, timeout=timeout, headers=headers)
+    
+    # Check sitemap.xml
+    try:
+        sitemap_url = result['sitemap_url'] or f"{domain}/sitemap.xml"
+        resp = requests.get(sitemap_url, timeout=timeout, headers=headers)
+        if resp.status_code == 200:
+            result['has_sitemap'] = True
+            result['sitemap_url'] = sitemap_url
+            # Count URLs in sitemap
+            try:
+                root = ET.fromstring(resp.content)
+                url_count = sum(1 for child in root if 'url' in child.tag.lower() or 'sitemap' in child.tag.lower())
+                result['sitemap_url_count'] = url_count
+            except:
+                pass
+    except:
+        pass
+    
+    site_cache[domain] = result
+    return result
+
+
+def check_link_status(url, timeout=5):
+    """Quick check if a link is broken (returns status code)."""
+    try:
+        resp = fetch('HEAD', url, timeout=timeout)
+        return resp.status_code
+    except:
+        try:
+            with fetch('GET', url, timeout=timeout, stream=True) as resp:
+                return resp.status_code
+        except:
+            return 0
+
+
+def get_redirect_chain(url, timeout=10, max_redirects=10):
+    """Track redirect chain for a URL."""
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    
+    chain = []
+    current_url = url
+    
+    for _ in range(max_redirects):
+        try:
+            resp = fetch('HEAD', current_url, timeout=timeout, headers=headers, allow_redirects=False)
+            chain.append({
+                'url': current_url,
+                'status': resp.status_code
+            })
+            
+            if resp.status_code in (301, 302, 303, 307, 308):
+                location = resp.headers.get('Location')
+                if location:
+                    current_url = urljoin(current_url, location)
+                else:
+                    break
+            else:
+                break
+        except:
+            chain.append({'url': current_url, 'status': 0})
+            break
+    
+    return chain
+
+
+def _image_issues(img, total_images):
+    """(missing alt, missing dimensions, not lazy-loaded, issue texts) for one <img>."""
+    missing_alt = not img.get('alt', '').strip()
+    # Width/height attributes help CLS
+    no_dimensions = not (img.get('width', '') or img.get('height', ''))
+    not_lazy = img.get('loading', '').lower() != 'lazy' and not img.get('fetchpriority')
+    issues = []
+    if missing_alt:
+        issues.append('Missing alt text')
+    if no_dimensions:
+        issues.append('Missing dimensions (affects CLS)')
+    if not_lazy and total_images > 3:  # Only flag if there are multiple images
+        issues.append('Not lazy-loaded')
+    return missing_alt, no_dimensions, not_lazy, issues
+
+
+def _render_blocking_resources(head):
+    """Scripts without async/defer and stylesheets for all media in <head>."""
+    resources = []
+    for script in head.find_all('script'):
+        src = script.get('src', '')
+        if src and not script.get('async') and not script.get('defer'):
+            resources.append({'type': 'script', 'src': src, 'reason': 'Missing async/defer attributes'})
+    for link in head.find_all('link', rel='stylesheet'):
+        media = link.get('media', '').lower()
+        if not media or media == 'all' or media == 'screen':
+            resources.append({'type': 'stylesheet', 'src': link.get('href', ''), 'reason': 'Render-blocking CSS'})
+    return resources
+
+
+def page_details(soup, page_url):
+    """
+    The per-page lists shown in the page detail modal: the first
+    MAX_IMAGE_DETAILS images with their issues, and the first
+    MAX_RENDER_BLOCKING_DETAILS render-blocking resources.
+    """
+    images = soup.find_all('img')
+    images_details = []
+    for img in images[:MAX_IMAGE_DETAILS]:
+        src = img.get('src', '')
+        _, _, _, issues = _image_issues(img, len(images))
+        images_details.append({
+            'src': urljoin(page_url, src) if src else '',
+            'alt': img.get('alt', '').strip(),
+            'width': img.get('width', ''),
+            'height': img.get('height', ''),
+            'loading': img.get('loading', '').lower(),
+            'has_issues': bool(issues),
+            'issues': issues
+        })
+    head = soup.find('head')
+    render_blocking = _render_blocking_resources(head) if head else []
+    return {
+        'images_details': images_details,
+        'render_blocking_resources': render_blocking[:MAX_RENDER_BLOCKING_DETAILS]
+    }
+
+
+def fetch_page_details(url, timeout=15):
+    """Fetch a page again for its page_details() (pages audited without details)."""
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+    response = fetch('GET', url, timeout=timeout, headers=headers)
+    from bs4 import BeautifulSoup  # Deferred, as in audit_website()
+    soup = BeautifulSoup(response.text, 'html.parser')
+    return page_details(soup, response.url)
+
+
+def check_website_status(url, timeout=10):
+    """
+    Check the status of a website and verify it's actually working. Checks
+    of the same URL running at once share one request, and answered checks
+    are reused for a short time (see resultcache.py).
+    """
+    result = status_cache.get(
+        (normalize_url(url) or url, timeout),
+        lambda: _check_website_status(url, timeout),
+        cacheable=lambda r: isinstance(r['status_code'], int)
+    )
+    result['url'] = url
+    return result
+
+
+def _check_website_status(url, timeout):
+    try:
+        start_time = datetime.now()
+        response = requests.get(url, timeout=timeout, allow_redirects=True)
+        end_time = datetime.now()
+        response_time = (end_time - start_time).total_seconds()
+        
+        response_text = response.text.lower()
+        if 'error establishing a database connection' in response_text:
+            return {
+                'url': url,
+                'status_code': response.status_code,
+                'status_message': 'DB Connection Error',
+                'response_time': f"{response_time:.2f}s"
+            }
+        
+        if 'fatal error' in response_text or 'database error' in response_text:
+            return {
+                'url': url,
+                'status_code': response.status_code,
+                'status_message': 'Site Error',
+                'response_time': f"{response_time:.2f}s"
+            }
+        
+        return {
+            'url': url,
+            'status_code': response.status_code,
+            'status_message': 'Online' if response.status_code < 400 else 'Error',
+            'response_time': f"{response_time:.2f}s"
+        }
+    except requests.exceptions.Timeout:
+        return {
+            'url': url,
+            'status_code': 'N/A',
+            'status_message': 'Timeout',
+            'response_time': 'N/A'
+        }
+    except requests.exceptions.ConnectionError:
+        return {
+            'url': url,
+            'status_code': 'N/A',
+            'status_message': 'Connection Error',
+            'response_time': 'N/A'
+        }
+    except Exception:
+        return {
+            'url': url,
+            'status_code': 'N/A',
+            'status_message': 'Error',
+            'response_time': 'N/A'
+        }
+
+
+def audit_website(url, timeout=15, max_retries=2, retry_throttled=False, details=True):
+    """
+    Perform a comprehensive SEO audit for a single URL.
+
+    With retry_throttled, a 429/503 answer returns {'url', '_throttled'}
+    (seconds to wait) instead of a result, so the caller can audit the page
+    again later (see audit_pages()). Without details, the per-image and
+    render-blocking resource lists of page_details() are left out (their
+    counts are kept).
+
+    Audits of the same URL running at once (from any job) share one fetch
+    and parse, and pages that loaded are reused for a short time (see
+    resultcache.py); each caller gets its own copy of the result.
+    
+    Covers:
+    - Technical SEO: HTTP status, HTTPS, response time, robots, canonical, viewport, structured data
+    - On-page SEO: Title, meta description, H1-H6 hierarchy, word count
+    - Social/Open Graph: OG title, description, image
+    - Content: Word count, thin content detection
+    - Links: Internal/external link analysis
+    - Images: Alt text check
+    - Accessibility: Language attribute
+    """
+    result = audit_cache.get(
+        (normalize_url(url) or url, timeout, max_retries, retry_throttled, details),
+        lambda: _audit_website(url, timeout, max_retries, retry_throttled, details),
+        cacheable=lambda r: is_fetched(r) and '_throttled' not in r
+    )
+    result['url'] = url
+    return result
+
+
+def _audit_website(url, timeout, max_retries, retry_throttled, details):
+    # Add small delay to avoid overwhelming the server
+    time.sleep(0.1)
+    
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+
+    # Default error response
+    error_result = {
+        'url': url,
+        'status_code': 'N/A',
+        'status_message': 'Error',
+        'response_time': 'N/A',
+        'title': '',
+        'title_length': 0,
+        'meta_description': '',
+        'meta_description_length': 0,
+        'h1_count': 0,
+        'h2_count': 0,
+        'h3_count': 0,
+        'h4_count': 0,
+        'h5_count': 0,
+        'h6_count': 0,
+        'h1_samples': [],
+        'canonical': '',
+        'robots': '',
+        'word_count': 0,
+        'internal_links': 0,
+        'external_links': 0,
+        'broken_links': 0,
+        'broken_link_samples': [],
+        'images_missing_alt': 0,
+        'images_no_dimensions': 0,
+        'images_not_lazy': 0,
+        'total_images': 0,
+        'https': False,
+        'url_length': len(url),
+        'url_has_underscores': '_' in url,
+        'redirect_count': 0,
+        'redirect_chain': [],
+        # Site-level info
+        'has_robots_txt': False,
+        'has_sitemap': False,
+        'sitemap_url_count': 0,
+        # New fields
+        'has_viewport': False,
+        'has_lang': False,
+        'lang': '',
+        'has_og_tags': False,
+        'og_title': '',
+        'og_description': '',
+        'og_image': '',
+        'has_twitter_cards': False,
+        'has_schema': False,
+        'schema_types': [],
+        # Performance / Core Web Vitals proxies
+        'page_size_kb': 0,
+        'ttfb_estimate': 0,
+        'http_version': '',
+        'render_blocking_count': 0,
+        'inline_css_count': 0,
+        'external_scripts': 0,
+        'warnings': []
+    }
+
+    try:
+        if not host_breaker.allow(url):
+            error_result['status_message'] = 'Host Unavailable'
+            error_result['warnings'] = ['Host unavailable (skipped after repeated failures)']
+            return error_result
+
+        # Retry logic for resilience with exponential backoff
+        attempt = 0
+        fetched = failure_recorded = False
+        try:
+            while True:
+                try:
+                    host_throttle.wait(url)
+                    start_time = datetime.now()
+                    response = fetch('GET', url, timeout=timeout, headers=headers)
+                    response_time = (datetime.now() - start_time).total_seconds()
+                    fetched = True
+                    break
+                except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                    attempt += 1
+                    if attempt >= max_retries:
+                        raise
+                    # No more retries once the host's circuit has opened
+                    if host_breaker.record_failure(url):
+                        failure_recorded = True
+                        raise
+                    time.sleep(0.5 * (2 ** attempt))  # Exponential backoff: 1s, 2s, 4s
+        finally:
+            # Settle every outcome, so a half-open probe that fails in any way
+            # (TooManyRedirects, InvalidURL, ...) does not stay taken
+            if fetched:
+                host_breaker.record_success(url)
+            elif not failure_recorded:
+                host_breaker.record_failure(url)
+
+        if response.status_code in THROTTLE_STATUSES:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            host_limiter.record_throttle(url, retry_after)
+            if retry_throttled:
+                return {'url': url, '_throttled': retry_after}
+        else:
+            host_limiter.record_latency(url, response_time)
+
+        from bs4 import BeautifulSoup  # Deferred: only needed once a page is fetched
+        soup = BeautifulSoup(response.text, 'html.parser')
+        parsed_base = urlparse(response.url)
+
+        # Check HTTPS
+        is_https = response.url.startswith('https://')
+
+        # Title analysis
+        title = soup.title.string.strip() if soup.title and soup.title.string else ''
+        
+        # Meta description
+        meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
+        meta_description = meta_desc_tag.get('content', '').strip() if meta_desc_tag else ''
+        
+        # Canonical tag
+        canonical_tag = soup.find('link', rel=lambda rel: rel and 'canonical' in rel.lower())
+        canonical = canonical_tag.get('href') if canonical_tag else ''
+        
+        # Robots meta tag
+        robots_tag = soup.find('meta', attrs={'name': 'robots'})
+        robots = robots_tag.get('content', '').lower().strip() if robots_tag and robots_tag.get('content') else ''
+        
+        # Viewport meta tag (mobile-friendliness)
+        viewport_tag = soup.find('meta', attrs={'name': 'viewport'})
+        has_viewport = viewport_tag is not None
+        
+        # Language attribute
+        html_tag = soup.find('html')
+        lang = html_tag.get('lang', '').strip() if html_tag else ''
+        has_lang = bool(lang)
+        
+        # Open Graph tags
+        og_title_tag = soup.find('meta', attrs={'property': 'og:title'})
+        og_title = og_title_tag.get('content', '').strip() if og_title_tag else ''
+        og_desc_tag = soup.find('meta', attrs={'property': 'og:description'})
+        og_description = og_desc_tag.get('content', '').strip() if og_desc_tag else ''
+        og_image_tag = soup.find('meta', attrs={'property': 'og:image'})
+        og_image = og_image_tag.get('content', '').strip() if og_image_tag else ''
+        has_og_tags = bool(og_title or og_description or og_image)
+        
+        # Twitter Card tags
+        twitter_card_tag = soup.find('meta', attrs={'name': 'twitter:card'})
+        has_twitter_cards = twitter_card_tag is not None
+        
+        # Structured data (Schema.org)
+        schema_scripts = soup.find_all('script', attrs={'type': 'application/ld+json'})
+        schema_types = []
+        has_schema = len(schema_scripts) > 0
+        for script in schema_scripts[:3]:  # Limit to first 3 schemas
+            try:
+                schema_data = json.loads(script.string) if script.string else {}
+                if isinstance(schema_data, dict) and '@type' in schema_data:
+                    schema_types.append(schema_data['@type'])
+                elif isinstance(schema_data, list):
+                    for item in schema_data[:2]:
+                        if isinstance(item, dict) and '@type' in item:
+                            schema_types.append(item['@type'])
+            except:
+                pass
+        
+        # Full heading hierarchy (H1-H6)
+        h1_tags = [h.get_text(strip=True) for h in soup.find_all('h1')]
+        h2_count = len(soup.find_all('h2'))
+        h3_count = len(soup.find_all('h3'))
+        h4_count = len(soup.find_all('h4'))
+        h5_count = len(soup.find_all('h5'))
+        h6_count = len(soup.find_all('h6'))
+        
+        # Page text is extracted once and shared by word count and keyword extraction
+        page_text = soup.get_text(' ')
+
+        # Word count
+        word_count = len(re.findall(r'\w+', page_text))
+        
+        # Keyword extraction
+        # 1. Meta keywords tag
+        meta_keywords_tag = soup.find('meta', attrs={'name': 'keywords'})
+        meta_keywords = meta_keywords_tag.get('content', '').strip() if meta_keywords_tag else ''
+        
+        # 2. Term counts for the job-level keyword index (keywords.py)
+        term_counts = count_terms(page_text.lower())
+        top_keywords_list = top_terms(term_counts, 15)
+        
+        # Page size
+        page_size_kb = len(response.content) / 1024
+
+        # Image analysis (the per-image list for the detail modal comes from page_details())
+        images = soup.find_all('img')
+        total_images = len(images)
+        images_missing_alt = 0
+        images_no_dimensions = 0
+        images_not_lazy = 0
+
+        for img in images:
+            missing_alt, no_dimensions, not_lazy, _ = _image_issues(img, total_images)
+            images_missing_alt += missing_alt
+            images_no_dimensions += no_dimensions
+            images_not_lazy += not_lazy
+        
+        # Core Web Vitals proxies
+        # TTFB estimate (server response time)
+        ttfb_estimate = response_time
+        
+        # Count render-blocking resources
+        head = soup.find('head')
+        render_blocking_count = 0
+        external_scripts = 0
+        inline_css_count = 0
+        
+        if head:
+            external_scripts = sum(1 for script in head.find_all('script') if script.get('src'))
+            render_blocking_count = len(_render_blocking_resources(head))
+            # Count inline styles
+            inline_css_count = len(head.find_all('style'))
+
+        # Images, scripts and stylesheets referenced by the page (sized once per job)
+        page_assets = []
+        for img in images:
+            if img.get('src'):
+                page_assets.append((urljoin(response.url, img['src']), 'image'))
+        for script in soup.find_all('script', src=True):
+            page_assets.append((urljoin(response.url, script['src']), 'script'))
+        for link in soup.find_all('link', rel='stylesheet', href=True):
+            page_assets.append((urljoin(response.url, link['href']), 'stylesheet'))
+        page_assets = [asset for asset in page_assets if asset[0].startswith(('http://', 'https://'))]
+
+        # Link analysis (enhanced with broken link detection)
+        all_links = soup.find_all('a', href=True)
+        internal_links = 0
+        external_links = 0
+        broken_links = 0
+        broken_link_samples = []
+        
+        # Collect every internal link target (used by crawl mode); the first
+        # few are sampled for the broken link check
+        internal_link_urls = []
+        seen_link_urls = set()
+        for a in all_links:
+            href = a.get('href')
+            parsed_href = urlparse(href)
+            if not parsed_href.netloc or parsed_href.netloc == parsed_base.netloc:
+                internal_links += 1
+                # Build full URL for checking
+                if href.startswith('/'):
+                    full_url = f"{parsed_base.scheme}://{parsed_base.netloc}{href}"
+                elif href.startswith('http'):
+                    full_url = href
+                else:
+                    full_url = urljoin(response.url, href)
+                if full_url.startswith(('http://', 'https://')) and full_url not in seen_link_urls:
+                    seen_link_urls.add(full_url)
+                    internal_link_urls.append(full_url)
+            else:
+                external_links += 1
+        
+        # Check sample internal links for broken status (quick check)
+        for link_url in internal_link_urls[:5]:  # Check first 5
+            try:
+                status = check_link_status(link_url, timeout=3)
+                if status >= 400 or status == 0:
+                    broken_links += 1
+                    if len(broken_link_samples) < 3:
+                        broken_link_samples.append(link_url)
+            except:
+                pass
+        
+        # Get redirect chain
+        redirect_chain = get_redirect_chain(url, timeout=5)
+        redirect_count = len(redirect_chain) - 1 if len(redirect_chain) > 1 else 0
+        
+        # Get site-level info (robots.txt, sitemap)
+        site_info = get_site_info(url, timeout=5)
+
+        # URL structure analysis
+        url_length = len(url)
+        url_has_underscores = '_' in urlparse(url).path
+
+        result = {
+            'url': url,
+            'status_code': response.status_code,
+            'status_message': 'OK' if response.status_code < 400 else 'Page Error',
+            'response_time': f"{response_time:.2f}s",
+            'title': title,
+            'title_length': len(title),
+            'meta_description': meta_description,
+            'meta_description_length': len(meta_description),
+            'h1_count': len(h1_tags),
+            'h2_count': h2_count,
+            'h3_count': h3_count,
+            'h4_count': h4_count,
+            'h5_count': h5_count,
+            'h6_count': h6_count,
+            'h1_samples': h1_tags[:3],
+            'canonical': canonical,
+            'robots': robots,
+            'word_count': word_count,
+            'internal_links': internal_links,
+            'external_links': external_links,
+            'broken_links': broken_links,
+            'broken_link_samples': broken_link_samples,
+            'images_missing_alt': images_missing_alt,
+            'images_no_dimensions': images_no_dimensions,
+            'images_not_lazy': images_not_lazy,
+            'total_images': total_images,
+            'https': is_https,
+            'url_length': url_length,
+            'url_has_underscores': url_has_underscores,
+            'redirect_count': redirect_count,
+            'redirect_chain': redirect_chain,
+            # Site-level info
+            'has_robots_txt': site_info.get('has_robots_txt', False),
+            'has_sitemap': site_info.get('has_sitemap', False),
+            'sitemap_url_count': site_info.get('sitemap_url_count', 0),
+            # New fields
+            'has_viewport': has_viewport,
+            'has_lang': has_lang,
+            'lang': lang,
+            'has_og_tags': has_og_tags,
+            'og_title': og_title,
+            'og_description': og_description,
+            'og_image': og_image,
+            'has_twitter_cards': has_twitter_cards,
+            'has_schema': has_schema,
+            'schema_types': schema_types,
+            # Performance / Core Web Vitals
+            'page_size_kb': round(page_size_kb, 1),
+            'ttfb_estimate': round(ttfb_estimate, 2),
+            'http_version': response.http_version,
+            'render_blocking_count': render_blocking_count,
+            'external_scripts': external_scripts,
+            'inline_css_count': inline_css_count,
+            'warnings': [],
+            # Keywords
+            'meta_keywords': meta_keywords,
+            'top_keywords': top_keywords_list,
+            '_term_counts': term_counts,
+            '_links': {'final_url': response.url, 'internal': internal_link_urls},
+            '_assets': page_assets,
+        }
+        if details:
+            # Lists for the page detail modal (summary-only audits serve them from fetch_page_details())
+            result.update(page_details(soup, response.url))
+        # Generate warnings from the declarative rule set (rules.py)
+        result['warnings'] = evaluate_row(result)
+        return result
+    except requests.exceptions.Timeout:
+        error_result['status_message'] = 'Timeout'
+        error_result['warnings'] = ['Timeout']
+        return error_result
+    except requests.exceptions.ConnectionError:
+        error_result['status_message'] = 'Connection Error'
+        error_result['warnings'] = ['Connection error']
+        return error_result
+    except Exception:
+        error_result['warnings'] = ['Unexpected error']
+        return error_result
+
+
+def _extract_urlset_urls(root, remaining=None):
+    """Extract URLs from a sitemap urlset (at most `remaining`, if given)."""
+    urls = []
+    for child in root:
+        if child.tag.endswith('url'):
+            loc = None
+            for sub in child:
+                if sub.tag.endswith('loc'):
+                    loc = sub
+                    break
+            
+            if loc is None or not loc.text:
+                continue
+                
+            text = loc.text.strip()
+            if not text.startswith(('http://', 'https://')):
+                continue
+            urls.append(text)
+            if remaining is not None and len(urls) >= remaining:
+                break
+    return urls
+
+
+def iter_sitemap_tree(sitemap_url, max_depth=15, debug_info=None, remaining=None):
+    """
+    Walk a sitemap or sitemap index tree, yielding (debug entry, urls) for
+    each urlset as it is parsed. One debug entry per sitemap is appended to
+    debug_info; callers record how many URLs they took in its 'added'.
+    remaining() (optional) returns how many more URLs are wanted; the walk
+    stops when it reaches 0.
+    """
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+    if debug_info is None:
+        debug_info = []
+
+    def wanted():
+        return remaining is None or remaining() > 0
+
+    seen_sitemaps = set()
+    queue = deque([(sitemap_url, 0)])
+
+    while queue and wanted():
+        current_url, depth = queue.popleft()
+        if current_url in seen_sitemaps or depth > max_depth:
+            continue
+        seen_sitemaps.add(current_url)
+
+        # Add rate limiting to avoid overwhelming the server
+        time.sleep(0.2)
+        
+        # Retry logic for sitemap fetching
+        resp = None
+        for attempt in range(3):
+            try:
+                resp = requests.get(current_url, timeout=15, headers=headers, allow_redirects=True)
+                break
+            except (requests.exceptions.RequestException, ValueError) as e:
+                if attempt < 2:
+                    time.sleep(1.0 * (attempt + 1))  # Exponential backoff
+                else:
+                    debug_info.append({
+                        'url': current_url,
+                        'depth': depth,
+                        'status': f'Connection Error (after {attempt + 1} attempts)',
+                        'parsed': False,
+                        'type': 'error',
+                        'found': 0
+                    })
+                    resp = None
+                    break
+        
+        if resp is None:
+            continue
+            
+        status = resp.status_code
+        if status >= 400:
+            debug_info.append({
+                'url': current_url,
+                'depth': depth,
+                'status': status,
+                'parsed': False,
+                'type': 'error',
+                'found': 0
+            })
+            continue
+
+        content_type = resp.headers.get('Content-Type', '').lower()
+        content_encoding = resp.headers.get('Content-Encoding', '').lower()
+        is_gzip_hint = current_url.lower().endswith('.gz') or 'gzip' in content_type
+
+        raw_xml = resp.content if resp.content else resp.text
+
+        root = None
+        parsed_ok = False
+
+        try:
+            root = ET.fromstring(raw_xml)
+            parsed_ok = True
+        except Exception:
+            if is_gzip_hint and 'gzip' not in content_encoding:
+                try:
+                    decompressed = gzip.decompress(resp.content)
+                    root = ET.fromstring(decompressed)
+                    parsed_ok = True
+                except Exception:
+                    root = None
+
+        if not parsed_ok or root is None:
+            debug_info.append({
+                'url': current_url,
+                'depth': depth,
+                'status': status,
+                'parsed': False,
+                'type': 'unparsed',
+                'found': 0
+            })
+            continue
+
+        entry = {
+            'url': current_url,
+            'depth': depth,
+            'status': status,
+            'parsed': True,
+            'type': 'unknown',
+            'found': 0,
+            'added': 0
+        }
+        try:
+            if root.tag.endswith('sitemapindex'):
+                entry['type'] = 'sitemapindex'
+                child_sitemaps_added = 0
+                if depth < max_depth:
+                    for child in root:
+                        if child.tag.endswith('sitemap'):
+                            loc = None
+                            for sub in child:
+                                if sub.tag.endswith('loc'):
+                                    loc = sub
+                                    break
+                            if loc is not None and loc.text:
+                                child_url = loc.text.strip()
+                                if child_url and child_url not in seen_sitemaps and wanted():
+                                    queue.append((child_url, depth + 1))
+                                    child_sitemaps_added += 1
+                entry['found'] = child_sitemaps_added
+                debug_info.append(entry)
+            elif root.tag.endswith('urlset'):
+                entry['type'] = 'urlset'
+                new_urls = _extract_urlset_urls(root, remaining() if remaining is not None else None)
+                entry['found'] = len(new_urls)
+                debug_info.append(entry)
+                # Free the parsed document before the caller walks the URLs
+                root = None
+                yield entry, new_urls
+            else:
+                debug_info.append(entry)
+        except Exception:
+            continue
+
+
+def fetch_sitemap_urls(sitemap_url, max_urls=250, max_depth=15, debug=False):
+    """Fetch URLs from a sitemap or sitemap index."""
+    collected = []
+    first_seen_norm = {}
+    duplicates = []
+    debug_info = []
+    skipped_samples = []
+
+    def record_skip(url, source, reason):
+        if len(skipped_samples) < 50:
+            skipped_samples.append({'url': url, 'source': source, 'reason': reason})
+
+    def add_urls(url_list, source):
+        added = 0
+        for u in url_list:
+            norm = normalize_url(u)
+            if not norm:
+                record_skip(u, source, 'normalize-failed')
+            else:
+                if norm in first_seen_norm:
+                    duplicates.append({'url': u, 'duplicate_of': first_seen_norm[norm], 'source': source})
+                else:
+                    first_seen_norm[norm] = u
+            collected.append(u)
+            added += 1
+            if len(collected) >= max_urls:
+                break
+        return added
+
+    for entry, urls in iter_sitemap_tree(sitemap_url, max_depth, debug_info, lambda: max_urls - len(collected)):
+        entry['added'] = add_urls(urls, entry['url'])
+
+    result_urls = collected[:max_urls]
+    if debug:
+        return result_urls, {
+            'sitemaps': debug_info,
+            'skipped_samples': skipped_samples,
+            'duplicates': duplicates
+        }
+    return result_urls
+
+
+def sample_sitemap_urls(sitemap_url, sampler, seen, allow=None, debug_info=None, max_depth=15):
+    """
+    Stream every URL of a sitemap tree into a SitemapSampler (stratified by
+    the sitemap listing it), skipping URLs already in `seen` (a set-like
+    with add(), e.g. a BloomFilter) and those allow(url) rejects. Returns
+    the number of URLs added.
+    """
+    added = 0
+    for entry, urls in iter_sitemap_tree(sitemap_url, max_depth, debug_info):
+        for u in urls:
+            norm = normalize_url(u)
+            if not norm or not seen.add(norm):
+                continue
+            if allow is not None and not allow(u):
+                continue
+            sampler.add(u, entry['url'])
+            entry['added'] += 1
+            added += 1
+    return added
+
+
+def collect_audit_urls(urls, use_sitemap=False, sitemap_url='', max_pages=10000):
+    """
+    Resolve the URLs to audit: the entered URLs, or (with use_sitemap) the
+    robots.txt-allowed URLs of each site's sitemap, falling back to the entered
+    URL for sites without one. Returns (urls, dup_map, sitemap_debug).
+    """
+    sitemap_debug = []
+    dup_map = {}
+    original_urls = list(urls)
+    
+    if use_sitemap:
+        all_crawled_urls = []
+        seen_crawled = {}
+        
+        for base_input_url in original_urls:
+            base_url = base_input_url.rstrip('/')
+            target_sitemap = sitemap_url or f"{base_url}/sitemap.xml"
+            sitemap_found_urls = False
+            
+            try:
+                crawled_urls, site_debug = fetch_sitemap_urls(target_sitemap, max_pages, debug=True)
+                if isinstance(site_debug, dict):
+                    for d in site_debug.get('duplicates', []) or []:
+                        src = d.get('url')
+                        tgt = d.get('duplicate_of')
+                        if src and tgt:
+                            dup_map[src] = tgt
+                    if 'sitemaps' in site_debug:
+                        sitemap_debug.extend(site_debug['sitemaps'])
+                
+                if crawled_urls:
+                    sitemap_found_urls = True
+                    # Update the site cache to mark sitemap as found
+                    update_site_cache_sitemap(base_url, target_sitemap, len(crawled_urls))
+                    
+                    for u in crawled_urls:
+                        all_crawled_urls.append(u)
+                        normalized = u.lower().rstrip('/')
+                        if normalized in seen_crawled:
+                            if u not in dup_map:
+                                dup_map[u] = seen_crawled[normalized]
+                        else:
+                            seen_crawled[normalized] = u
+                        
+            except Exception as e:
+                debug_entry = {
+                    'type': 'error',
+                    'status': 'Error',
+                    'url': target_sitemap,
+                    'note': f"Sitemap fetch failed: {str(e)}. Adding {base_input_url} to audit."
+                }
+                sitemap_debug.append(debug_entry)
+            
+            if not sitemap_found_urls:
+                normalized = base_input_url.lower().rstrip('/')
+                if normalized not in seen_crawled:
+                    all_crawled_urls.append(base_input_url)
+                    seen_crawled[normalized] = base_input_url
+        
+        # Drop sitemap URLs that robots.txt disallows before anything is fetched
+        entered = set(original_urls)
+        allowed_urls = []
+        blocked_count = 0
+        for u in all_crawled_urls:
+            if u in entered or robots_allowed(u):
+                allowed_urls.append(u)
+            else:
+                blocked_count += 1
+        if blocked_count:
+            all_crawled_urls = allowed_urls
+            sitemap_debug.append({
+                'type': 'warning',
+                'status': 'Blocked',
+                'url': 'robots.txt',
+                'note': f"{blocked_count} sitemap URL(s) disallowed by robots.txt were skipped."
+            })
+
+        if all_crawled_urls:
+            urls = all_crawled_urls
+        else:
+            debug_entry = {
+                'type': 'warning',
+                'status': 'Empty',
+                'url': 'All sitemaps',
+                'note': 'No URLs found in sitemaps. Auditing entered URLs only.'
+            }
+            sitemap_debug.append(debug_entry)
+
+    return urls, (dup_map if use_sitemap else {}), sitemap_debug
+
+
+def collect_sample_urls(urls, sitemap_url='', sample_size=DEFAULT_SAMPLE_SIZE, seed=None):
+    """
+    Sampling mode of collect_audit_urls(): stream the whole sitemap tree of
+    each site through one SitemapSampler and draw sample_size URLs from it.
+    Returns (urls, sample, sitemap_debug); sample is None (and the entered
+    URLs are audited) when no sitemap listed any allowed URL.
+    """
+    sitemap_debug = []
+    sampler = SitemapSampler(sample_size, seed=seed)
+    # Flat memory however many URLs the sitemaps list
+    seen = BloomFilter(capacity=SAMPLE_DEDUP_CAPACITY)
+    walked = set()
+
+    for base_input_url in urls:
+        base_url = base_input_url.rstrip('/')
+        target_sitemap = sitemap_url or f"{base_url}/sitemap.xml"
+        if target_sitemap in walked:
+            continue
+        walked.add(target_sitemap)
+        try:
+            found = sample_sitemap_urls(target_sitemap, sampler, seen, allow=robots_allowed, debug_info=sitemap_debug)
+        except Exception as e:
+            found = 0
+            sitemap_debug.append({
+                'type': 'error',
+                'status': 'Error',
+                'url': target_sitemap,
+                'note': f"Sitemap fetch failed: {str(e)}."
+            })
+        if found:
+            update_site_cache_sitemap(base_url, target_sitemap, found)
+
+    if not sampler.population:
+        sitemap_debug.append({
+            'type': 'warning',
+            'status': 'Empty',
+            'url': 'All sitemaps',
+            'note': 'No URLs found in sitemaps. Auditing entered URLs only.'
+        })
+        return list(urls), None, sitemap_debug
+
+    sample = sampler.draw()
+    sitemap_debug.append({
+        'type': 'info',
+        'status': 'Sampled',
+        'url': 'All sitemaps',
+        'note': f"Auditing a stratified sample of {len(sample.urls)} of {sampler.population} "
+                f"sitemap URLs ({len(sample.strata)} strata by sitemap and path prefix)."
+    })
+    return sample.urls, sample, sitemap_debug
+
+
+class AuditJob:
+    """
+    One SEO audit job.
+
+    add() takes each audit_website() result as it finishes, applies the
+    job-level checks (duplicates, crawl links, keyword and link indexes) and
+    scores it; finish() runs the whole-job analyses once all pages are in.
+    The raw metrics stay in `table` so the job can be re-scored later.
+    A job auditing a sitemap sample (see collect_sample_urls()) reports
+    site-wide estimates from it. A summary-only job (details=False) audits
+    without the page detail lists; see detail_for().
+    """
+
+    def __init__(self, urls, dup_map=None, frontier=None, sitemap_urls=(), sample=None, details=True):
+        self.id = uuid.uuid4().hex
+        self.created = datetime.now().isoformat()
+        self.status = 'running'
+        self.cancelled = threading.Event()
+        self.urls = list(urls)
+        self.dup_map = dup_map or {}
+        self.frontier = frontier
+        self.sitemap_urls = list(sitemap_urls)
+        self.sample = sample
+        self.details = details
+        self.next_index = 0
+        self.results = []
+        # URL -> index in results, for detail_for()
+        self.result_index = {}
+        self.aggregator = AuditAggregator()
+        self.table = ResultTable()
+        self.keywords = KeywordIndex()
+        self.duplicates = DuplicateIndex()
+        self.links = LinkGraph()
+        self.assets = AssetIndex()
+        local_jobs[self.id] = self
+
+    @property
+    def total(self):
+        """Expected number of pages (grows as crawl mode discovers links)."""
+        if self.frontier is not None:
+            return self.frontier.total_estimate()
+        return len(self.urls)
+
+    def cancel(self):
+        """Stop the job: queued pages are dropped and no new ones are started."""
+        self.cancelled.set()
+        self.status = 'cancelled'
+        audit_executor.cancel(self.id)
+
+    def probe_assets(self):
+        """Size the job's assets on the shared executor; yields progress counts."""
+        if self.cancelled.is_set():
+            return iter(())
+        return self.assets.probe(
+            submit=lambda fn, *args: audit_executor.submit(self.id, fn, *args), cancelled=self.cancelled
+        )
+
+    def next_batch(self, size):
+        """Next URLs to audit; an empty list once the job has run out."""
+        if self.frontier is not None:
+            return self.frontier.pop_batch(size)
+        batch = self.urls[self.next_index:self.next_index + size]
+        self.next_index += len(batch)
+        return batch
+
+    def add(self, result):
+        """Fold a finished page into the job and return the (scored) result."""
+        if not self.details and 'images_details' in result:
+            # Lists sent anyway (e.g. by an older queue worker) are kept aside, not streamed
+            detail = {
+                'images_details': result.pop('images_details'),
+                'render_blocking_resources': result.pop('render_blocking_resources', [])
+            }
+            detail_cache.get((self.id, result['url']), lambda: detail)
+        links = result.pop('_links', None)
+        if links:
+            self.links.add_page(result['url'], links['internal'], links['final_url'])
+        else:
+            self.links.add_page(result['url'])
+        if self.frontier is not None:
+            result['crawl_depth'] = self.frontier.depth_of(result['url'])
+            if links:
+                self.frontier.add_links(result['url'], links['internal'], links['final_url'])
+        self.assets.add_page(result['url'], result.pop('_assets', None))
+        term_counts = result.pop('_term_counts', None)
+        if term_counts is not None:
+            if not isinstance(term_counts, Counter):
+                # Results from queue workers arrive as plain JSON objects
+                term_counts = Counter(term_counts)
+            self.keywords.add_page(result['url'], term_counts)
+        if self.dup_map:
+            dup_of = self.dup_map.get(result.get('url'))
+            if dup_of:
+                result['duplicate_of'] = dup_of
+        if result.get('status_message') == 'OK':
+            result.update(self.duplicates.add(
+                result['url'],
+                result.get('title'),
+                result.get('meta_description'),
+                term_counts
+            ))
+        if 'warnings' not in result:
+            result['warnings'] = []
+        for warning in evaluate_job_rules(result):
+            if warning not in result['warnings']:
+                result['warnings'].append(warning)
+        self.aggregator.add(result)
+        self.table.append(result)
+        self.result_index[result['url']] = len(self.results)
+        self.results.append(result)
+        return result
+
+    def detail_for(self, url):
+        """
+        Page detail lists for one audited page: from the audit when it
+        collected them, else from detail_cache, fetching the page again
+        (fetch_page_details()) on a miss. None for URLs the job did not
+        audit, which are never fetched.
+        """
+        index = self.result_index.get(url)
+        if index is None:
+            return None
+        result = self.results[index]
+        if 'images_details' in result:
+            return {
+                'images_details': result['images_details'],
+                'render_blocking_resources': result.get('render_blocking_resources', [])
+            }
+        return detail_cache.get((self.id, url), lambda: fetch_page_details(url))
+
+    def finish(self):
+        """
+        Whole-job analyses once every page is in (call after probing assets).
+        Returns the sorted results and job-level sections of the final report.
+        """
+        sorted_results = sorted(self.results, key=lambda x: (
+            0 if x.get('status_message') == 'OK' else 1,
+            x.get('status_code') if isinstance(x.get('status_code'), int) else 999
+        ))
+
+        # Link graph: PageRank, click depth and orphans (sitemap URLs nothing links to)
+        link_summary = self.links.analyze(self.sitemap_urls)
+
+        # Re-rank page keywords by TF-IDF now that site-wide frequencies are known
+        for result in sorted_results:
+            tfidf_keywords = self.keywords.keywords_for_url(result.get('url'))
+            if tfidf_keywords:
+                result['top_keywords'] = tfidf_keywords
+            result.update(self.links.page_metrics(result.get('url')))
+            result.update(self.assets.page_weight(result.get('url'), result.get('page_size_kb')))
+
+        # Site-wide warning prevalence and score, when the pages are a sitemap sample
+        sample_estimate = None
+        if self.sample is not None:
+            sample_estimate = self.sample.estimate(self.results)
+            sample_estimate['largest_strata'] = self.sample.describe()
+
+        if not self.cancelled.is_set():
+            self.status = 'complete'
+        return {
+            'results': sorted_results,
+            'summary': self.aggregator.summary(),
+            'keywords': self.keywords.site_stats(),
+            'duplicates': self.duplicates.groups(),
+            'link_graph': link_summary,
+            'assets': self.assets.summary(),
+            'sample': sample_estimate,
+            'cancelled': self.cancelled.is_set()
+        }
+
+
+def _audit_in_slot(url, retry_throttled, details):
+    # Runs on the executor with a host_limiter slot already taken for url
+    try:
+        return audit_website(url, retry_throttled=retry_throttled, details=details)
+    finally:
+        host_limiter.release(url)
+
+
+def audit_pages(next_urls, key, cancelled=None, concurrency=JOB_CONCURRENCY, details=True):
+    """
+    Audit pages on the shared executor under `key`, yielding each result as
+    soon as it finishes. next_urls(n) returns up to n more URLs (none once
+    the work is done); details is passed on to audit_website().
+
+    Waiting pages are queued per host and started round-robin across hosts
+    whenever host_limiter has a slot free for them, so each host runs at its
+    own adaptive concurrency. While every waiting host is paused or at its
+    limit, more URLs are taken (up to MAX_BACKLOG waiting) so other hosts
+    keep going. Pages answered with 429/503 go back in their host's queue
+    until its Retry-After has passed, and only after MAX_THROTTLE_RETRIES is
+    the response reported.
+    """
+    waiting = OrderedDict()
+    queued = 0
+    throttled = Counter()
+    in_flight = {}
+
+    def enqueue(url):
+        nonlocal queued
+        waiting.setdefault(url_host(url), deque()).append(url)
+        queued += 1
+
+    def start_pages():
+        # One page per host per pass, until no host has room or the job is full
+        nonlocal queued
+        started = 0
+        for host in list(waiting):
+            if len(in_flight) >= concurrency:
+                break
+            pages = waiting[host]
+            if not host_limiter.try_acquire(pages[0]):
+                continue
+            url = pages.popleft()
+            queued -= 1
+            if not pages:
+                del waiting[host]
+            retry = throttled[url] < MAX_THROTTLE_RETRIES
+            in_flight[audit_executor.submit(key, _audit_in_slot, url, retry, details)] = url
+            started += 1
+        return started
+
+    try:
+        while cancelled is None or not cancelled.is_set():
+            while len(in_flight) < concurrency:
+                if start_pages():
+                    continue
+                # Nothing could start: take more URLs, maybe of other hosts
+                room = min(concurrency, MAX_BACKLOG - queued)
+                urls = next_urls(room) if room > 0 else []
+                if not urls:
+                    break
+                for url in urls:
+                    enqueue(url)
+            if not in_flight:
+                if not waiting:
+                    break
+                time.sleep(THROTTLE_POLL)
+                continue
+
+            done, _ = wait(list(in_flight), timeout=THROTTLE_POLL if waiting else CANCEL_POLL,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                url = in_flight.pop(future)
+                if future.cancelled():
+                    # Dropped from the executor queue before it ran: hand back the slot
+                    host_limiter.release(url)
+                    continue
+                result = future.result()
+                if '_throttled' in result:
+                    throttled[url] += 1
+                    enqueue(url)
+                elif cancelled is None or not cancelled.is_set():
+                    yield result
+    finally:
+        for future, url in in_flight.items():
+            if future.cancel():
+                host_limiter.release(url)
+
+
+def run_audit_job(job, concurrency=JOB_CONCURRENCY):
+    """
+    Audit the job's pages on the shared executor in this process (see
+    audit_pages()), yielding each result, already folded into the job, as
+    soon as it finishes. Stops early once the job is cancelled. See
+    workqueue.run_sharded_job() for running a job across worker processes.
+    """
+    for result in audit_pages(job.next_batch, job.id, job.cancelled, concurrency, job.details):
+        yield job.add(result)
@@ -0,0 +1,168 @@
+"""
+ZenStatus - Command Line
+========================
+Headless SEO audits for cron jobs and CI, without the web server.
+
+Audits a URL list (or each site's sitemap) and writes NDJSON: a 'job'
+record, one 'result' record per page as it finishes, and a final
+'complete' record with the job summary. Progress goes to stderr.
+
+    python cli.py https://example.com --sitemap --max-pages 200 -o audit.ndjson
+    python cli.py https://example.com --sitemap --sample 400
+    python cli.py --file urls.txt --fail-under 70
+
+The audit engine is imported only after the arguments are parsed, so
+--help and argument errors return immediately.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+
+
+def read_urls(args):
+    """URLs from the command line and --file ('-' reads stdin), https:// added to bare domains."""
+    urls = list(args.urls)
+    if args.file:
+        stream = sys.stdin if args.file == '-' else open(args.file, encoding='utf-8')
+        with stream:
+            urls.extend(line.strip() for line in stream)
+    cleaned = []
+    for url in urls:
+        if not url or url.startswith('#'):
+            continue
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        cleaned.append(url)
+    return cleaned
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='zenstatus',
+        description='Run a ZenStatus SEO audit and write NDJSON results.'
+    )
+    parser.add_argument('urls', nargs='*', help='URLs (or root URLs with --sitemap) to audit')
+    parser.add_argument('-f', '--file', help="file with one URL per line ('-' for stdin)")
+    parser.add_argument('-o', '--output', help='write NDJSON to this file instead of stdout')
+    parser.add_argument('--sitemap', action='store_true', help="audit the URLs in each site's sitemap")
+    parser.add_argument('--sitemap-url', default='', help='sitemap to use instead of /sitemap.xml')
+    parser.add_argument('--crawl', action='store_true', help='follow internal links from the audited pages')
+    parser.add_argument('--max-pages', type=int, default=10000, help='page limit for sitemap and crawl modes')
+    parser.add_argument('--sample', type=int, metavar='N',
+                        help='with --sitemap: audit a stratified sample of N URLs from the whole sitemap tree '
+                             'and report site-wide warning prevalence with confidence intervals')
+    parser.add_argument('--seed', type=int, help='random seed for --sample (repeatable samples)')
+    parser.add_argument('--max-depth', type=int, default=3, help='link hops followed in crawl mode')
+    parser.add_argument('--complete-results', action='store_true',
+                        help='write results once the job finishes, including job-level fields '
+                             '(TF-IDF keywords, PageRank, click depth, page weight)')
+    parser.add_argument('--summary-only', action='store_true',
+                        help='leave out the per-image and render-blocking resource lists of each result')
+    parser.add_argument('--fail-under', type=float, metavar='SCORE',
+                        help='exit with status 1 if the average SEO score is below SCORE')
+    parser.add_argument('--queue', metavar='URL',
+                        help='run the job on a shared work queue (e.g. sqlite:///queue.db) served by worker.py processes')
+    parser.add_argument('-q', '--quiet', action='store_true', help='no progress on stderr')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    urls = read_urls(args)
+    if not urls:
+        parser.error('no URLs given')
+    if args.sample is not None and not args.sitemap:
+        parser.error('--sample needs --sitemap')
+    max_pages = max(1, min(args.max_pages, 10000))
+    max_depth = max(0, min(args.max_depth, 20))
+
+    from workqueue import open_work_queue, run_sharded_job
+    queue = None
+    if args.queue:
+        try:
+            queue = open_work_queue(args.queue)
+        except (ValueError, sqlite3.Error) as e:
+            parser.error(f"--queue: {e}")
+
+    from auditor import AuditJob, collect_audit_urls, collect_sample_urls, robots_allowed, run_audit_job
+    from crawler import CrawlFrontier
+    from worker import process_unit, worker_name
+
+    sample = None
+    if args.sample is not None:
+        sample_size = max(1, min(args.sample, 10000))
+        urls, sample, sitemap_debug = collect_sample_urls(urls, args.sitemap_url.strip(), sample_size, args.seed)
+        dup_map = {}
+    else:
+        urls, dup_map, sitemap_debug = collect_audit_urls(urls, args.sitemap, args.sitemap_url.strip(), max_pages)
+    frontier = CrawlFrontier(urls, max_pages=max_pages, max_depth=max_depth, allow=robots_allowed) if args.crawl else None
+    job = AuditJob(urls, dup_map, frontier, urls if args.sitemap and sample is None else (), sample,
+                   details=not args.summary_only)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+
+    def emit(record):
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        out.flush()
+
+    try:
+        emit({'type': 'job', 'job_id': job.id, 'total': job.total})
+        completed = 0
+        if queue is not None:
+            job_results = run_sharded_job(job, queue, local_worker=lambda q: process_unit(q, worker_name(job.id)))
+        else:
+            job_results = run_audit_job(job)
+        try:
+            for result in job_results:
+                if result is None:
+                    continue
+                completed += 1
+                if not args.complete_results:
+                    emit({'type': 'result', **result})
+                if not args.quiet:
+                    print(f"[{completed}/{job.total}] {result.get('seo_score')} {result.get('url')}", file=sys.stderr)
+
+            if not args.quiet:
+                print('Sizing page assets...', file=sys.stderr)
+            for _ in job.probe_assets():
+                pass
+        except KeyboardInterrupt:
+            # Ctrl+C: drop the queued pages and report what was audited so far
+            job.cancel()
+            print('Cancelled', file=sys.stderr)
+        finally:
+            job_results.close()
+
+        final = job.finish()
+        if args.complete_results:
+            for result in final['results']:
+                emit({'type': 'result', **result})
+        emit({
+            'type': 'complete',
+            'job_id': job.id,
+            'summary': final['summary'],
+            'keywords': final['keywords'],
+            'duplicates': final['duplicates'],
+            'link_graph': final['link_graph'],
+            'assets': final['assets'],
+            'sample': final['sample'],
+            'cancelled': final['cancelled'],
+            'sitemap_debug': sitemap_debug
+        })
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    avg_score = final['summary']['avg_score']
+    if not args.quiet:
+        print(f"Audited {final['summary']['total']} pages, average SEO score {avg_score}", file=sys.stderr)
+    if args.fail_under is not None and avg_score < args.fail_under:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
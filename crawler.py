@@ -0,0 +1,211 @@
+"""
+ZenStatus - Crawler
+===================
+Link-following crawl mode for sites without a usable sitemap.
+
+Internal links discovered while auditing a page are normalized with the
+same normalize_url() used for sitemap de-duplication and pushed onto a
+prioritized frontier (shallow pages first). A Bloom filter records every
+URL ever queued so memory stays flat on very large sites, and depth/page
+budgets bound the crawl.
+"""
+
+import hashlib
+import heapq
+import math
+import threading
+import time
+from urllib.parse import urlparse
+
+
+# Links to these file types are assets, not pages to audit
+SKIP_EXTENSIONS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.bmp', '.avif',
+    '.css', '.js', '.json', '.xml', '.txt', '.pdf', '.zip', '.gz', '.rar', '.7z',
+    '.mp3', '.mp4', '.avi', '.mov', '.webm', '.woff', '.woff2', '.ttf', '.eot',
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.exe', '.dmg',
+)
+
+
+def normalize_url(u):
+    """
+    Canonical form of a URL for de-duplication: lower-cased host, default
+    ports and trailing slashes removed, fragment dropped, query kept.
+    Returns None for non-HTTP(S) URLs.
+    """
+    try:
+        parsed = urlparse(u.strip())
+        if parsed.scheme not in ('http', 'https'):
+            return None
+        netloc = parsed.netloc.lower()
+        if parsed.scheme == 'http' and netloc.endswith(':80'):
+            netloc = netloc[:-3]
+        if parsed.scheme == 'https' and netloc.endswith(':443'):
+            netloc = netloc[:-4]
+        path = parsed.path or '/'
+        if len(path) > 1 and path.endswith('/'):
+            path = path[:-1]
+        normalized = f"{parsed.scheme}://{netloc}{path}"
+        if parsed.query:
+            normalized += f"?{parsed.query}"
+        return normalized
+    except Exception:
+        return None
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set. False positives (a new URL reported as
+    seen) occur at roughly error_rate once capacity is reached; there are
+    no false negatives.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        """Add key; returns True if it was (probably) not present before."""
+        added = False
+        for pos in self._positions(key):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+def is_crawlable(url):
+    """True for URLs that look like HTML pages rather than assets."""
+    path = urlparse(url).path.lower()
+    return not path.endswith(SKIP_EXTENSIONS)
+
+
+class CrawlFrontier:
+    """
+    Prioritized crawl frontier for one audit job.
+
+    Pages are handed out shallowest-first (then by shorter path), restricted
+    to the hosts of the seed URLs, within max_depth link hops and max_pages
+    audited pages in total. Discovered links are dropped unless allow(url)
+    is true.
+    """
+
+    def __init__(self, seeds, max_pages=500, max_depth=3, allow=None):
+        self.allow = allow
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.seen = BloomFilter(capacity=max(1000, max_pages * 20))
+        self.heap = []
+        self.depths = {}
+        self.dispatched = 0
+        self.sequence = 0
+        self.hosts = set()
+        for seed in seeds:
+            norm = normalize_url(seed)
+            if norm:
+                self.hosts.add(urlparse(norm).netloc)
+        for seed in seeds:
+            self.add(seed, 0)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def add(self, url, depth):
+        """Queue a URL at the given depth; returns True if it was new and in scope."""
+        if depth > self.max_depth:
+            return False
+        norm = normalize_url(url)
+        if not norm or urlparse(norm).netloc not in self.hosts or not is_crawlable(norm):
+            return False
+        if not self.seen.add(norm):
+            return False
+        # Seeds were chosen by the user; discovered links must pass the allow check (robots.txt)
+        if depth > 0 and self.allow is not None and not self.allow(norm):
+            return False
+        priority = (depth, norm.count('/'), self.sequence)
+        self.sequence += 1
+        heapq.heappush(self.heap, (priority, norm, depth))
+        return True
+
+    def add_links(self, parent_url, links, final_url=None):
+        """Queue the internal links found on an audited page one hop deeper."""
+        parent_depth = self.depths.pop(parent_url, 0)
+        depth = parent_depth + 1
+        if parent_depth == 0 and final_url:
+            # A seed that redirects to another host (e.g. example.com -> www.example.com)
+            # brings that host into scope
+            final = normalize_url(final_url)
+            if final:
+                self.hosts.add(urlparse(final).netloc)
+        added = 0
+        for link in links or []:
+            if self.add(link, depth):
+                added += 1
+        return added
+
+    def pop_batch(self, size):
+        """Next batch of URLs to audit, respecting the page budget."""
+        batch = []
+        while self.heap and len(batch) < size and self.dispatched < self.max_pages:
+            _, url, depth = heapq.heappop(self.heap)
+            self.depths[url] = depth
+            self.dispatched += 1
+            batch.append(url)
+        return batch
+
+    def depth_of(self, url):
+        return self.depths.get(url, 0)
+
+    def total_estimate(self):
+        """Expected number of pages for progress reporting."""
+        return min(self.max_pages, self.dispatched + len(self.heap))
+
+
+class HostThrottle:
+    """
+    Per-host request spacing for page fetches. Hosts with a delay (e.g. a
+    robots.txt Crawl-delay) get their fetches scheduled at least that many
+    seconds apart across all worker threads; other hosts are not delayed.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.delays = {}
+        self.next_slot = {}
+
+    def set_delay(self, host, seconds):
+        with self.lock:
+            if seconds:
+                self.delays[host] = seconds
+            else:
+                self.delays.pop(host, None)
+
+    def wait(self, url):
+        """Block until the URL's host may be fetched again; returns seconds waited."""
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            delay = self.delays.get(host)
+            if not delay:
+                return 0
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, 0))
+            self.next_slot[host] = slot + delay
+        wait_time = slot - now
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
@@ -0,0 +1,97 @@
+"""
+ZenStatus - Shared Executor
+===========================
+One process-wide worker pool for all audit and status-check jobs.
+
+Tasks are queued per job and the worker threads take them round-robin
+across jobs, so a 10,000-page audit cannot starve a 5-URL check started
+after it, and the total number of threads stays at ZENSTATUS_WORKERS no
+matter how many requests are running. cancel() drops a job's queued tasks
+(tasks already running finish, but nothing new starts); their futures end
+up cancelled, waking anything waiting on them.
+"""
+
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+
+DEFAULT_WORKERS = 16
+
+
+class FairExecutor:
+    """Thread pool with per-job FIFO queues served round-robin."""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self.condition = threading.Condition()
+        self.queues = OrderedDict()
+        self.threads = []
+        self.idle = 0
+
+    def submit(self, job_key, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) under job_key; returns a Future."""
+        future = Future()
+        with self.condition:
+            self.queues.setdefault(job_key, deque()).append((future, fn, args, kwargs))
+            if not self.idle and len(self.threads) < self.max_workers:
+                thread = threading.Thread(target=self._work, name=f"zenstatus-worker-{len(self.threads)}", daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            self.condition.notify()
+        return future
+
+    def cancel(self, job_key):
+        """Cancel a job's queued tasks; returns how many were dropped."""
+        with self.condition:
+            tasks = self.queues.pop(job_key, ())
+        for future, _, _, _ in tasks:
+            # cancel() alone does not wake threads in wait()/as_completed() on these futures
+            if future.cancel():
+                future.set_running_or_notify_cancel()
+        return len(tasks)
+
+    def queued(self, job_key=None):
+        """Queued (not yet running) tasks, for one job or in total."""
+        with self.condition:
+            if job_key is not None:
+                return len(self.queues.get(job_key, ()))
+            return sum(len(tasks) for tasks in self.queues.values())
+
+    def _next_task(self):
+        # Caller holds the lock: take the head task of the first job, then
+        # move that job to the back so the next task comes from another job
+        job_key, tasks = next(iter(self.queues.items()))
+        task = tasks.popleft()
+        if tasks:
+            self.queues.move_to_end(job_key)
+        else:
+            del self.queues[job_key]
+        return task
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while not self.queues:
+                    self.idle += 1
+                    self.condition.wait()
+                    self.idle -= 1
+                future, fn, args, kwargs = self._next_task()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+
+def _configured_workers():
+    try:
+        return int(os.environ.get('ZENSTATUS_WORKERS', DEFAULT_WORKERS))
+    except ValueError:
+        return DEFAULT_WORKERS
+
+
+# Shared by every job in this process
+audit_executor = FairExecutor(_configured_workers())
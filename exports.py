@@ -0,0 +1,209 @@
+"""
+ZenStatus - Exports
+===================
+Audit exports streamed from a stored run (see runstore.py).
+
+Every format is produced row by row from the run store's cursor, so an
+export of a 10k-page audit uses the same memory as one of ten pages:
+CSV, NDJSON, a JSON array, a Markdown report, and a ZIP with one CSV
+per site (written to the response as it is built).
+"""
+
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import datetime
+from itertools import groupby
+
+from rules import result_host
+
+
+CSV_COLUMNS = (
+    'url', 'seo_score', 'status_code', 'status_message', 'response_time',
+    'title', 'title_length', 'meta_description', 'meta_description_length',
+    'h1_count', 'h2_count', 'h3_count', 'h4_count', 'word_count',
+    'internal_links', 'external_links', 'images_missing_alt', 'total_images',
+    'https', 'robots', 'canonical', 'has_viewport', 'has_lang', 'lang',
+    'has_og_tags', 'og_title', 'has_schema', 'schema_types', 'warnings', 'h1_samples',
+)
+
+SITE_CSV_COLUMNS = (
+    'url', 'seo_score', 'status_code', 'status_message', 'response_time',
+    'title', 'title_length', 'meta_description', 'meta_description_length',
+    'h1_count', 'h2_count', 'h3_count', 'h4_count', 'word_count',
+    'internal_links', 'external_links', 'images_missing_alt', 'total_images',
+    'https', 'robots', 'canonical', 'warnings', 'h1_samples',
+)
+
+YES_NO_COLUMNS = {'https', 'has_viewport', 'has_lang', 'has_og_tags', 'has_schema'}
+ZERO_DEFAULT_COLUMNS = {'h2_count', 'h3_count', 'h4_count'}
+
+# Same buckets as the report UI (getSeverityClass in static/js/ui.js, getScoreLabel in static/js/scoring.js)
+HIGH_SEVERITY = (
+    'Missing title', 'Missing H1', 'Missing meta description', 'Noindex set', 'Page Error',
+    'Missing viewport', 'Not using HTTPS', 'Broken internal links',
+)
+MEDIUM_SEVERITY = (
+    'Title too long', 'Description too long', 'Multiple H1 tags', 'No canonical tag', 'No Open Graph',
+    'No structured data', 'No schema', 'Redirect chain', 'No robots.txt', 'No sitemap', 'Duplicate title',
+    'Duplicate meta description', 'Near-duplicate content',
+)
+SCORE_LABELS = ((90, 'Excellent'), (70, 'Good'), (50, 'Average'), (30, 'Poor'), (0, 'Critical'))
+
+
+def warning_severity(warning):
+    if any(text in warning for text in HIGH_SEVERITY):
+        return 'high'
+    if any(text in warning for text in MEDIUM_SEVERITY):
+        return 'medium'
+    return 'low'
+
+
+def score_label(score):
+    for threshold, label in SCORE_LABELS:
+        if score >= threshold:
+            return label
+    return 'Critical'
+
+
+def _csv_value(result, column):
+    value = result.get(column)
+    if column in YES_NO_COLUMNS:
+        return 'Yes' if value else 'No'
+    if isinstance(value, list):
+        return ' | '.join(str(item) for item in value)
+    if value is None:
+        return 0 if column in ZERO_DEFAULT_COLUMNS else ''
+    return value
+
+
+def iter_csv(results, columns=CSV_COLUMNS):
+    """CSV text: a header line, then one line per result."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for result in results:
+        writer.writerow([_csv_value(result, column) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, when there are no results
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_ndjson(results):
+    for result in results:
+        yield json.dumps(result, ensure_ascii=False) + '\n'
+
+
+def iter_json(results):
+    """A JSON array, one result per line."""
+    separator = '[\n'
+    for result in results:
+        yield separator + json.dumps(result, ensure_ascii=False)
+        separator = ',\n'
+    yield '[]\n' if separator == '[\n' else '\n]\n'
+
+
+def _md_cell(value):
+    return str(value).replace('|', '\\|').replace('\n', ' ')
+
+
+def iter_markdown(run, results):
+    """Executive summary of the run, then a table of every page."""
+    summary = run.get('summary') or {}
+    warning_counts = summary.get('warning_counts') or {}
+    issues = {'high': 0, 'medium': 0, 'low': 0}
+    for warning, count in warning_counts.items():
+        issues[warning_severity(warning)] += count
+    avg_score = summary.get('avg_score', 0)
+
+    yield '# SEO Audit Executive Summary\n\n'
+    yield f"Audit {run['run_id']}, run {datetime.fromtimestamp(run['created']).strftime('%Y-%m-%d %H:%M')}\n\n"
+    yield f"## Overall Score: {avg_score}/100 ({score_label(avg_score)})\n\n"
+    yield '## Key Metrics\n\n'
+    yield f"- **Pages Audited:** {summary.get('total', run.get('pages', 0))}\n"
+    yield f"- **High Priority Issues:** {issues['high']}\n"
+    yield f"- **Medium Priority Issues:** {issues['medium']}\n"
+    yield f"- **Low Priority Issues:** {issues['low']}\n\n"
+    yield '## Top Issues\n\n'
+    top = sorted(warning_counts.items(), key=lambda item: item[1], reverse=True)[:10]
+    for index, (warning, count) in enumerate(top, 1):
+        yield f"{index}. **{warning}** - {count} pages\n"
+
+    yield '\n## Recommended Actions\n\n'
+    yield '1. Fix all high-priority issues first (missing titles, H1s)\n'
+    yield '2. Add meta descriptions to improve click-through rates\n'
+    yield '3. Ensure all pages have canonical tags\n'
+    yield '4. Optimize images with proper alt text\n'
+    yield '5. Improve page speed if response times exceed 2 seconds\n'
+
+    yield '\n## Pages\n\n'
+    yield '| URL | Score | Status | Response | Warnings |\n'
+    yield '|-----|-------|--------|----------|----------|\n'
+    for result in results:
+        yield '| {} | {} | {} | {} | {} |\n'.format(
+            _md_cell(result.get('url', '')), result.get('seo_score', ''), _md_cell(result.get('status_code', '')),
+            _md_cell(result.get('response_time', '')), _md_cell('; '.join(result.get('warnings') or []))
+        )
+
+
+def site_filename(host):
+    return 'seo-audit-' + re.sub(r'[^a-zA-Z0-9_-]', '_', host) + '.csv'
+
+
+class _ChunkWriter:
+    """Write-only file object collecting what zipfile writes, drained after each row."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def iter_site_zip(results):
+    """
+    ZIP archive bytes with one CSV per site. Results must arrive grouped by
+    result_host() (iter_results(..., by_host=True) of the run store); the
+    archive is written without seeking, so it streams as it is built.
+    """
+    out = _ChunkWriter()
+    with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for host, site_results in groupby(results, key=lambda result: result_host(result.get('url', ''))):
+            with archive.open(site_filename(host), 'w') as entry:
+                for text in iter_csv(site_results, SITE_CSV_COLUMNS):
+                    entry.write(text.encode('utf-8'))
+                    data = out.drain()
+                    if data:
+                        yield data
+    yield out.drain()
+
+
+# format: (content builder, needs results grouped by host, mimetype, file name)
+EXPORT_FORMATS = {
+    'csv': (lambda run, results: iter_csv(results), False, 'text/csv; charset=utf-8', 'seo-audit.csv'),
+    'ndjson': (lambda run, results: iter_ndjson(results), False, 'application/x-ndjson', 'seo-audit.ndjson'),
+    'json': (lambda run, results: iter_json(results), False, 'application/json', 'seo-audit.json'),
+    'md': (iter_markdown, False, 'text/markdown; charset=utf-8', 'seo-audit-report.md'),
+    'zip': (lambda run, results: iter_site_zip(results), True, 'application/zip', 'seo-audit-per-site.zip'),
+}
+
+
+def export_run(store, run_id, fmt):
+    """(chunks, mimetype, file name) for a stored run; chunks is a generator."""
+    build, by_host, mimetype, filename = EXPORT_FORMATS[fmt]
+    run = store.get_run(run_id)
+    return build(run, store.iter_results(run_id, by_host=by_host)), mimetype, filename
@@ -0,0 +1,181 @@
+"""
+ZenStatus - Duplicate Fingerprints
+==================================
+Incremental duplicate and near-duplicate detection for an audit job.
+
+- Titles and meta descriptions are matched exactly (after whitespace/case
+  normalization) through hash lookups.
+- Body text is fingerprinted with a 64-bit SimHash over the page's weighted
+  terms. Fingerprints are bucketed by four 16-bit bands (LSH): two pages
+  within NEAR_DUPLICATE_DISTANCE bits of each other must share at least one
+  band, so each new page is compared only against its bucket-mates instead
+  of every page seen so far.
+"""
+
+import hashlib
+from array import array
+
+
+SIMHASH_BITS = 64
+BAND_BITS = 16
+BAND_COUNT = SIMHASH_BITS // BAND_BITS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# Pages within this Hamming distance (of 64 bits) are near-duplicates
+NEAR_DUPLICATE_DISTANCE = 3
+# Pages with fewer distinct terms are too small to fingerprint reliably
+MIN_FINGERPRINT_TERMS = 20
+# Candidates compared per band bucket (bounds work on boilerplate-heavy sites)
+MAX_BUCKET_CANDIDATES = 64
+# URLs listed per duplicate group in the job summary
+MAX_GROUP_URLS = 100
+
+
+def _normalize_text(text):
+    return ' '.join((text or '').lower().split())
+
+
+def _term_hash(term, cache):
+    value = cache.get(term)
+    if value is None:
+        digest = hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest()
+        value = cache[term] = int.from_bytes(digest, 'big')
+    return value
+
+
+# Nibble values with each of the 4 bits set, used to fold nibble histograms into bit sums
+_NIBBLE_BITS = [[value for value in range(16) if value >> bit & 1] for bit in range(4)]
+
+
+def simhash(term_counts, cache=None):
+    """
+    64-bit SimHash of a {term: count} mapping (weights are term counts).
+
+    Instead of updating 64 bit counters per term, weights are accumulated in
+    a histogram per 4-bit nibble (16 updates per term) and folded into the
+    per-bit sums once at the end.
+    """
+    cache = {} if cache is None else cache
+    histogram = [0] * (SIMHASH_BITS // 4 * 16)
+    total_weight = 0
+    for term, weight in term_counts.items():
+        value = _term_hash(term, cache)
+        total_weight += weight
+        for position in range(0, SIMHASH_BITS // 4 * 16, 16):
+            histogram[position + (value & 15)] += weight
+            value >>= 4
+
+    fingerprint = 0
+    for nibble in range(SIMHASH_BITS // 4):
+        row = histogram[nibble * 16:nibble * 16 + 16]
+        for bit, values in enumerate(_NIBBLE_BITS):
+            # sum(set) - sum(unset) > 0  <=>  2 * sum(set) > total
+            if 2 * sum(row[v] for v in values) > total_weight:
+                fingerprint |= 1 << (nibble * 4 + bit)
+    return fingerprint
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class DuplicateIndex:
+    """
+    Fingerprint index for one audit job.
+
+    add() is called as each page finishes and returns the duplicate fields
+    for that page (the earliest matching page is reported); groups() builds
+    the job-summary clusters.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self.fingerprints = array('Q')
+        self.bands = [{} for _ in range(BAND_COUNT)]
+        self.titles = {}
+        self.descriptions = {}
+        self.title_groups = {}
+        self.description_groups = {}
+        self.near_parent = {}
+        self._hash_cache = {}
+
+    def _exact(self, value, seen, groups, url):
+        key = _normalize_text(value)
+        if not key:
+            return None
+        first = seen.get(key)
+        if first is None:
+            seen[key] = url
+            return None
+        groups.setdefault(key, [first]).append(url)
+        return first
+
+    def _near(self, fingerprint):
+        best = None
+        for band, buckets in enumerate(self.bands):
+            bucket = buckets.get(fingerprint >> (band * BAND_BITS) & BAND_MASK)
+            if not bucket:
+                continue
+            for page in bucket[:MAX_BUCKET_CANDIDATES]:
+                distance = hamming_distance(fingerprint, self.fingerprints[page])
+                if distance <= NEAR_DUPLICATE_DISTANCE and (best is None or distance < best[1]):
+                    best = (page, distance)
+                    if distance == 0:
+                        return best
+        return best
+
+    def add(self, url, title='', description='', term_counts=None):
+        """Index a page; returns a dict of duplicate fields to merge into its result."""
+        found = {}
+
+        dup_title = self._exact(title, self.titles, self.title_groups, url)
+        if dup_title:
+            found['duplicate_title_of'] = dup_title
+        dup_description = self._exact(description, self.descriptions, self.description_groups, url)
+        if dup_description:
+            found['duplicate_description_of'] = dup_description
+
+        if term_counts and len(term_counts) >= MIN_FINGERPRINT_TERMS:
+            fingerprint = simhash(term_counts, self._hash_cache)
+            match = self._near(fingerprint)
+            page = len(self.urls)
+            self.urls.append(url)
+            self.fingerprints.append(fingerprint)
+            for band, buckets in enumerate(self.bands):
+                buckets.setdefault(fingerprint >> (band * BAND_BITS) & BAND_MASK, []).append(page)
+            if match is not None:
+                other, distance = match
+                found['near_duplicate_of'] = self.urls[other]
+                found['near_duplicate_similarity'] = round(1 - distance / SIMHASH_BITS, 3)
+                self.near_parent[page] = other
+        return found
+
+    def _root(self, page):
+        while page in self.near_parent:
+            page = self.near_parent[page]
+        return page
+
+    def groups(self, limit=50):
+        """Duplicate clusters for the job summary (largest first)."""
+        clusters = {}
+        for page in self.near_parent:
+            clusters.setdefault(self._root(page), {self._root(page)}).add(page)
+        near = sorted(
+            ([self.urls[p] for p in sorted(members)] for members in clusters.values()),
+            key=len, reverse=True
+        )
+
+        def exact(groups):
+            ordered = sorted(groups.items(), key=lambda item: len(item[1]), reverse=True)
+            return [
+                {'value': key, 'count': len(urls), 'urls': urls[:MAX_GROUP_URLS]}
+                for key, urls in ordered[:limit]
+            ]
+
+        return {
+            'titles': exact(self.title_groups),
+            'descriptions': exact(self.description_groups),
+            'near_duplicates': [
+                {'count': len(urls), 'urls': urls[:MAX_GROUP_URLS]} for urls in near[:limit]
+            ],
+        }
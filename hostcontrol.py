@@ -0,0 +1,208 @@
+"""
+ZenStatus - Host Control
+========================
+Per-host health and flow control for the audit engine.
+
+HostCircuitBreaker counts consecutive failed fetches (timeouts, refused
+connections, redirect loops, ...) per host. Once a host reaches FAILURE_THRESHOLD the
+circuit opens and its remaining pages fail immediately instead of each
+waiting out timeouts and retries. After a cool-down one probe request is
+let through (half-open): success closes the circuit, failure re-opens it
+with a longer cool-down.
+
+HostConcurrency sets how many pages of a host are fetched at once from
+the server's own signals: response latency, 429/503 answers and
+Retry-After (see the class docstring).
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+
+FAILURE_THRESHOLD = 5
+OPEN_SECONDS = 30.0
+MAX_OPEN_SECONDS = 600.0
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+def url_host(url):
+    return urlparse(url).netloc.lower()
+
+
+class HostCircuitBreaker:
+    """Thread-safe circuit breaker keyed by host."""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, open_seconds=OPEN_SECONDS,
+                 max_open_seconds=MAX_OPEN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def _entry(self, host):
+        entry = self.hosts.get(host)
+        if entry is None:
+            entry = self.hosts[host] = {
+                'state': CLOSED, 'failures': 0, 'opened_at': 0.0, 'cooldown': self.open_seconds, 'probing': False
+            }
+        return entry
+
+    def allow(self, url):
+        """
+        True if a request to the URL's host may go out. When the cool-down of
+        an open circuit has passed, the first caller gets the half-open probe.
+        """
+        with self.lock:
+            entry = self.hosts.get(url_host(url))
+            if entry is None or entry['state'] == CLOSED:
+                return True
+            if entry['state'] == OPEN and time.monotonic() - entry['opened_at'] >= entry['cooldown']:
+                entry['state'] = HALF_OPEN
+                entry['probing'] = False
+            if entry['state'] == HALF_OPEN and not entry['probing']:
+                entry['probing'] = True
+                return True
+            return False
+
+    def is_open(self, url):
+        """True while requests to the URL's host are being short-circuited (does not take the probe)."""
+        with self.lock:
+            entry = self.hosts.get(url_host(url))
+            return entry is not None and entry['state'] != CLOSED
+
+    def record_success(self, url):
+        with self.lock:
+            entry = self.hosts.get(url_host(url))
+            if entry is not None:
+                entry.update(state=CLOSED, failures=0, cooldown=self.open_seconds, probing=False)
+
+    def record_failure(self, url):
+        """Count a network failure; returns True if the circuit is (now) open."""
+        with self.lock:
+            entry = self._entry(url_host(url))
+            entry['failures'] += 1
+            if entry['state'] == HALF_OPEN:
+                # Probe failed: back off longer before the next one
+                entry['cooldown'] = min(entry['cooldown'] * 2, self.max_open_seconds)
+            elif entry['state'] == CLOSED and entry['failures'] < self.failure_threshold:
+                return False
+            entry['state'] = OPEN
+            entry['opened_at'] = time.monotonic()
+            entry['probing'] = False
+            return True
+
+    def open_hosts(self):
+        """Hosts whose circuit is not closed, with their state and failure count."""
+        with self.lock:
+            return {
+                host: {'state': entry['state'], 'failures': entry['failures']}
+                for host, entry in self.hosts.items() if entry['state'] != CLOSED
+            }
+
+
+# Adaptive per-host concurrency (AIMD)
+INITIAL_HOST_LIMIT = 2.0
+MIN_HOST_LIMIT = 1.0
+MAX_HOST_LIMIT = 12.0
+# Latency above this multiple of the host's baseline counts as congestion
+LATENCY_TOLERANCE = 2.0
+DECREASE_FACTOR = 0.7
+DEFAULT_RETRY_AFTER = 5.0
+MAX_RETRY_AFTER = 120.0
+
+
+def parse_retry_after(value, default=DEFAULT_RETRY_AFTER):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), capped."""
+    if not value:
+        return default
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            from email.utils import parsedate_to_datetime
+            from datetime import datetime, timezone
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError, OverflowError):
+            return default
+    return max(0.0, min(seconds, MAX_RETRY_AFTER))
+
+
+class HostConcurrency:
+    """
+    In-flight limit per host, adjusted AIMD-style: each page that comes back
+    without added latency raises the limit by 1/limit (about +1 per round
+    trip); latency above LATENCY_TOLERANCE times the host's baseline, or a
+    429/503 response, cuts it by DECREASE_FACTOR or half. A Retry-After
+    pauses the host entirely until it has passed.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def _entry(self, host):
+        entry = self.hosts.get(host)
+        if entry is None:
+            entry = self.hosts[host] = {
+                'limit': INITIAL_HOST_LIMIT, 'in_flight': 0, 'baseline': None, 'latency': None,
+                'paused_until': 0.0, 'last_decrease': 0.0
+            }
+        return entry
+
+    def try_acquire(self, url):
+        """Take an in-flight slot for the URL's host; False if the host is at its limit or paused."""
+        with self.lock:
+            entry = self._entry(url_host(url))
+            if time.monotonic() < entry['paused_until']:
+                return False
+            if entry['in_flight'] >= int(entry['limit']):
+                return False
+            entry['in_flight'] += 1
+            return True
+
+    def release(self, url):
+        with self.lock:
+            entry = self._entry(url_host(url))
+            entry['in_flight'] = max(0, entry['in_flight'] - 1)
+
+    def _decrease(self, entry, factor):
+        now = time.monotonic()
+        # At most one cut per round trip, so one slow burst does not collapse the limit
+        if now - entry['last_decrease'] >= (entry['latency'] or 1.0):
+            entry['limit'] = max(MIN_HOST_LIMIT, entry['limit'] * factor)
+            entry['last_decrease'] = now
+
+    def record_latency(self, url, seconds):
+        """Feed back a completed page fetch."""
+        with self.lock:
+            entry = self._entry(url_host(url))
+            latency = entry['latency']
+            entry['latency'] = seconds if latency is None else 0.8 * latency + 0.2 * seconds
+            baseline = entry['baseline']
+            # Baseline follows improvements immediately and degradations slowly
+            entry['baseline'] = seconds if baseline is None else min(seconds, 0.95 * baseline + 0.05 * seconds)
+            if entry['latency'] > entry['baseline'] * LATENCY_TOLERANCE and entry['latency'] > 0.2:
+                self._decrease(entry, DECREASE_FACTOR)
+            else:
+                entry['limit'] = min(MAX_HOST_LIMIT, entry['limit'] + 1.0 / entry['limit'])
+
+    def record_throttle(self, url, retry_after):
+        """A 429/503 answer: halve the limit and pause the host for retry_after seconds."""
+        with self.lock:
+            entry = self._entry(url_host(url))
+            self._decrease(entry, 0.5)
+            entry['paused_until'] = max(entry['paused_until'], time.monotonic() + retry_after)
+
+    def limits(self):
+        """Current limit and in-flight count per host."""
+        with self.lock:
+            return {
+                host: {'limit': round(entry['limit'], 2), 'in_flight': entry['in_flight']}
+                for host, entry in self.hosts.items()
+            }
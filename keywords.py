@@ -0,0 +1,161 @@
+"""
+ZenStatus - Keyword Index
+=========================
+Job-level term index for keyword extraction.
+
+Pages are tokenized once with a compiled regex and counted with Counter
+(C-level counting instead of a per-word dict loop). Terms are interned to
+integer IDs and each page keeps compact array-backed term vectors, while
+per-site document frequencies are updated incrementally as pages finish.
+Per-page keywords are ranked by TF-IDF within their site, so boilerplate
+terms that appear on every page (brand names, navigation labels) drop out.
+"""
+
+import heapq
+import math
+from array import array
+from collections import Counter
+import re
+
+from rules import result_host
+
+
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'from', 'as', 'is', 'was', 'are', 'were', 'been', 'be', 'have', 'has', 'had', 'do', 'does',
+    'did', 'will', 'would', 'should', 'could', 'may', 'might', 'must', 'can', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'what', 'which', 'who',
+    'when', 'where', 'why', 'how', 'all', 'each', 'every', 'both', 'few', 'more', 'most',
+    'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too',
+    'very', 'just', 'about',
+})
+
+WORD_RE = re.compile(r'\b[a-z]{3,}\b')
+
+# Term vectors kept per page are capped to the most frequent terms
+MAX_TERMS_PER_PAGE = 200
+
+
+def count_terms(text):
+    """Count keyword candidates in already lower-cased page text."""
+    counts = Counter(WORD_RE.findall(text))
+    # Drop stop words from the (small) vocabulary rather than testing every token
+    for word in STOP_WORDS.intersection(counts):
+        del counts[word]
+    return counts
+
+
+def top_terms(counts, limit=15):
+    """Raw-frequency keywords for a single page, in the result's top_keywords shape."""
+    return [{'keyword': k, 'count': c} for k, c in counts.most_common(limit)]
+
+
+class KeywordIndex:
+    """
+    Incremental TF-IDF index for one audit job.
+
+    Vocabulary is shared across the job; document frequency and total term
+    counts are tracked per site so IDF reflects each site's own pages.
+    """
+
+    def __init__(self):
+        self.vocab = {}
+        self.terms = []
+        self.sites = {}
+        self.pages = []
+        self.page_ids = {}
+
+    def _site(self, host):
+        site = self.sites.get(host)
+        if site is None:
+            site = self.sites[host] = {'docs': 0, 'df': array('I'), 'tf': array('Q')}
+        return site
+
+    def _term_id(self, term):
+        term_id = self.vocab.get(term)
+        if term_id is None:
+            term_id = self.vocab[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def add_page(self, url, counts):
+        """Index a page's term counts; returns its page number."""
+        host = result_host(url)
+        site = self._site(host)
+        df = site['df']
+        tf = site['tf']
+
+        term_id = self._term_id
+        ids = [term_id(term) for term in counts]
+        if len(df) < len(self.terms):
+            grow = len(self.terms) - len(df)
+            df.extend(array('I', bytes(df.itemsize * grow)))
+            tf.extend(array('Q', bytes(tf.itemsize * grow)))
+
+        for tid, count in zip(ids, counts.values()):
+            df[tid] += 1
+            tf[tid] += count
+        site['docs'] += 1
+
+        kept = counts.most_common(MAX_TERMS_PER_PAGE)
+        vector_ids = array('I', (self.vocab[term] for term, _ in kept))
+        vector_counts = array('I', (count for _, count in kept))
+        self.pages.append((host, vector_ids, vector_counts))
+        self.page_ids[url] = len(self.pages) - 1
+        return len(self.pages) - 1
+
+    def page_keywords(self, page, limit=15):
+        """
+        TF-IDF keywords for one indexed page.
+        Sites with a single page fall back to raw frequency (IDF is meaningless).
+        """
+        host, ids, counts = self.pages[page]
+        site = self.sites[host]
+        docs = site['docs']
+        total = sum(counts) or 1
+        terms = self.terms
+
+        if docs < 2:
+            ranked = [(count / total, tid, count) for tid, count in zip(ids, counts)]
+        else:
+            df = site['df']
+            ranked = []
+            for tid, count in zip(ids, counts):
+                idf = math.log((1 + docs) / (1 + df[tid]))
+                if idf > 0:
+                    ranked.append((count / total * idf, tid, count))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+
+        return [
+            {'keyword': terms[tid], 'count': count, 'score': round(weight, 4)}
+            for weight, tid, count in ranked[:limit]
+        ]
+
+    def keywords_for_url(self, url, limit=15):
+        page = self.page_ids.get(url)
+        if page is None:
+            return []
+        return self.page_keywords(page, limit)
+
+    def site_stats(self, limit=10):
+        """Site-wide term statistics: the most widespread and most frequent terms per site."""
+        stats = {}
+        terms = self.terms
+        for host, site in self.sites.items():
+            docs = site['docs']
+            df = site['df']
+            tf = site['tf']
+            widespread = heapq.nlargest(limit, range(len(df)), key=df.__getitem__)
+            frequent = heapq.nlargest(limit, range(len(tf)), key=tf.__getitem__)
+            stats[host] = {
+                'pages': docs,
+                'common_terms': [
+                    {'term': terms[tid], 'pages': df[tid], 'coverage': round(df[tid] / docs, 3)}
+                    for tid in widespread if df[tid]
+                ],
+                'frequent_terms': [
+                    {'term': terms[tid], 'count': tf[tid]}
+                    for tid in frequent if tf[tid]
+                ],
+            }
+        return stats
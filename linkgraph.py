@@ -0,0 +1,194 @@
+"""
+ZenStatus - Link Graph
+======================
+Site-wide internal link graph for an audit job.
+
+URLs are interned to integer node IDs (normalized with the crawler's
+normalize_url) and edges are appended to two flat array('I') columns as
+pages finish. analyze() turns them into CSR adjacency (offsets + targets)
+with a counting sort, so 100k pages with millions of links cost a few bytes
+per edge. On that graph it computes:
+
+- internal PageRank (power iteration pulling over the reverse CSR),
+- click depth (breadth-first search from each site's homepage),
+- orphan pages (sitemap URLs no audited page links to).
+"""
+
+from array import array
+from collections import deque
+from urllib.parse import urlparse
+
+from crawler import normalize_url
+
+
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+# URLs listed per section of the graph summary
+MAX_LISTED_URLS = 100
+
+
+def build_csr(sources, targets, node_count):
+    """Counting-sort an edge list into CSR form: (offsets, targets) with offsets of length n + 1."""
+    offsets = array('Q', bytes(8 * (node_count + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    for node in range(node_count):
+        offsets[node + 1] += offsets[node]
+    position = array('Q', offsets[:-1])
+    ordered = array('I', bytes(4 * len(targets)))
+    for source, target in zip(sources, targets):
+        ordered[position[source]] = target
+        position[source] += 1
+    return offsets, ordered
+
+
+class LinkGraph:
+    """
+    Internal link graph for one audit job.
+
+    add_page() records an audited page and its (deduplicated) internal link
+    targets; analyze() computes PageRank, click depth and orphans once the
+    job is complete, after which page_metrics() returns per-page values.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.urls = []
+        self.sources = array('I')
+        self.targets = array('I')
+        self.audited = set()
+        self.metrics = None
+
+    def _node(self, url):
+        norm = normalize_url(url) if url else None
+        if not norm:
+            return None
+        node = self.ids.get(norm)
+        if node is None:
+            node = self.ids[norm] = len(self.urls)
+            self.urls.append(norm)
+        return node
+
+    def add_page(self, url, links=(), final_url=None):
+        """Record an audited page and the internal links found on it."""
+        node = self._node(url)
+        if node is None:
+            return None
+        self.audited.add(node)
+        if final_url:
+            # Links pointing at the redirect target count as links to this page
+            final = normalize_url(final_url)
+            if final and final not in self.ids:
+                self.ids[final] = node
+
+        linked = set()
+        for link in links or ():
+            target = self._node(link)
+            if target is not None and target != node:
+                linked.add(target)
+        self.sources.extend([node] * len(linked))
+        self.targets.extend(linked)
+        return node
+
+    def _pagerank(self, out_degree, reverse_offsets, reverse_targets):
+        n = len(self.urls)
+        rank = [1.0 / n] * n
+        dangling = [node for node in range(n) if not out_degree[node]]
+        for _ in range(MAX_ITERATIONS):
+            contrib = [r / d if d else 0.0 for r, d in zip(rank, out_degree)]
+            base = (1 - DAMPING) / n + DAMPING * sum(rank[node] for node in dangling) / n
+            pull = contrib.__getitem__
+            new_rank = [
+                base + DAMPING * sum(map(pull, reverse_targets[reverse_offsets[node]:reverse_offsets[node + 1]]))
+                for node in range(n)
+            ]
+            delta = sum(abs(a - b) for a, b in zip(new_rank, rank))
+            rank = new_rank
+            if delta < TOLERANCE:
+                break
+        return rank
+
+    def _click_depths(self, offsets, targets):
+        n = len(self.urls)
+        depths = array('i', [-1]) * n
+        queue = deque()
+        # One homepage lookup per site, not per audited page
+        sites = {(parsed.scheme, parsed.netloc) for parsed in (urlparse(self.urls[node]) for node in self.audited)}
+        for scheme, netloc in sites:
+            home = self.ids.get(normalize_url(f"{scheme}://{netloc}/") or '')
+            if home is not None and depths[home] < 0:
+                depths[home] = 0
+                queue.append(home)
+        while queue:
+            node = queue.popleft()
+            depth = depths[node] + 1
+            for target in targets[offsets[node]:offsets[node + 1]]:
+                if depths[target] < 0:
+                    depths[target] = depth
+                    queue.append(target)
+        return depths
+
+    def analyze(self, sitemap_urls=()):
+        """Compute PageRank, click depth and orphans; returns the job-level graph summary."""
+        n = len(self.urls)
+        if not n:
+            self.metrics = None
+            return {'nodes': 0, 'edges': 0, 'orphan_count': 0, 'orphans': [], 'top_pages': [],
+                    'depth_distribution': {}, 'unreachable': 0}
+
+        offsets, targets = build_csr(self.sources, self.targets, n)
+        reverse_offsets, reverse_targets = build_csr(self.targets, self.sources, n)
+        out_degree = [offsets[node + 1] - offsets[node] for node in range(n)]
+        in_degree = [reverse_offsets[node + 1] - reverse_offsets[node] for node in range(n)]
+
+        rank = self._pagerank(out_degree, reverse_offsets, reverse_targets)
+        depths = self._click_depths(offsets, targets)
+
+        orphans = set()
+        for url in sitemap_urls:
+            norm = normalize_url(url)
+            node = self.ids.get(norm) if norm else None
+            if node is not None and not in_degree[node] and depths[node] != 0:
+                orphans.add(node)
+
+        self.metrics = (rank, depths, in_degree, orphans)
+
+        depth_distribution = {}
+        unreachable = 0
+        for node in sorted(self.audited):
+            if depths[node] < 0:
+                unreachable += 1
+            else:
+                depth_distribution[depths[node]] = depth_distribution.get(depths[node], 0) + 1
+        top = sorted(self.audited, key=rank.__getitem__, reverse=True)[:10]
+
+        return {
+            'nodes': n,
+            'edges': len(targets),
+            'orphan_count': len(orphans),
+            'orphans': [self.urls[node] for node in sorted(orphans)[:MAX_LISTED_URLS]],
+            'top_pages': [
+                {'url': self.urls[node], 'pagerank': round(rank[node] * n, 3), 'inlinks': in_degree[node]}
+                for node in top
+            ],
+            'depth_distribution': {str(depth): count for depth, count in sorted(depth_distribution.items())},
+            'unreachable': unreachable,
+        }
+
+    def page_metrics(self, url):
+        """
+        Per-page graph values after analyze(): inlinks, pagerank (1.0 is the
+        job average), click_depth (None if not reachable from a homepage) and is_orphan.
+        """
+        norm = normalize_url(url) if url else None
+        node = self.ids.get(norm) if norm else None
+        if node is None or self.metrics is None:
+            return {}
+        rank, depths, in_degree, orphans = self.metrics
+        return {
+            'inlinks': in_degree[node],
+            'pagerank': round(rank[node] * len(self.urls), 3),
+            'click_depth': depths[node] if depths[node] >= 0 else None,
+            'is_orphan': node in orphans,
+        }
@@ -0,0 +1,128 @@
+"""
+ZenStatus - Result Cache
+========================
+Process-wide sharing of page results between jobs.
+
+When several jobs (overlapping audits, a status check next to an audit)
+ask for the same URL at the same time, only the first request goes to the
+network; the others wait for it and get a copy of its result. Finished
+results are kept for a short time (ZENSTATUS_CACHE_TTL seconds, default
+60; 0 keeps nothing) in a bounded LRU, so a job started right after
+another reuses its pages. Callers get their own copy of a result, as jobs
+add fields to the results they receive.
+"""
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+DEFAULT_TTL = 60.0
+
+
+class ResultCache:
+    """Thread-safe LRU of results with a TTL, coalescing concurrent computations of a key."""
+
+    def __init__(self, max_entries=1000, ttl=DEFAULT_TTL):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        # key -> [future, number of callers waiting on it]
+        self.in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key, compute, cacheable=None):
+        """
+        The result for key: a fresh cached copy, a copy of the result of a
+        computation already running for key, or compute() (kept if
+        cacheable(result) is true).
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(value)
+                del self.entries[key]
+            flight = self.in_flight.get(key)
+            if flight is None:
+                flight = self.in_flight[key] = [Future(), 0]
+                leader = True
+                self.misses += 1
+            else:
+                flight[1] += 1
+                leader = False
+                self.coalesced += 1
+
+        if not leader:
+            return copy.deepcopy(flight[0].result())
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self.lock:
+                del self.in_flight[key]
+            flight[0].set_exception(exc)
+            raise
+
+        keep = self.ttl > 0 and (cacheable is None or cacheable(value))
+        with self.lock:
+            del self.in_flight[key]
+            waiters = flight[1]
+        # The caller gets the result itself; what is shared is a copy it cannot change
+        shared = copy.deepcopy(value) if keep or waiters else None
+        if keep:
+            with self.lock:
+                self.entries[key] = (time.monotonic() + self.ttl, shared)
+                self.entries.move_to_end(key)
+                self._prune()
+        flight[0].set_result(shared)
+        return value
+
+    def _prune(self):
+        # Caller holds the lock: drop least recently used entries beyond
+        # max_entries, and expired ones at the front
+        now = time.monotonic()
+        while self.entries:
+            key, (expires, _) = next(iter(self.entries.items()))
+            if expires > now and len(self.entries) <= self.max_entries:
+                break
+            del self.entries[key]
+            if expires > now:
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self.lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_rate': round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                'entries': len(self.entries),
+                'in_flight': len(self.in_flight),
+                'evictions': self.evictions,
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+            }
+
+
+def configured_ttl():
+    try:
+        return max(0.0, float(os.environ.get('ZENSTATUS_CACHE_TTL', DEFAULT_TTL)))
+    except ValueError:
+        return DEFAULT_TTL
@@ -0,0 +1,121 @@
+"""
+ZenStatus - robots.txt
+======================
+robots.txt parsing and matching (RFC 9309).
+
+A site's robots.txt is compiled once into a RobotsMatcher for our user
+agent: the applicable group is selected, rules are ordered by specificity
+(longest pattern first, Allow winning ties) and wildcard patterns are
+compiled to regexes, so checking a URL is a short scan of prefix tests.
+The matcher is cached with the site info and used to filter sitemap and
+crawl URLs before they are fetched.
+"""
+
+import re
+from urllib.parse import urlparse
+
+
+# Product token matched against User-agent lines (falls back to the '*' group)
+ROBOTS_USER_AGENT = 'zenstatus'
+# Crawl-delay values above this many seconds are capped
+MAX_CRAWL_DELAY = 10.0
+
+
+def _compile_pattern(pattern):
+    """Regex for a pattern using '*' (any sequence) and a trailing '$' (end of URL)."""
+    anchored = pattern.endswith('$')
+    if anchored:
+        pattern = pattern[:-1]
+    regex = '.*'.join(re.escape(part) for part in pattern.split('*'))
+    return re.compile(regex + ('$' if anchored else ''))
+
+
+def parse_robots(text):
+    """
+    Parse robots.txt into (groups, sitemaps).
+    Each group is {'agents': [...], 'rules': [(allow, pattern), ...], 'crawl_delay': float|None}.
+    """
+    groups = []
+    sitemaps = []
+    current = None
+    in_agents = False
+
+    for raw_line in text.splitlines():
+        line = raw_line.split('#', 1)[0].strip()
+        if ':' not in line:
+            continue
+        key, value = line.split(':', 1)
+        key = key.strip().lower()
+        value = value.strip()
+
+        if key == 'user-agent':
+            if current is None or not in_agents:
+                current = {'agents': [], 'rules': [], 'crawl_delay': None}
+                groups.append(current)
+            current['agents'].append(value.lower())
+            in_agents = True
+        elif key in ('allow', 'disallow'):
+            in_agents = False
+            if current is not None and value:
+                current['rules'].append((key == 'allow', value))
+        elif key == 'crawl-delay':
+            in_agents = False
+            if current is not None:
+                try:
+                    current['crawl_delay'] = float(value)
+                except ValueError:
+                    pass
+        elif key == 'sitemap':
+            if value:
+                sitemaps.append(value)
+
+    return groups, sitemaps
+
+
+class RobotsMatcher:
+    """Compiled robots.txt rules for one site and user agent."""
+
+    def __init__(self, rules=(), crawl_delay=None, sitemaps=()):
+        compiled = []
+        for allow, pattern in rules:
+            if '*' in pattern or pattern.endswith('$'):
+                compiled.append((len(pattern), allow, None, _compile_pattern(pattern)))
+            else:
+                compiled.append((len(pattern), allow, pattern, None))
+        # Most specific rule first; on equal length the Allow rule wins
+        compiled.sort(key=lambda rule: (-rule[0], not rule[1]))
+        self.rules = compiled
+        self.crawl_delay = min(crawl_delay, MAX_CRAWL_DELAY) if crawl_delay and crawl_delay > 0 else None
+        self.sitemaps = list(sitemaps)
+
+    @classmethod
+    def from_text(cls, text, user_agent=ROBOTS_USER_AGENT):
+        groups, sitemaps = parse_robots(text)
+        user_agent = user_agent.lower()
+        selected = [g for g in groups if user_agent in g['agents']]
+        if not selected:
+            selected = [g for g in groups if '*' in g['agents']]
+        rules = [rule for group in selected for rule in group['rules']]
+        delays = [g['crawl_delay'] for g in selected if g['crawl_delay'] is not None]
+        return cls(rules, max(delays) if delays else None, sitemaps)
+
+    def allowed(self, url):
+        """True if the URL may be fetched."""
+        if not self.rules:
+            return True
+        parsed = urlparse(url)
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+        if path == '/robots.txt':
+            return True
+        for _, allow, prefix, regex in self.rules:
+            if regex is None:
+                if path.startswith(prefix):
+                    return allow
+            elif regex.match(path):
+                return allow
+        return True
+
+
+ALLOW_ALL = RobotsMatcher()
@@ -0,0 +1,367 @@
+"""
+ZenStatus - Warning Rules
+=========================
+Declarative SEO warning rules evaluated over raw page metrics.
+
+Each rule names the metric columns it reads, a check against the active
+thresholds and a message template. The same rule set is used for a single
+page while auditing (evaluate_row) and in bulk over a columnar table of
+stored results (evaluate_table), so changing a threshold only needs a
+re-evaluation, never a re-crawl.
+"""
+
+import re
+from urllib.parse import urlparse
+
+
+DEFAULT_THRESHOLDS = {
+    'title_min': 30,
+    'title_max': 60,
+    'description_min': 120,
+    'description_max': 160,
+    'min_words': 300,
+    'h2_min_words': 300,
+    'max_not_lazy_images': 3,
+    'max_redirect_hops': 1,
+    'max_page_kb': 500,
+    'max_url_length': 75,
+    'max_response_time': 3.0,
+    'max_ttfb': 1.5,
+    'max_render_blocking': 3,
+}
+
+
+# Rules are evaluated in order; warnings keep this order on every page.
+# 'fields' are passed positionally to 'check' (after the thresholds) and to
+# 'message'.format() (alongside the thresholds as keyword arguments).
+RULES = [
+    # Title
+    {'id': 'title_missing', 'fields': ('title_length',),
+     'check': lambda t, n: n == 0,
+     'message': 'Missing title'},
+    {'id': 'title_short', 'fields': ('title_length',),
+     'check': lambda t, n: 0 < n < t['title_min'],
+     'message': 'Title too short (< {title_min} chars)'},
+    {'id': 'title_long', 'fields': ('title_length',),
+     'check': lambda t, n: n > t['title_max'],
+     'message': 'Title too long (> {title_max} chars)'},
+    # Meta description
+    {'id': 'description_missing', 'fields': ('meta_description_length',),
+     'check': lambda t, n: n == 0,
+     'message': 'Missing meta description'},
+    {'id': 'description_short', 'fields': ('meta_description_length',),
+     'check': lambda t, n: 0 < n < t['description_min'],
+     'message': 'Description too short (< {description_min} chars)'},
+    {'id': 'description_long', 'fields': ('meta_description_length',),
+     'check': lambda t, n: n > t['description_max'],
+     'message': 'Description too long (> {description_max} chars)'},
+    # Headings
+    {'id': 'h1_missing', 'fields': ('h1_count',),
+     'check': lambda t, n: n == 0,
+     'message': 'Missing H1'},
+    {'id': 'h1_multiple', 'fields': ('h1_count',),
+     'check': lambda t, n: n > 1,
+     'message': 'Multiple H1 tags ({0})'},
+    {'id': 'h2_missing', 'fields': ('h2_count', 'word_count'),
+     'check': lambda t, h2, words: h2 == 0 and words > t['h2_min_words'],
+     'message': 'No H2 headings for content structure'},
+    # Technical SEO
+    {'id': 'canonical_missing', 'fields': ('canonical',),
+     'check': lambda t, canonical: not canonical,
+     'message': 'No canonical tag'},
+    {'id': 'noindex', 'fields': ('robots',),
+     'check': lambda t, robots: 'noindex' in (robots or ''),
+     'message': 'Noindex set'},
+    {'id': 'no_https', 'fields': ('https',),
+     'check': lambda t, https: not https,
+     'message': 'Not using HTTPS'},
+    # Content
+    {'id': 'images_missing_alt', 'fields': ('images_missing_alt',),
+     'check': lambda t, n: n > 0,
+     'message': 'Images missing alt text ({0})'},
+    {'id': 'thin_content', 'fields': ('word_count',),
+     'check': lambda t, n: n < t['min_words'],
+     'message': 'Thin content (< {min_words} words)'},
+    # Image optimization
+    {'id': 'images_no_dimensions', 'fields': ('images_no_dimensions', 'total_images'),
+     'check': lambda t, n, total: n > 0 and total > 0,
+     'message': 'Images without dimensions ({0}) - affects CLS'},
+    {'id': 'images_not_lazy', 'fields': ('images_not_lazy',),
+     'check': lambda t, n: n > t['max_not_lazy_images'],
+     'message': 'Images not lazy-loaded ({0})'},
+    # Links & redirects
+    {'id': 'broken_links', 'fields': ('broken_links',),
+     'check': lambda t, n: n > 0,
+     'message': 'Broken internal links found ({0})'},
+    {'id': 'redirect_chain', 'fields': ('redirect_count',),
+     'check': lambda t, n: n > t['max_redirect_hops'],
+     'message': 'Redirect chain ({0} hops)'},
+    # Site-level
+    {'id': 'robots_txt_missing', 'fields': ('has_robots_txt',),
+     'check': lambda t, present: not present,
+     'message': 'No robots.txt file'},
+    {'id': 'sitemap_missing', 'fields': ('has_sitemap',),
+     'check': lambda t, present: not present,
+     'message': 'No sitemap.xml found'},
+    # Page size & URL structure
+    {'id': 'large_page', 'fields': ('page_size_kb',),
+     'check': lambda t, kb: kb > t['max_page_kb'],
+     'message': 'Large page size ({0:.0f}KB)'},
+    {'id': 'url_too_long', 'fields': ('url_length',),
+     'check': lambda t, n: n > t['max_url_length'],
+     'message': 'URL too long (> {max_url_length} chars)'},
+    {'id': 'url_underscores', 'fields': ('url_has_underscores',),
+     'check': lambda t, flag: bool(flag),
+     'message': 'URL contains underscores (use hyphens)'},
+    # Response time
+    {'id': 'slow_response', 'fields': ('response_seconds',),
+     'check': lambda t, secs: secs is not None and secs > t['max_response_time'],
+     'message': 'Slow response ({0:.1f}s)'},
+    # Mobile, language, social, schema
+    {'id': 'viewport_missing', 'fields': ('has_viewport',),
+     'check': lambda t, present: not present,
+     'message': 'Missing viewport meta tag'},
+    {'id': 'lang_missing', 'fields': ('has_lang',),
+     'check': lambda t, present: not present,
+     'message': 'Missing lang attribute on HTML'},
+    {'id': 'og_missing', 'fields': ('has_og_tags',),
+     'check': lambda t, present: not present,
+     'message': 'No Open Graph tags'},
+    {'id': 'schema_missing', 'fields': ('has_schema',),
+     'check': lambda t, present: not present,
+     'message': 'No structured data (schema.org)'},
+    # Core Web Vitals proxies
+    {'id': 'render_blocking', 'fields': ('render_blocking_count',),
+     'check': lambda t, n: n > t['max_render_blocking'],
+     'message': 'Many render-blocking resources ({0})'},
+    {'id': 'slow_ttfb', 'fields': ('ttfb_estimate',),
+     'check': lambda t, secs: secs > t['max_ttfb'],
+     'message': 'Slow TTFB ({0:.2f}s) - consider CDN/caching'},
+    # Job-level (set after auditing); also applies to pages that failed to load
+    {'id': 'duplicate_url', 'fields': ('duplicate_of',),
+     'check': lambda t, dup: bool(dup),
+     'message': 'Duplicate URL', 'job_level': True},
+    {'id': 'duplicate_title', 'fields': ('duplicate_title_of',),
+     'check': lambda t, dup: bool(dup),
+     'message': 'Duplicate title', 'job_level': True},
+    {'id': 'duplicate_description', 'fields': ('duplicate_description_of',),
+     'check': lambda t, dup: bool(dup),
+     'message': 'Duplicate meta description', 'job_level': True},
+    {'id': 'near_duplicate', 'fields': ('near_duplicate_of',),
+     'check': lambda t, dup: bool(dup),
+     'message': 'Near-duplicate content', 'job_level': True},
+]
+
+
+# Columns kept per result in a ResultTable: every rule input plus the
+# fields needed to score and summarize a page without the original dict.
+TABLE_COLUMNS = (
+    'url', 'host', 'status_code', 'status_message', 'response_time', 'response_seconds',
+    'title', 'title_length', 'meta_description', 'meta_description_length',
+    'h1_count', 'h2_count', 'word_count', 'canonical', 'robots', 'https',
+    'images_missing_alt', 'images_no_dimensions', 'images_not_lazy', 'total_images',
+    'broken_links', 'redirect_count', 'has_robots_txt', 'has_sitemap',
+    'page_size_kb', 'url_length', 'url_has_underscores', 'has_viewport', 'has_lang',
+    'has_og_tags', 'has_schema', 'has_twitter_cards', 'render_blocking_count',
+    'ttfb_estimate', 'duplicate_of', 'duplicate_title_of', 'duplicate_description_of',
+    'near_duplicate_of',
+)
+
+NUMERIC_COLUMNS = {
+    'title_length', 'meta_description_length', 'h1_count', 'h2_count', 'word_count',
+    'images_missing_alt', 'images_no_dimensions', 'images_not_lazy', 'total_images',
+    'broken_links', 'redirect_count', 'page_size_kb', 'url_length',
+    'render_blocking_count', 'ttfb_estimate',
+}
+
+
+JOB_LEVEL_MESSAGES = frozenset(rule['message'] for rule in RULES if rule.get('job_level'))
+
+
+def resolve_thresholds(overrides=None):
+    """Merge threshold overrides onto the defaults, ignoring unknown or non-numeric values."""
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for key, value in (overrides or {}).items():
+        if key not in thresholds or isinstance(value, bool):
+            continue
+        try:
+            thresholds[key] = type(DEFAULT_THRESHOLDS[key])(value)
+        except (TypeError, ValueError):
+            continue
+    return thresholds
+
+
+def describe_rules():
+    """Public description of the rule set (ids, inputs and message templates)."""
+    return [
+        {'id': rule['id'], 'fields': list(rule['fields']), 'message': rule['message']}
+        for rule in RULES
+    ]
+
+
+def is_fetched(result):
+    """True when the page was actually fetched (error results carry 'N/A' status codes)."""
+    status_code = result.get('status_code')
+    return isinstance(status_code, int) and not isinstance(status_code, bool)
+
+
+def result_host(url):
+    """Hostname used to group results per site."""
+    try:
+        return urlparse(url).hostname or 'unknown'
+    except Exception:
+        return 'unknown'
+
+
+def _column_value(result, name):
+    if name == 'host':
+        return result_host(result.get('url', ''))
+    if name == 'response_seconds':
+        try:
+            return float(str(result.get('response_time', '')).rstrip('s'))
+        except ValueError:
+            return None
+    value = result.get(name)
+    if value is None and name in NUMERIC_COLUMNS:
+        return 0
+    return value
+
+
+def evaluate_row(result, thresholds=None):
+    """Evaluate page-level rules for a single fetched result and return its warnings."""
+    t = resolve_thresholds(thresholds)
+    warnings = []
+    for rule in RULES:
+        if rule.get('job_level'):
+            continue
+        values = [_column_value(result, field) for field in rule['fields']]
+        if rule['check'](t, *values):
+            warnings.append(rule['message'].format(*values, **t))
+    return warnings
+
+
+def failed_rules(result, thresholds=None):
+    """Ids of the page-level rules a single fetched result fails (evaluate_row() by rule)."""
+    t = resolve_thresholds(thresholds)
+    failed = []
+    for rule in RULES:
+        if rule.get('job_level'):
+            continue
+        values = [_column_value(result, field) for field in rule['fields']]
+        if rule['check'](t, *values):
+            failed.append(rule['id'])
+    return failed
+
+
+# Page-specific values in a message, e.g. ' ({0})' or ' ({0:.0f}KB)'
+_VALUE_PATTERN = re.compile(r' \(\{0[^)]*\)')
+
+
+def rule_label(rule_id, thresholds=None):
+    """A rule's message without page-specific values ('Images missing alt text')."""
+    t = resolve_thresholds(thresholds)
+    rule = next(rule for rule in RULES if rule['id'] == rule_id)
+    return _VALUE_PATTERN.sub('', rule['message']).format(**t)
+
+
+def evaluate_job_rules(result, thresholds=None):
+    """Evaluate job-level rules (duplicates found across pages) for a single result."""
+    t = resolve_thresholds(thresholds)
+    warnings = []
+    for rule in RULES:
+        if not rule.get('job_level'):
+            continue
+        values = [_column_value(result, field) for field in rule['fields']]
+        if rule['check'](t, *values):
+            warnings.append(rule['message'].format(*values, **t))
+    return warnings
+
+
+class ResultTable:
+    """
+    Columnar store of raw audit metrics.
+
+    One list per column keeps a 10k-page audit compact and lets each rule run
+    as a single pass over just the columns it needs.
+    """
+
+    def __init__(self):
+        self.columns = {name: [] for name in TABLE_COLUMNS}
+        self.fetched = []
+        self.base_warnings = []
+
+    def __len__(self):
+        return len(self.fetched)
+
+    def append(self, result):
+        """Add a result; returns its row index."""
+        fetched = is_fetched(result)
+        for name, column in self.columns.items():
+            column.append(_column_value(result, name))
+        self.fetched.append(fetched)
+        # Pages that failed to load keep their error warnings ('Timeout', ...)
+        if fetched:
+            self.base_warnings.append(())
+        else:
+            self.base_warnings.append(tuple(
+                w for w in (result.get('warnings') or []) if w not in JOB_LEVEL_MESSAGES
+            ))
+        return len(self.fetched) - 1
+
+    def set(self, index, name, value):
+        self.columns[name][index] = value
+
+    def column(self, name):
+        return self.columns[name]
+
+    def row(self, index):
+        """Rebuild a result-shaped dict for one row."""
+        return {name: column[index] for name, column in self.columns.items()}
+
+    def rows(self):
+        for index in range(len(self)):
+            yield self.row(index)
+
+
+def evaluate_table(table, thresholds=None):
+    """
+    Evaluate every rule column-wise over a ResultTable.
+    Returns one warnings list per row, in row order.
+    """
+    t = resolve_thresholds(thresholds)
+    warnings = [list(base) for base in table.base_warnings]
+    fetched = table.fetched
+
+    for rule in RULES:
+        columns = [table.column(field) for field in rule['fields']]
+        check = rule['check']
+        message = rule['message']
+        job_level = rule.get('job_level', False)
+        if len(columns) == 1:
+            # Single-column rules (the common case) skip building value tuples
+            hits = [
+                (index, (value,))
+                for index, value in enumerate(columns[0])
+                if (job_level or fetched[index]) and check(t, value)
+            ]
+        else:
+            hits = [
+                (index, values)
+                for index, values in enumerate(zip(*columns))
+                if (job_level or fetched[index]) and check(t, *values)
+            ]
+        if not hits:
+            continue
+        if '{0' in message:
+            # Value-dependent messages repeat heavily across pages; format each distinct one once
+            formatted = {}
+            for index, values in hits:
+                text = formatted.get(values)
+                if text is None:
+                    text = formatted[values] = message.format(*values, **t)
+                warnings[index].append(text)
+        else:
+            text = message.format(**t)
+            for index, _ in hits:
+                warnings[index].append(text)
+    return warnings
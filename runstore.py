@@ -0,0 +1,247 @@
+"""
+ZenStatus - Run Store
+=====================
+Finished audit runs kept on disk so they can be compared later.
+
+Each run's pages are stored one row each: the full result as JSON plus
+the few fields a diff needs (normalized URL, score, response time, status,
+warnings) in plain columns, so diffing reads no JSON. diff_runs() loads
+the base run into a dict keyed by normalized URL, streams the other run
+through it and yields one record per difference, which keeps two
+50k-page runs well under a second.
+
+The store is chosen with ZENSTATUS_RUNS (a sqlite:// URL like the work
+queue's); by default runs go to zenstatus-runs.db in the working
+directory, and ZENSTATUS_RUNS=off disables storing.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from crawler import normalize_url
+from rules import result_host
+
+
+# Oldest runs are deleted beyond this many
+MAX_STORED_RUNS = 50
+DEFAULT_RUN_STORE = 'sqlite:///zenstatus-runs.db'
+
+# Default regression thresholds for diff_runs()
+MIN_SCORE_DROP = 1
+MIN_RESPONSE_INCREASE = 0.5
+
+
+class SQLiteRunStore:
+    """Audit runs in a SQLite database file (one connection per thread)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self._db().executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                created REAL NOT NULL,
+                seeds TEXT NOT NULL,
+                pages INTEGER NOT NULL,
+                avg_score REAL,
+                cancelled INTEGER NOT NULL DEFAULT 0,
+                summary TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                run_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                url_key TEXT NOT NULL,
+                score REAL,
+                response_seconds REAL,
+                status_code TEXT,
+                warnings TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (run_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS pages_url ON pages (run_id, url_key);
+        """)
+
+    def _db(self):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            # Same host key as the per-site grouping of exports
+            db.create_function('result_host', 1, result_host, deterministic=True)
+            self.local.db = db
+        return db
+
+    def save_run(self, run_id, seeds, final):
+        """Store a finished job (the dict returned by AuditJob.finish()) under run_id."""
+        summary = final.get('summary') or {}
+        rows = (
+            (run_id, seq, result.get('url', ''), _url_key(result.get('url', '')), result.get('seo_score'),
+             _response_seconds(result), str(result.get('status_code', '')),
+             '\n'.join(sorted(result.get('warnings') or [])), json.dumps(result))
+            for seq, result in enumerate(final.get('results') or [])
+        )
+        db = self._db()
+        with db:
+            db.execute('DELETE FROM pages WHERE run_id = ?', (run_id,))
+            db.execute(
+                'INSERT OR REPLACE INTO runs (run_id, created, seeds, pages, avg_score, cancelled, summary) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (run_id, time.time(), json.dumps(list(seeds)[:20]), len(final.get('results') or []),
+                 summary.get('avg_score'), int(bool(final.get('cancelled'))), json.dumps(summary))
+            )
+            db.executemany('INSERT INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            stale = [row[0] for row in db.execute(
+                'SELECT run_id FROM runs ORDER BY created DESC LIMIT -1 OFFSET ?', (MAX_STORED_RUNS,)
+            )]
+            for stale_id in stale:
+                db.execute('DELETE FROM pages WHERE run_id = ?', (stale_id,))
+                db.execute('DELETE FROM runs WHERE run_id = ?', (stale_id,))
+
+    def list_runs(self, limit=MAX_STORED_RUNS):
+        """Stored runs, newest first, without their pages."""
+        rows = self._db().execute(
+            'SELECT run_id, created, seeds, pages, avg_score, cancelled FROM runs ORDER BY created DESC LIMIT ?',
+            (limit,)
+        ).fetchall()
+        return [_run_info(row) for row in rows]
+
+    def get_run(self, run_id):
+        """A run's info and summary, or None."""
+        row = self._db().execute(
+            'SELECT run_id, created, seeds, pages, avg_score, cancelled, summary FROM runs WHERE run_id = ?',
+            (run_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        info = _run_info(row[:6])
+        info['summary'] = json.loads(row[6])
+        return info
+
+    def iter_results(self, run_id, by_host=False):
+        """
+        A run's full results, read row by row: in stored order, or with
+        by_host grouped by host (rules.result_host(), then normalized URL
+        without the scheme).
+        """
+        order = "result_host(url), substr(url_key, instr(url_key, '://') + 3), seq" if by_host else 'seq'
+        cursor = self._db().execute(f'SELECT payload FROM pages WHERE run_id = ? ORDER BY {order}', (run_id,))
+        for (payload,) in cursor:
+            yield json.loads(payload)
+
+    def iter_diff_rows(self, run_id):
+        """(url, url_key, score, response_seconds, status_code, warnings) per page of a run."""
+        return self._db().execute(
+            'SELECT url, url_key, score, response_seconds, status_code, warnings FROM pages WHERE run_id = ?',
+            (run_id,)
+        )
+
+
+def _url_key(url):
+    return normalize_url(url) or url
+
+
+def _response_seconds(result):
+    try:
+        return float(str(result.get('response_time', '')).rstrip('s'))
+    except ValueError:
+        return None
+
+
+def _run_info(row):
+    run_id, created, seeds, pages, avg_score, cancelled = row
+    return {
+        'run_id': run_id, 'created': created, 'seeds': json.loads(seeds), 'pages': pages,
+        'avg_score': avg_score, 'cancelled': bool(cancelled)
+    }
+
+
+def _split_warnings(text):
+    return set(text.split('\n')) if text else set()
+
+
+def diff_runs(store, base_id, head_id, min_score_drop=MIN_SCORE_DROP, min_response_increase=MIN_RESPONSE_INCREASE):
+    """
+    Compare two stored runs page by page (joined on normalized URL). Yields
+    records: 'added' and 'removed' pages, 'changed' pages (warnings added or
+    resolved, status change, score or response-time regression or
+    improvement), then one 'summary' with the counts.
+    """
+    # Hash index of the base run; matched entries are popped so what is left was removed
+    base = {}
+    for url, url_key, score, seconds, status, warnings in store.iter_diff_rows(base_id):
+        base[url_key] = (url, score, seconds, status, warnings)
+
+    counts = {
+        'added': 0, 'removed': 0, 'changed': 0, 'unchanged': 0,
+        'warnings_added': 0, 'warnings_resolved': 0,
+        'score_regressions': 0, 'response_regressions': 0
+    }
+    for url, url_key, score, seconds, status, warnings in store.iter_diff_rows(head_id):
+        old = base.pop(url_key, None)
+        if old is None:
+            counts['added'] += 1
+            yield {'type': 'added', 'url': url, 'seo_score': score, 'status_code': status}
+            continue
+
+        _, old_score, old_seconds, old_status, old_warnings = old
+        # Warnings are stored sorted; runs stored before that may differ in order only
+        same_warnings = warnings == old_warnings or _split_warnings(warnings) == _split_warnings(old_warnings)
+        if same_warnings and score == old_score and status == old_status and (
+                seconds is None or old_seconds is None or abs(seconds - old_seconds) < min_response_increase):
+            counts['unchanged'] += 1
+            continue
+
+        record = {'type': 'changed', 'url': url}
+        if not same_warnings:
+            new_set, old_set = _split_warnings(warnings), _split_warnings(old_warnings)
+            record['warnings_added'] = sorted(new_set - old_set)
+            record['warnings_resolved'] = sorted(old_set - new_set)
+            counts['warnings_added'] += len(record['warnings_added'])
+            counts['warnings_resolved'] += len(record['warnings_resolved'])
+        if status != old_status:
+            record['status_code'] = [old_status, status]
+        if score is not None and old_score is not None and score != old_score:
+            record['score'] = [old_score, score]
+            if old_score - score >= min_score_drop:
+                record['score_regression'] = True
+                counts['score_regressions'] += 1
+        if seconds is not None and old_seconds is not None and abs(seconds - old_seconds) >= min_response_increase:
+            record['response_seconds'] = [old_seconds, seconds]
+            if seconds > old_seconds:
+                record['response_regression'] = True
+                counts['response_regressions'] += 1
+        counts['changed'] += 1
+        yield record
+
+    for url, score, _, status, _ in base.values():
+        counts['removed'] += 1
+        yield {'type': 'removed', 'url': url, 'seo_score': score, 'status_code': status}
+
+    yield {'type': 'summary', 'base': base_id, 'head': head_id, **counts}
+
+
+RUN_STORE_BACKENDS = {
+    'sqlite': SQLiteRunStore,
+}
+
+
+def open_run_store(url=None):
+    """
+    Run store for a store URL (default: ZENSTATUS_RUNS, else
+    DEFAULT_RUN_STORE); None when storing runs is turned off.
+    """
+    url = url or os.environ.get('ZENSTATUS_RUNS') or DEFAULT_RUN_STORE
+    if url.lower() in ('off', 'none', '0'):
+        return None
+    scheme, sep, location = url.partition('://')
+    if not sep or scheme not in RUN_STORE_BACKENDS:
+        raise ValueError(f"Unsupported run store URL: {url}")
+    if scheme == 'sqlite' and location.startswith('/'):
+        # sqlite:///relative.db or sqlite:////absolute/path.db
+        location = location[1:]
+    return RUN_STORE_BACKENDS[scheme](location)
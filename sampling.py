@@ -0,0 +1,246 @@
+"""
+ZenStatus - Sitemap Sampling
+============================
+Site-health estimates for sites too large to audit in full.
+
+SitemapSampler sees every URL of a sitemap tree once, as it is streamed,
+and keeps a uniform reservoir per stratum (child sitemap x first path
+segment), so memory depends on the sample size and the number of strata,
+never on the size of the site. draw() spreads the sample over the strata
+in proportion to their size; SitemapSample.estimate() turns the audited
+pages into site-wide warning prevalence and average score, each with a
+confidence interval (stratified estimator; Wilson interval on the
+effective sample size for proportions).
+"""
+
+import math
+import random
+from statistics import NormalDist
+from urllib.parse import urlparse
+
+from crawler import normalize_url
+from rules import RULES, failed_rules, is_fetched, rule_label
+
+
+DEFAULT_SAMPLE_SIZE = 400
+# Path-prefix strata at most; later prefixes fold into one '*' stratum per
+# sitemap (again at most MAX_STRATA of those), then into '*' overall
+MAX_STRATA = 200
+DEFAULT_CONFIDENCE = 0.95
+# Indicator of pages that could not be fetched at all
+PAGE_ERROR = 'page_error'
+
+
+def path_prefix(url):
+    """First path segment of a URL ('/blog' for /blog/post), or '/'."""
+    segment = urlparse(url).path.strip('/').split('/', 1)[0]
+    return '/' + segment if segment else '/'
+
+
+class SitemapSampler:
+    """
+    One-pass stratified reservoir sampler over sitemap URLs.
+
+    Each stratum keeps up to sample_size URLs chosen uniformly from all the
+    URLs added to it (Algorithm R), which is enough for any allocation
+    draw() can give it.
+    """
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE, max_strata=MAX_STRATA, seed=None):
+        self.sample_size = max(1, sample_size)
+        self.max_strata = max_strata
+        self.random = random.Random(seed)
+        self.strata = {}
+        self.population = 0
+        self.prefix_strata = 0
+        self.overflow_strata = 0
+
+    def _stratum(self, url, sitemap):
+        key = (sitemap, path_prefix(url))
+        if key in self.strata or self.prefix_strata < self.max_strata:
+            return key
+        key = (sitemap, '*')
+        if key in self.strata or self.overflow_strata < self.max_strata:
+            return key
+        return ('*', '*')
+
+    def add(self, url, sitemap):
+        """Count one URL listed in the given sitemap and maybe keep it."""
+        key = self._stratum(url, sitemap)
+        stratum = self.strata.get(key)
+        if stratum is None:
+            stratum = self.strata[key] = {'seen': 0, 'reservoir': []}
+            if key[1] == '*':
+                self.overflow_strata += 1
+            else:
+                self.prefix_strata += 1
+        stratum['seen'] += 1
+        self.population += 1
+        reservoir = stratum['reservoir']
+        if len(reservoir) < self.sample_size:
+            reservoir.append(url)
+        else:
+            slot = self.random.randrange(stratum['seen'])
+            if slot < self.sample_size:
+                reservoir[slot] = url
+
+    def allocate(self):
+        """
+        Sample size per stratum, proportional to stratum size (largest
+        remainders), with at least one page per stratum when the sample is
+        large enough to cover them all.
+        """
+        n = min(self.sample_size, self.population)
+        if not n:
+            return {}
+        quotas = {key: n * s['seen'] / self.population for key, s in self.strata.items()}
+        allocation = {key: int(quota) for key, quota in quotas.items()}
+        leftover = n - sum(allocation.values())
+        for key in sorted(quotas, key=lambda k: quotas[k] - allocation[k], reverse=True)[:leftover]:
+            allocation[key] += 1
+        if len(self.strata) <= n:
+            for key in [k for k, size in allocation.items() if size == 0]:
+                donor = max(allocation, key=lambda k: allocation[k])
+                allocation[donor] -= 1
+                allocation[key] = 1
+        return allocation
+
+    def draw(self):
+        """The sample to audit, as a SitemapSample."""
+        strata = {}
+        for key, size in self.allocate().items():
+            stratum = self.strata[key]
+            strata[key] = (stratum['seen'], self.random.sample(stratum['reservoir'], size) if size else [])
+        return SitemapSample(strata, self.population)
+
+
+def _wilson(p, n, z):
+    if n <= 0:
+        return 0.0, 1.0
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+class SitemapSample:
+    """
+    A drawn sample: per stratum (sitemap, prefix), its size in the sitemap
+    and the URLs chosen from it. Results are matched to strata by
+    normalized URL, so crawl mode's normalized URLs match too.
+    """
+
+    def __init__(self, strata, population):
+        self.strata = strata
+        self.population = population
+        self.urls = []
+        self.url_strata = {}
+        for key, (_, urls) in strata.items():
+            for url in urls:
+                self.urls.append(url)
+                self.url_strata[normalize_url(url) or url] = key
+
+    def _stratified(self, groups, value, covered):
+        # Stratified mean of value(result) and its variance (finite population
+        # corrected). Strata with a single audited page have no variance of
+        # their own; they get the pooled within-stratum variance of the others
+        # (or, if no stratum has two pages, the variance of the whole sample).
+        mean = 0.0
+        strata = []
+        squares = degrees = 0.0
+        everything = []
+        for key, results in groups.items():
+            values = [value(result) for result in results]
+            n = len(values)
+            stratum_mean = sum(values) / n
+            ss = sum((v - stratum_mean) ** 2 for v in values)
+            squares += ss
+            degrees += n - 1
+            everything.extend(values)
+            weight = self.strata[key][0] / covered
+            mean += weight * stratum_mean
+            strata.append((weight, self.strata[key][0], n, ss))
+
+        if degrees:
+            pooled = squares / degrees
+        elif len(everything) > 1:
+            overall = sum(everything) / len(everything)
+            pooled = sum((v - overall) ** 2 for v in everything) / (len(everything) - 1)
+        else:
+            pooled = 0.0
+        variance = 0.0
+        for weight, size, n, ss in strata:
+            s2 = ss / (n - 1) if n > 1 else pooled
+            variance += weight * weight * (1 - n / size) * s2 / n
+        return mean, variance
+
+    def estimate(self, results, thresholds=None, confidence=DEFAULT_CONFIDENCE):
+        """
+        Site-wide estimates from the audited sample pages: average score and
+        the share of pages failing each page-level rule (or failing to load),
+        with confidence intervals. Job-level rules (duplicates) are left out,
+        as a sample cannot see most duplicate pairs. Strata with no audited
+        page (e.g. a cancelled job) are left out and reported as uncovered.
+        """
+        groups = {}
+        indicators = {}
+        for result in results:
+            url = result.get('url') or ''
+            key = self.url_strata.get(normalize_url(url) or url)
+            if key is None:
+                continue
+            groups.setdefault(key, []).append(result)
+            indicators[id(result)] = set(failed_rules(result, thresholds)) if is_fetched(result) else {PAGE_ERROR}
+
+        audited = sum(len(group) for group in groups.values())
+        covered = sum(self.strata[key][0] for key in groups)
+        estimate = {
+            'population': self.population,
+            'sampled': len(self.urls),
+            'audited': audited,
+            'strata': len(self.strata),
+            'covered_population': covered,
+            'confidence': confidence,
+            'avg_score': None,
+            'warnings': [],
+        }
+        if not audited:
+            return estimate
+
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        mean, variance = self._stratified(groups, lambda r: r.get('seo_score') or 0, covered)
+        margin = z * math.sqrt(variance)
+        estimate['avg_score'] = {
+            'estimate': round(mean, 1),
+            'low': round(max(0.0, mean - margin), 1),
+            'high': round(min(100.0, mean + margin), 1),
+        }
+
+        rule_ids = [rule['id'] for rule in RULES if not rule.get('job_level')] + [PAGE_ERROR]
+        for rule_id in rule_ids:
+            pages = sum(1 for flags in indicators.values() if rule_id in flags)
+            if not pages:
+                continue
+            p, variance = self._stratified(groups, lambda r: 1.0 if rule_id in indicators[id(r)] else 0.0, covered)
+            # Effective sample size: what a simple random sample with this variance would need
+            n_eff = p * (1 - p) / variance if variance > 0 else audited
+            low, high = _wilson(p, n_eff, z)
+            estimate['warnings'].append({
+                'id': rule_id,
+                'text': 'Page could not be fetched' if rule_id == PAGE_ERROR else rule_label(rule_id, thresholds),
+                'sample_pages': pages,
+                'prevalence': round(p, 4),
+                'low': round(low, 4),
+                'high': round(high, 4),
+                'estimated_pages': round(p * self.population),
+            })
+        estimate['warnings'].sort(key=lambda w: w['prevalence'], reverse=True)
+        return estimate
+
+    def describe(self, limit=50):
+        """The largest strata with their sitemap size and sample size."""
+        largest = sorted(self.strata.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+        return [
+            {'sitemap': sitemap, 'prefix': prefix, 'population': size, 'sampled': len(urls)}
+            for (sitemap, prefix), (size, urls) in largest
+        ]
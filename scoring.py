@@ -0,0 +1,361 @@
+"""
+ZenStatus - Scoring & Aggregation
+=================================
+Server-side SEO scoring. Page scores are computed once per result and the
+job-level numbers (averages, score distribution, per-site scores and warning
+counts) are folded in incrementally as results stream in, so the browser
+only renders precomputed values.
+"""
+
+import heapq
+
+from rules import DEFAULT_THRESHOLDS, evaluate_table, resolve_thresholds, result_host
+
+
+SCORE_BANDS = (
+    (90, 'excellent'),
+    (70, 'good'),
+    (50, 'average'),
+    (30, 'poor'),
+    (0, 'critical'),
+)
+
+
+def _as_number(value):
+    """Return value as a float, or None for 'N/A' and other non-numeric values."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.rstrip('s'))
+        except ValueError:
+            return None
+    return None
+
+
+# Inputs of a page score, in the order _score() takes them (ResultTable column names)
+SCORE_FIELDS = (
+    'status_code', 'robots', 'https', 'title', 'meta_description', 'h1_count', 'title_length',
+    'meta_description_length', 'canonical', 'has_viewport', 'word_count', 'has_sitemap',
+    'has_robots_txt', 'redirect_count', 'url_has_underscores', 'images_missing_alt',
+    'images_no_dimensions', 'images_not_lazy', 'broken_links', 'has_lang', 'has_og_tags',
+    'has_schema', 'has_twitter_cards', 'render_blocking_count', 'response_seconds', 'page_size_kb',
+)
+
+
+def _result_values(result, fields):
+    # A result dict's values for ResultTable column names; host and
+    # response_seconds are derived like the table does
+    values = []
+    for field in fields:
+        if field == 'host':
+            values.append(result_host(result.get('url', '')))
+        elif field == 'response_seconds':
+            values.append(_as_number(result.get('response_time')))
+        else:
+            values.append(result.get(field))
+    return values
+
+
+def calculate_seo_score(result, thresholds=None):
+    """
+    Calculate the 0-100 SEO score for a single audit result.
+    Mirrors the weighting previously done in the browser (ui.js); length and
+    word-count limits follow the active rule thresholds.
+    """
+    return _score(thresholds or DEFAULT_THRESHOLDS, *_result_values(result, SCORE_FIELDS))
+
+
+def score_table(table, thresholds=None):
+    """Scores of every row of a ResultTable, computed straight from its columns."""
+    t = thresholds or DEFAULT_THRESHOLDS
+    return [_score(t, *values) for values in zip(*(table.column(field) for field in SCORE_FIELDS))]
+
+
+def _score(t, status_code, robots, https, title, meta_description, h1_count, title_length,
+           description_length, canonical, has_viewport, word_count, has_sitemap, has_robots_txt,
+           redirect_count, url_has_underscores, images_missing_alt, images_no_dimensions,
+           images_not_lazy, broken_links, has_lang, has_og_tags, has_schema, has_twitter_cards,
+           render_blocking_count, response_time, page_size_kb):
+    # One page's score from its SCORE_FIELDS values (response time in seconds or None)
+    score = 100
+    has_status = isinstance(status_code, int) and not isinstance(status_code, bool)
+
+    # CRITICAL ISSUES - Page accessibility & indexability
+    if has_status and status_code >= 400:
+        score -= 20
+    if has_status and status_code >= 500:
+        score -= 25
+    if 'noindex' in (robots or ''):
+        score -= 20
+    if not https:
+        score -= 15
+
+    # Missing essential meta tags
+    if not title:
+        score -= 12
+    if not meta_description:
+        score -= 12
+    if h1_count == 0:
+        score -= 12
+
+    # HIGH PRIORITY ISSUES - Poor quality meta tags
+    title_length = title_length or 0
+    description_length = description_length or 0
+    if title and title_length < t['title_min']:
+        score -= 8
+    if title and title_length > t['title_max']:
+        score -= 8
+    if meta_description and description_length < t['description_min']:
+        score -= 8
+    if meta_description and description_length > t['description_max']:
+        score -= 8
+
+    # Content & structure issues
+    if h1_count is not None and h1_count > 1:
+        score -= 7
+    if not canonical:
+        score -= 7
+    if not has_viewport:
+        score -= 7
+    if word_count is not None and word_count < t['min_words']:
+        score -= 7
+
+    # MEDIUM PRIORITY ISSUES - Technical SEO
+    if not has_sitemap:
+        score -= 5
+    if not has_robots_txt:
+        score -= 4
+    if (redirect_count or 0) > 0:
+        score -= 4
+    if url_has_underscores:
+        score -= 3
+
+    # Image optimization (scale with severity)
+    images_missing_alt = images_missing_alt or 0
+    if images_missing_alt > 0:
+        score -= min(10, images_missing_alt // 5 + 3)
+    images_no_dimensions = images_no_dimensions or 0
+    if images_no_dimensions > 10:
+        score -= min(7, images_no_dimensions // 10 + 2)
+    images_not_lazy = images_not_lazy or 0
+    if images_not_lazy > 10:
+        score -= min(6, images_not_lazy // 15 + 2)
+
+    # Link issues
+    broken_links = broken_links or 0
+    if broken_links > 0:
+        score -= min(8, broken_links * 2)
+
+    # LOW PRIORITY ISSUES
+    if not has_lang:
+        score -= 3
+    if not has_og_tags:
+        score -= 3
+    if not has_schema:
+        score -= 3
+    if not has_twitter_cards:
+        score -= 2
+
+    # Performance issues
+    render_blocking_count = render_blocking_count or 0
+    if render_blocking_count > 20:
+        score -= min(8, render_blocking_count // 10)
+    if response_time is not None:
+        if response_time > 3:
+            score -= 6
+        elif response_time > 2:
+            score -= 4
+        elif response_time > 1:
+            score -= 2
+    page_size_kb = page_size_kb or 0
+    if page_size_kb > 2000:
+        score -= min(5, int((page_size_kb - 2000) // 500))
+
+    return max(0, min(100, score))
+
+
+def score_band(score):
+    """Return the distribution band name ('excellent' ... 'critical') for a score."""
+    for threshold, band in SCORE_BANDS:
+        if score >= threshold:
+            return band
+    return 'critical'
+
+
+# Inputs of the job summary besides score and warnings, in the order
+# AuditAggregator._fold() takes them (ResultTable column names)
+SUMMARY_FIELDS = (
+    'host', 'status_message', 'response_seconds', 'word_count', 'title', 'meta_description',
+    'h1_count', 'https', 'broken_links', 'has_robots_txt', 'has_sitemap', 'images_no_dimensions',
+    'page_size_kb',
+)
+
+
+class AuditAggregator:
+    """
+    Incremental job-level statistics for an SEO audit.
+
+    Each call to add() scores one result and folds it into running counters,
+    so summary() is O(sites + warning types) regardless of how many pages
+    have been audited.
+    """
+
+    def __init__(self, top_warnings=8, thresholds=None):
+        self.top_warnings = top_warnings
+        self.thresholds = thresholds
+        self.total = 0
+        self.ok_pages = 0
+        self.score_sum = 0
+        self.response_sum = 0.0
+        self.response_count = 0
+        self.words_sum = 0
+        self.words_count = 0
+        self.counters = {
+            'missing_titles': 0,
+            'missing_descriptions': 0,
+            'missing_h1': 0,
+            'https_pages': 0,
+            'pages_with_issues': 0,
+            'broken_link_pages': 0,
+            'no_robots_pages': 0,
+            'no_sitemap_pages': 0,
+            'images_no_dimensions_pages': 0,
+            'large_pages': 0,
+        }
+        self.distribution = {band: 0 for _, band in SCORE_BANDS}
+        self.warning_counts = {}
+        self.sites = {}
+
+    def add(self, result):
+        """Score a result (stored as result['seo_score']) and update the running totals."""
+        score = calculate_seo_score(result, self.thresholds)
+        result['seo_score'] = score
+        self._fold(score, result.get('warnings') or [], *_result_values(result, SUMMARY_FIELDS))
+        return score
+
+    def add_table(self, table, warnings, scores):
+        """Fold every row of a ResultTable, with its warnings and scores, in one pass over the columns."""
+        fold = self._fold
+        rows = zip(scores, warnings, *(table.column(field) for field in SUMMARY_FIELDS))
+        for values in rows:
+            fold(*values)
+
+    def _fold(self, score, warnings, host, status_message, response_time, word_count, title,
+              meta_description, h1_count, https, broken_links, has_robots_txt, has_sitemap,
+              images_no_dimensions, page_size_kb):
+        # One page's SUMMARY_FIELDS values (response time in seconds or None)
+        is_ok = status_message == 'OK'
+
+        self.total += 1
+        self.score_sum += score
+        self.distribution[score_band(score)] += 1
+        if is_ok:
+            self.ok_pages += 1
+
+        if response_time is not None:
+            self.response_sum += response_time
+            self.response_count += 1
+        if isinstance(word_count, int) and word_count > 0:
+            self.words_sum += word_count
+            self.words_count += 1
+
+        counters = self.counters
+        if not title:
+            counters['missing_titles'] += 1
+        if not meta_description:
+            counters['missing_descriptions'] += 1
+        if h1_count == 0:
+            counters['missing_h1'] += 1
+        if https:
+            counters['https_pages'] += 1
+        if warnings:
+            counters['pages_with_issues'] += 1
+        if (broken_links or 0) > 0:
+            counters['broken_link_pages'] += 1
+        if not has_robots_txt:
+            counters['no_robots_pages'] += 1
+        if not has_sitemap:
+            counters['no_sitemap_pages'] += 1
+        if (images_no_dimensions or 0) > 0:
+            counters['images_no_dimensions_pages'] += 1
+        if (page_size_kb or 0) > (self.thresholds or DEFAULT_THRESHOLDS)['max_page_kb']:
+            counters['large_pages'] += 1
+
+        warning_counts = self.warning_counts
+        for warning in warnings:
+            warning_counts[warning] = warning_counts.get(warning, 0) + 1
+
+        site = self.sites.get(host)
+        if site is None:
+            site = self.sites[host] = {'pages': 0, 'ok': 0, 'with_warnings': 0, 'score_sum': 0}
+        site['pages'] += 1
+        site['score_sum'] += score
+        if is_ok:
+            site['ok'] += 1
+        if warnings:
+            site['with_warnings'] += 1
+
+    @property
+    def avg_score(self):
+        return round(self.score_sum / self.total) if self.total else 0
+
+    def progress(self):
+        """Small running snapshot sent with progress events."""
+        return {'avg_score': self.avg_score, 'distribution': dict(self.distribution)}
+
+    def summary(self):
+        """Full job summary sent with the 'complete' event."""
+        top = heapq.nlargest(self.top_warnings, self.warning_counts.items(), key=lambda item: item[1])
+        sites = {}
+        for host, site in self.sites.items():
+            sites[host] = {
+                'pages': site['pages'],
+                'ok': site['ok'],
+                'with_warnings': site['with_warnings'],
+                'avg_score': round(site['score_sum'] / site['pages']) if site['pages'] else 0,
+            }
+
+        summary = {
+            'total': self.total,
+            'site_count': len(self.sites),
+            'ok_pages': self.ok_pages,
+            'avg_score': self.avg_score,
+            'avg_response': round(self.response_sum / self.response_count, 3) if self.response_count else 0,
+            'avg_words': round(self.words_sum / self.words_count) if self.words_count else 0,
+            'distribution': dict(self.distribution),
+            'top_warnings': [{'text': text, 'count': count} for text, count in top],
+            'warning_counts': dict(self.warning_counts),
+            'sites': sites,
+        }
+        summary.update(self.counters)
+        return summary
+
+
+def summarize_results(results, top_warnings=8):
+    """Score and summarize a complete list of results in one pass."""
+    aggregator = AuditAggregator(top_warnings=top_warnings)
+    for result in results:
+        aggregator.add(result)
+    return aggregator.summary()
+
+
+def rescore_table(table, thresholds=None, top_warnings=8):
+    """
+    Re-evaluate warnings and scores for a stored ResultTable with new thresholds.
+    Returns (rows, summary) where rows hold url, warnings and seo_score per page.
+    Works column-wise throughout (rules, scores, summary), without rebuilding
+    a result dict per page.
+    """
+    t = resolve_thresholds(thresholds)
+    warnings = evaluate_table(table, t)
+    scores = score_table(table, t)
+    aggregator = AuditAggregator(top_warnings=top_warnings, thresholds=t)
+    aggregator.add_table(table, warnings, scores)
+    rows = [
+        {'url': url, 'warnings': page_warnings, 'seo_score': score}
+        for url, page_warnings, score in zip(table.column('url'), warnings, scores)
+    ]
+    return rows, aggregator.summary()
@@ -5,6 +5,12 @@
 */
 
 var lastSeoResults = [];
+var lastSeoSummary = null;
+var lastSeoJobId = null;
+// Set when the server stored the last audit; exports then stream from the server
+var lastSeoRunId = null;
+// Sample size of sampling mode when Max Pages is empty
+var DEFAULT_SAMPLE_SIZE = 400;
 
 async function streamEndpoint(path, payload, onProgress, onComplete, controller) {
     var response = await fetch(path, {
@@ -42,7 +48,9 @@ async function streamEndpoint(path, payload, onProgress, onComplete, controller)
                 console.warn('SSE parse error:', parseErr, 'Line:', line);
                 continue;
             }
-            if (data.type === 'progress' && onProgress) {
+            if (data.type === 'job') {
+                lastSeoJobId = data.job_id;
+            } else if (data.type === 'progress' && onProgress) {
                 onProgress(data);
             } else if (data.type === 'complete' && onComplete) {
                 completed = true;
@@ -118,9 +126,15 @@ function updateProgressBar(completed, total) {
 async function runSeoAudit() {
     var urls = readUrls();
     var useSitemap = document.getElementById('useSitemap').checked;
+    var crawlInput = document.getElementById('useCrawl');
+    var useCrawl = !!(crawlInput && crawlInput.checked);
     var sitemapUrl = document.getElementById('sitemapUrl').value.trim();
     var maxPagesInput = document.getElementById('maxPages');
     var maxPages = (maxPagesInput && maxPagesInput.value) ? parseInt(maxPagesInput.value, 10) : 10000;
+    var sampleInput = document.getElementById('useSample');
+    // Sampling mode: Max Pages is the sample size (the server picks one when empty)
+    var sampleSize = useSitemap && sampleInput && sampleInput.checked ?
+        ((maxPagesInput && maxPagesInput.value) ? maxPages : DEFAULT_SAMPLE_SIZE) : null;
 
     if (!useSitemap && urls.length === 0) {
         showToast('Please enter at least one URL.', 'error');
@@ -132,9 +146,12 @@ async function runSeoAudit() {
         return;
     }
 
-    showLoading(useSitemap ? '0/?' : '0/' + urls.length);
+    showLoading(useSitemap || useCrawl ? '0/?' : '0/' + urls.length);
     setButtonsDisabled(true);
     lastSeoResults = [];
+    lastSeoJobId = null;
+    lastSeoRunId = null;
+    clearSeoResults();
     var controller = startOperation('SEO audit');
 
     try {
@@ -142,16 +159,25 @@ async function runSeoAudit() {
             urls: urls,
             use_sitemap: useSitemap,
             sitemap_url: sitemapUrl,
-            max_pages: maxPages
+            max_pages: maxPages,
+            sample_size: sampleSize,
+            crawl: useCrawl
         }, function(data) {
             document.getElementById('progress').textContent = data.completed + '/' + data.total;
             updateProgressBar(data.completed, data.total);
+            if (data.result) {
+                // Cards appear as pages finish; the summary panels follow on 'complete'
+                seoResultsView.append(data.result);
+                document.getElementById('seoResults').classList.add('active');
+            }
         }, function(data) {
             console.log('SEO audit complete, results:', data.results ? data.results.length : 0);
-            displaySeoResults(data.results, data.sitemap_debug);
+            lastSeoRunId = data.stored ? data.job_id : null;
+            displaySeoResults(data.results, data.sitemap_debug, data.summary);
+            displaySampleEstimate(data.sample);
             // Save to history
             if (typeof window.saveAuditToHistory === 'function') {
-                window.saveAuditToHistory(data.results);
+                window.saveAuditToHistory(data.results, data.summary);
             } else {
                 console.warn('saveAuditToHistory not available');
             }
@@ -159,6 +185,10 @@ async function runSeoAudit() {
     } catch (err) {
         console.error('SEO audit error:', err);
         if (err.name === 'AbortError') {
+            // Also tell the server, in case a proxy keeps the stream open
+            if (lastSeoJobId) {
+                fetch('/seo-audit/' + lastSeoJobId + '/cancel', { method: 'POST' }).catch(function() {});
+            }
             showToast('SEO audit canceled.', 'info');
         } else {
             showToast('Error running SEO audit: ' + err.message, 'error');
@@ -170,6 +200,38 @@ async function runSeoAudit() {
     }
 }
 
+// Re-evaluate the last audit's warnings and scores on the server with new
+// thresholds (see GET /seo-rules for the available keys); no re-crawl needed
+async function rescoreSeoAudit(thresholds) {
+    if (!lastSeoJobId) {
+        showToast('Run an SEO audit first.', 'error');
+        return;
+    }
+    var response = await fetch('/seo-audit/' + lastSeoJobId + '/rescore', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ thresholds: thresholds || {} })
+    });
+    if (!response.ok) {
+        showToast('Rescore failed (status ' + response.status + ').', 'error');
+        return;
+    }
+    var data = await response.json();
+    var byUrl = {};
+    data.results.forEach(function(r) { byUrl[r.url] = r; });
+    lastSeoResults.forEach(function(r) {
+        var updated = byUrl[r.url];
+        if (updated) {
+            r.warnings = updated.warnings;
+            r.seo_score = updated.seo_score;
+        }
+    });
+    // The stored run keeps the original scores, so export the re-scored results from the browser
+    lastSeoRunId = null;
+    displaySeoResults(lastSeoResults, null, data.summary);
+    showToast('Audit re-scored with new thresholds.', 'success');
+}
+
 function displayResults(results) {
     var resultsBody = document.getElementById('resultsBody');
     var summary = document.getElementById('summary');
@@ -215,7 +277,202 @@ function displayResults(results) {
     document.getElementById('results').classList.add('active');
 }
 
-function displaySeoResults(results, sitemapDebug) {
+// One result card (rendered on demand by the virtual list in results-view.js);
+// `index` points into seoResultsView.results, `number` is the card's # label
+function seoCardHtml(result, index, number) {
+    var hasWarnings = (result.warnings || []).length > 0;
+    var isNetworkError = (typeof result.status_code === 'number' && result.status_code >= 400) || result.status_message !== 'OK';
+    var isDuplicate = result.duplicate_of && result.duplicate_of.trim() !== '';
+
+    var pageScore = getPageScore(result);
+    var scoreClass = getScoreClass(pageScore);
+    
+    // Determine SEO status based on score
+    var seoStatus, seoStatusClass;
+    if (isNetworkError) {
+        seoStatus = 'Error';
+        seoStatusClass = 'status-danger';
+    } else if (pageScore >= 90) {
+        seoStatus = 'Excellent';
+        seoStatusClass = 'status-ok';
+    } else if (pageScore >= 70) {
+        seoStatus = 'Good';
+        seoStatusClass = 'status-ok';
+    } else if (pageScore >= 50) {
+        seoStatus = 'Needs Work';
+        seoStatusClass = 'status-warn';
+    } else {
+        seoStatus = 'Poor';
+        seoStatusClass = 'status-danger';
+    }
+
+    var codeClass = 'pill';
+    if (typeof result.status_code === 'number') {
+        if (result.status_code >= 200 && result.status_code < 300) codeClass += ' status-ok';
+        else if (result.status_code >= 300 && result.status_code < 400) codeClass += '';
+        else if (result.status_code >= 400) codeClass += ' status-danger';
+    }
+
+    // Format warnings as a list instead of semicolon-separated
+    var warningsHtml = '';
+    var warnings = result.warnings || [];
+    if (warnings.length > 0) {
+        warningsHtml = '<ul class="warning-list">';
+        warnings.forEach(function(warning) {
+            var sevClass = getSeverityClass(warning);
+            var priority = getIssuePriority(warning);
+            warningsHtml += '<li class="' + sevClass + '" title="' + priority.impact + '">';
+            warningsHtml += '<span class="warning-icon">⚠</span>' + warning + '</li>';
+        });
+        warningsHtml += '</ul>';
+    } else {
+        warningsHtml = 'No issues detected';
+    }
+    var warningsClass = isNetworkError ? 'warnings danger' : (hasWarnings ? 'warnings warn' : 'warnings ok');
+    var titleText = result.title || 'No title';
+    var metaText = result.meta_description || 'No description';
+    var h1Sample = (result.h1_samples || []).slice(0, 2).join(' | ') || 'No H1';
+    
+    var duplicateBadge = '';
+    if (isDuplicate) {
+        duplicateBadge = '<div class="pill status-warn" title="Duplicate of: ' + result.duplicate_of + '" style="cursor: help;">⚠ Duplicate</div>';
+    } else if (result.near_duplicate_of) {
+        isDuplicate = true;
+        duplicateBadge = '<div class="pill status-warn" title="' + Math.round((result.near_duplicate_similarity || 0) * 100) + '% similar to: ' + result.near_duplicate_of + '" style="cursor: help;">≈ Near-duplicate</div>';
+    }
+
+    // Build heading hierarchy
+    var headingHtml = '<div class="heading-hierarchy">';
+    headingHtml += '<div class="heading-tag"><span class="tag-name">H1</span><span class="tag-count">' + result.h1_count + '</span></div>';
+    if (result.h2_count !== undefined) {
+        headingHtml += '<div class="heading-tag"><span class="tag-name">H2</span><span class="tag-count">' + result.h2_count + '</span></div>';
+    }
+    if (result.h3_count !== undefined) {
+        headingHtml += '<div class="heading-tag"><span class="tag-name">H3</span><span class="tag-count">' + result.h3_count + '</span></div>';
+    }
+    if (result.h4_count !== undefined) {
+        headingHtml += '<div class="heading-tag"><span class="tag-name">H4</span><span class="tag-count">' + result.h4_count + '</span></div>';
+    }
+    headingHtml += '</div>';
+
+    var resultWarnings = result.warnings || [];
+    return [
+        '<div class="seo-card" data-index="' + index + '" data-score="' + pageScore + '" data-issue-count="' + resultWarnings.length + '"' +
+            ' style="cursor: pointer;" title="Double-click for detailed audit">',
+        '<div class="card-header">',
+        '  <div class="card-header-left">',
+        '    <div class="pill pill-number">#' + number + '</div>',
+        '    <div class="seo-score-circle ' + scoreClass + '" style="width:32px;height:32px;font-size:0.8em;">' + pageScore + '</div>',
+        '    <div class="' + codeClass + '" title="HTTP Status">' + result.status_code + '</div>',
+        '    <div class="pill">' + result.response_time + '</div>',
+        (isDuplicate ? '    ' + duplicateBadge : ''),
+        '  </div>',
+        '  <div class="card-header-right">',
+        (result.https ? '    <div class="pill status-ok">🔒 HTTPS</div>' : '    <div class="pill status-warn">⚠ HTTP</div>'),
+        '    <div class="pill ' + seoStatusClass + '" title="SEO Status">' + seoStatus + '</div>',
+        '  </div>',
+        '</div>',
+        '<div class="card-body">',
+        '  <div class="url"><a href="' + result.url + '" target="_blank" rel="noopener noreferrer">' + result.url + '</a></div>',
+        '  <div class="metrics-grid">',
+        '    <div class="metric-item"><div class="metric-value">' + (result.title_length || 0) + '</div><div class="metric-label">Title Chars</div></div>',
+        '    <div class="metric-item"><div class="metric-value">' + (result.meta_description_length || 0) + '</div><div class="metric-label">Meta Chars</div></div>',
+        '    <div class="metric-item"><div class="metric-value">' + result.h1_count + '</div><div class="metric-label">H1 Tags</div></div>',
+        '    <div class="metric-item"><div class="metric-value">' + result.word_count + '</div><div class="metric-label">Words</div></div>',
+        '    <div class="metric-item"><div class="metric-value">' + result.internal_links + '/' + result.external_links + '</div><div class="metric-label">Int/Ext Links</div></div>',
+        '    <div class="metric-item"><div class="metric-value">' + result.images_missing_alt + '/' + result.total_images + '</div><div class="metric-label">Img No Alt</div></div>',
+        '  </div>',
+        '  ' + headingHtml,
+        '  <div class="content-section">',
+        '    <div class="content-section-header">Page Title</div>',
+        '    <div class="content-section-body">' + titleText + '</div>',
+        '  </div>',
+        '  <div class="content-section">',
+        '    <div class="content-section-header">Meta Description</div>',
+        '    <div class="content-section-body">' + metaText + '</div>',
+        '  </div>',
+        '  <div class="tags-row">',
+        '    <div class="pill">H1: ' + h1Sample + '</div>',
+        '    <div class="pill">Robots: ' + (result.robots || 'none') + '</div>',
+        (result.canonical ? '    <div class="pill status-ok">Canonical</div>' : '    <div class="pill status-warn">No Canonical</div>'),
+        (result.has_viewport ? '    <div class="pill status-ok">Viewport</div>' : '    <div class="pill status-warn">No Viewport</div>'),
+        (result.has_lang ? '    <div class="pill status-ok">Lang: ' + result.lang + '</div>' : '    <div class="pill status-warn">No Lang</div>'),
+        '  </div>',
+        '  <div class="tags-row">',
+        (result.has_og_tags ? '    <div class="pill status-ok">Open Graph</div>' : '    <div class="pill status-info">No OG Tags</div>'),
+        (result.has_schema ? '    <div class="pill status-ok">Schema: ' + (result.schema_types || []).slice(0, 2).join(', ') + '</div>' : '    <div class="pill status-info">No Schema</div>'),
+        (result.has_twitter_cards ? '    <div class="pill status-ok">Twitter Card</div>' : ''),
+        (result.http_version ? '    <div class="pill status-info" title="Protocol the page was fetched over">' + result.http_version + '</div>' : ''),
+        '  </div>',
+        (result.inlinks !== undefined ? '  <div class="tags-row">' +
+            '<div class="pill" title="Internal links pointing to this page">Inlinks: ' + result.inlinks + '</div>' +
+            '<div class="pill" title="Clicks from the homepage">Depth: ' + (result.click_depth === null ? 'unreachable' : result.click_depth) + '</div>' +
+            '<div class="pill" title="Internal PageRank (1.0 = average page)">PageRank: ' + result.pagerank + '</div>' +
+            (result.page_weight_kb !== undefined ? '<div class="pill" title="HTML plus images, scripts and stylesheets' +
+                (result.heaviest_assets || []).map(function(a) { return '\n' + a.kb + ' KB ' + a.type + ': ' + a.url; }).join('') +
+                '">Weight: ' + result.page_weight_kb + ' KB</div>' : '') +
+            (result.is_orphan ? '<div class="pill status-warn" title="Listed in the sitemap but no audited page links to it">Orphan</div>' : '') +
+            '</div>' : ''),
+        '  <div class="' + warningsClass + '">' + warningsHtml + '</div>',
+        '</div>',
+        '</div>'
+    ].join('');
+}
+
+function siteHeaderHtml(site) {
+    return '<div class="site-group-header">' +
+        '<h2><span class="seo-score-circle ' + getScoreClass(site.avg_score) + '" style="width:36px;height:36px;font-size:0.9em;">' + site.avg_score + '</span> ' + site.host + '</h2>' +
+        '<div class="site-group-stats">' +
+        '<div class="site-group-stat"><span>' + site.pages + '</span> pages</div>' +
+        '<div class="site-group-stat"><span>' + site.ok + '</span> OK</div>' +
+        '<div class="site-group-stat"><span>' + site.with_warnings + '</span> warnings</div>' +
+        '</div></div>';
+}
+
+// Empty the report before a new audit streams its cards in
+function clearSeoResults() {
+    ['seoSummary', 'executiveSummary', 'scoreChart', 'filterSortBar', 'issuesPanel', 'recommendationsPanel', 'samplePanel'].forEach(function(id) {
+        var el = document.getElementById(id);
+        if (el) el.style.display = 'none';
+    });
+    seoResultsView.setResults([]);
+}
+
+// Site-wide estimates of a sampled audit (null for full audits)
+function displaySampleEstimate(sample) {
+    var panel = document.getElementById('samplePanel');
+    if (!panel) return;
+    if (!sample || !sample.audited) {
+        panel.style.display = 'none';
+        return;
+    }
+
+    var percent = function(value) { return (value * 100).toFixed(1) + '%'; };
+    var confidence = Math.round(sample.confidence * 100);
+    var html = '<h3>Site-wide Estimate</h3>' +
+        '<p>Based on ' + sample.audited + ' of ' + sample.population.toLocaleString() + ' sitemap pages, sampled across ' +
+        sample.strata + ' sitemap sections. Ranges are ' + confidence + '% confidence intervals.</p>';
+    if (sample.covered_population < sample.population) {
+        html += '<p>Sections with no audited page (' + (sample.population - sample.covered_population).toLocaleString() +
+            ' pages) are not covered by the estimate.</p>';
+    }
+    if (sample.avg_score) {
+        html += '<p><strong>Estimated SEO score: ' + sample.avg_score.estimate + '</strong> (' +
+            sample.avg_score.low + ' – ' + sample.avg_score.high + ')</p>';
+    }
+    if (sample.warnings.length) {
+        html += '<div class="table-container"><table><thead><tr><th>Issue</th><th>Pages affected</th><th>Range</th><th>Est. pages</th></tr></thead><tbody>' +
+            sample.warnings.map(function(w) {
+                return '<tr><td>' + w.text + '</td><td>' + percent(w.prevalence) + '</td><td>' +
+                    percent(w.low) + ' – ' + percent(w.high) + '</td><td>' + w.estimated_pages.toLocaleString() + '</td></tr>';
+            }).join('') +
+            '</tbody></table></div>';
+    }
+    panel.innerHTML = html;
+    panel.style.display = 'block';
+}
+
+function displaySeoResults(results, sitemapDebug, summaryData) {
     console.log('displaySeoResults called with', results ? results.length : 0, 'results');
     
     var cards = document.getElementById('seoCards');
@@ -234,53 +491,30 @@ function displaySeoResults(results, sitemapDebug) {
         seoResults: !!seoResultsEl
     });
     
-    lastSeoResults = results || [];
-
-    // Group results by site
-    var siteBuckets = {};
-    lastSeoResults.forEach(function(r) {
-        var parser = document.createElement('a');
-        parser.href = r.url;
-        var host = parser.hostname || 'unknown';
-        if (!siteBuckets[host]) siteBuckets[host] = [];
-        siteBuckets[host].push(r);
-    });
-
-    var siteCount = Object.keys(siteBuckets).length;
-    var total = results.length;
-    var okPages = results.filter(function(r) { return r.status_message === 'OK'; }).length;
-    var missingTitles = results.filter(function(r) { return !r.title; }).length;
-    var missingDescriptions = results.filter(function(r) { return !r.meta_description; }).length;
-    var missingH1 = results.filter(function(r) { return r.h1_count === 0; }).length;
-    var httpsPages = results.filter(function(r) { return r.https; }).length;
-    var avgWordsList = results.filter(function(r) { return typeof r.word_count === 'number' && r.word_count > 0; }).map(function(r) { return r.word_count; });
-    var avgWords = avgWordsList.length ? avgWordsList.reduce(function(a, b) { return a + b; }, 0) / avgWordsList.length : 0;
-    var avgRespList = results.filter(function(r) { return r.response_time !== 'N/A'; }).map(function(r) { return parseFloat(r.response_time); });
-    var avgResponse = avgRespList.length ? avgRespList.reduce(function(a, b) { return a + b; }, 0) / avgRespList.length : 0;
-
-    // Calculate overall SEO score
-    var totalScore = 0;
-    results.forEach(function(r) {
-        totalScore += calculateSeoScore(r);
+    // Hidden by clearSeoResults() while the audit streamed
+    [summary, issuesPanel, recommendationsPanel].forEach(function(el) {
+        if (el) el.style.display = '';
     });
-    var avgScore = results.length ? Math.round(totalScore / results.length) : 0;
 
-    // Warning counts for top issues
-    var warningCounts = {};
-    results.forEach(function(r) {
-        (r.warnings || []).forEach(function(w) {
-            warningCounts[w] = (warningCounts[w] || 0) + 1;
-        });
-    });
-    var topWarnings = Object.keys(warningCounts)
-        .sort(function(a, b) { return warningCounts[b] - warningCounts[a]; })
-        .slice(0, 8)
-        .map(function(w) { return { text: w, count: warningCounts[w] }; });
-
-    // Calculate additional metrics
-    var pagesWithIssues = results.filter(function(r) { return (r.warnings || []).length > 0; }).length;
-    var httpsCount = results.filter(function(r) { return r.https; }).length;
-    var noCanonical = results.filter(function(r) { return !r.canonical; }).length;
+    lastSeoResults = results || [];
+    results = lastSeoResults;
+    // Aggregates come precomputed from the server; legacy history entries fall back to the client
+    summaryData = summaryData || summarizeSeoResults(results);
+    lastSeoSummary = summaryData;
+
+    var siteCount = summaryData.site_count;
+    var total = summaryData.total;
+    var okPages = summaryData.ok_pages;
+    var missingTitles = summaryData.missing_titles;
+    var missingDescriptions = summaryData.missing_descriptions;
+    var missingH1 = summaryData.missing_h1;
+    var avgResponse = summaryData.avg_response;
+    var avgScore = summaryData.avg_score;
+    var warningCounts = summaryData.warning_counts || {};
+    var topWarnings = summaryData.top_warnings || [];
+    var pagesWithIssues = summaryData.pages_with_issues;
+    var httpsCount = summaryData.https_pages;
+    var scoreDistribution = summaryData.distribution;
 
     // Enhanced summary with better structure - Score | Overview | Issues
     summary.innerHTML = [
@@ -300,20 +534,9 @@ function displaySeoResults(results, sitemapDebug) {
         '<div class="summary-item"><div class="number">' + (total - httpsCount) + '</div><div class="label">No HTTPS</div></div>'
     ].join('');
 
-    // Calculate score distribution
-    var scoreDistribution = { excellent: 0, good: 0, average: 0, poor: 0, critical: 0 };
-    results.forEach(function(r) {
-        var score = calculateSeoScore(r);
-        if (score >= 90) scoreDistribution.excellent++;
-        else if (score >= 70) scoreDistribution.good++;
-        else if (score >= 50) scoreDistribution.average++;
-        else if (score >= 30) scoreDistribution.poor++;
-        else scoreDistribution.critical++;
-    });
-
     // Executive Summary
     if (executiveSummaryEl) {
-        var summaryText = generateExecutiveSummary(results, avgScore, topWarnings, scoreDistribution);
+        var summaryText = generateExecutiveSummary(summaryData);
         executiveSummaryEl.innerHTML = '<h2>Executive Summary</h2>' +
             '<div class="summary-text">' + summaryText + '</div>' +
             '<div class="key-metrics">' +
@@ -363,182 +586,9 @@ function displaySeoResults(results, sitemapDebug) {
         filterBar.style.display = 'flex';
     }
 
-    cards.innerHTML = '';
-    
-    // Render grouped by site
-    var globalIndex = 0;
-    Object.keys(siteBuckets).sort().forEach(function(host) {
-        var siteResults = siteBuckets[host];
-        var siteOk = siteResults.filter(function(r) { return r.status_message === 'OK'; }).length;
-        var siteWarnings = siteResults.filter(function(r) { return (r.warnings || []).length > 0; }).length;
-        
-        // Calculate site-level SEO score
-        var siteScore = 0;
-        siteResults.forEach(function(r) {
-            siteScore += calculateSeoScore(r);
-        });
-        siteScore = Math.round(siteScore / siteResults.length);
-        
-        var siteGroup = document.createElement('div');
-        siteGroup.className = 'site-group';
-        
-        var headerHtml = '<div class="site-group-header">' +
-            '<h2><span class="seo-score-circle ' + getScoreClass(siteScore) + '" style="width:36px;height:36px;font-size:0.9em;">' + siteScore + '</span> ' + host + '</h2>' +
-            '<div class="site-group-stats">' +
-            '<div class="site-group-stat"><span>' + siteResults.length + '</span> pages</div>' +
-            '<div class="site-group-stat"><span>' + siteOk + '</span> OK</div>' +
-            '<div class="site-group-stat"><span>' + siteWarnings + '</span> warnings</div>' +
-            '</div></div>';
-        
-        var cardsContainer = document.createElement('div');
-        cardsContainer.className = 'seo-cards';
-        
-        siteResults.forEach(function(result) {
-            globalIndex++;
-            var hasWarnings = (result.warnings || []).length > 0;
-            var isNetworkError = (typeof result.status_code === 'number' && result.status_code >= 400) || result.status_message !== 'OK';
-            var isDuplicate = result.duplicate_of && result.duplicate_of.trim() !== '';
-
-            // Calculate page SEO score
-            var pageScore = calculateSeoScore(result);
-            var scoreClass = getScoreClass(pageScore);
-            
-            // Determine SEO status based on score
-            var seoStatus, seoStatusClass;
-            if (isNetworkError) {
-                seoStatus = 'Error';
-                seoStatusClass = 'status-danger';
-            } else if (pageScore >= 90) {
-                seoStatus = 'Excellent';
-                seoStatusClass = 'status-ok';
-            } else if (pageScore >= 70) {
-                seoStatus = 'Good';
-                seoStatusClass = 'status-ok';
-            } else if (pageScore >= 50) {
-                seoStatus = 'Needs Work';
-                seoStatusClass = 'status-warn';
-            } else {
-                seoStatus = 'Poor';
-                seoStatusClass = 'status-danger';
-            }
-
-            var codeClass = 'pill';
-            if (typeof result.status_code === 'number') {
-                if (result.status_code >= 200 && result.status_code < 300) codeClass += ' status-ok';
-                else if (result.status_code >= 300 && result.status_code < 400) codeClass += '';
-                else if (result.status_code >= 400) codeClass += ' status-danger';
-            }
-
-            // Format warnings as a list instead of semicolon-separated
-            var warningsHtml = '';
-            var warnings = result.warnings || [];
-            if (warnings.length > 0) {
-                warningsHtml = '<ul class="warning-list">';
-                warnings.forEach(function(warning) {
-                    var sevClass = getSeverityClass(warning);
-                    var priority = getIssuePriority(warning);
-                    warningsHtml += '<li class="' + sevClass + '" title="' + priority.impact + '">';
-                    warningsHtml += '<span class="warning-icon">⚠</span>' + warning + '</li>';
-                });
-                warningsHtml += '</ul>';
-            } else {
-                warningsHtml = 'No issues detected';
-            }
-            var warningsClass = isNetworkError ? 'warnings danger' : (hasWarnings ? 'warnings warn' : 'warnings ok');
-            var titleText = result.title || 'No title';
-            var metaText = result.meta_description || 'No description';
-            var h1Sample = (result.h1_samples || []).slice(0, 2).join(' | ') || 'No H1';
-            
-            var duplicateBadge = '';
-            if (isDuplicate) {
-                duplicateBadge = '<div class="pill status-warn" title="Duplicate of: ' + result.duplicate_of + '" style="cursor: help;">⚠ Duplicate</div>';
-            }
-
-            // Build heading hierarchy
-            var headingHtml = '<div class="heading-hierarchy">';
-            headingHtml += '<div class="heading-tag"><span class="tag-name">H1</span><span class="tag-count">' + result.h1_count + '</span></div>';
-            if (result.h2_count !== undefined) {
-                headingHtml += '<div class="heading-tag"><span class="tag-name">H2</span><span class="tag-count">' + result.h2_count + '</span></div>';
-            }
-            if (result.h3_count !== undefined) {
-                headingHtml += '<div class="heading-tag"><span class="tag-name">H3</span><span class="tag-count">' + result.h3_count + '</span></div>';
-            }
-            if (result.h4_count !== undefined) {
-                headingHtml += '<div class="heading-tag"><span class="tag-name">H4</span><span class="tag-count">' + result.h4_count + '</span></div>';
-            }
-            headingHtml += '</div>';
-
-            var card = document.createElement('div');
-            card.className = 'seo-card';
-            // Add data attributes for filtering/sorting
-            var resultWarnings = result.warnings || [];
-            card.dataset.score = pageScore;
-            card.dataset.hasIssues = (resultWarnings.length > 0).toString();
-            card.dataset.issueCount = resultWarnings.length;
-            
-            // Add double-click handler to open detailed audit modal
-            card.addEventListener('dblclick', function() {
-                openDetailedAudit(result);
-            });
-            card.style.cursor = 'pointer';
-            card.title = 'Double-click for detailed audit';
-            
-            card.innerHTML = [
-                '<div class="card-header">',
-                '  <div class="card-header-left">',
-                '    <div class="pill pill-number">#' + globalIndex + '</div>',
-                '    <div class="seo-score-circle ' + scoreClass + '" style="width:32px;height:32px;font-size:0.8em;">' + pageScore + '</div>',
-                '    <div class="' + codeClass + '" title="HTTP Status">' + result.status_code + '</div>',
-                '    <div class="pill">' + result.response_time + '</div>',
-                (isDuplicate ? '    ' + duplicateBadge : ''),
-                '  </div>',
-                '  <div class="card-header-right">',
-                (result.https ? '    <div class="pill status-ok">🔒 HTTPS</div>' : '    <div class="pill status-warn">⚠ HTTP</div>'),
-                '    <div class="pill ' + seoStatusClass + '" title="SEO Status">' + seoStatus + '</div>',
-                '  </div>',
-                '</div>',
-                '<div class="card-body">',
-                '  <div class="url"><a href="' + result.url + '" target="_blank" rel="noopener noreferrer">' + result.url + '</a></div>',
-                '  <div class="metrics-grid">',
-                '    <div class="metric-item"><div class="metric-value">' + (result.title_length || 0) + '</div><div class="metric-label">Title Chars</div></div>',
-                '    <div class="metric-item"><div class="metric-value">' + (result.meta_description_length || 0) + '</div><div class="metric-label">Meta Chars</div></div>',
-                '    <div class="metric-item"><div class="metric-value">' + result.h1_count + '</div><div class="metric-label">H1 Tags</div></div>',
-                '    <div class="metric-item"><div class="metric-value">' + result.word_count + '</div><div class="metric-label">Words</div></div>',
-                '    <div class="metric-item"><div class="metric-value">' + result.internal_links + '/' + result.external_links + '</div><div class="metric-label">Int/Ext Links</div></div>',
-                '    <div class="metric-item"><div class="metric-value">' + result.images_missing_alt + '/' + result.total_images + '</div><div class="metric-label">Img No Alt</div></div>',
-                '  </div>',
-                '  ' + headingHtml,
-                '  <div class="content-section">',
-                '    <div class="content-section-header">Page Title</div>',
-                '    <div class="content-section-body">' + titleText + '</div>',
-                '  </div>',
-                '  <div class="content-section">',
-                '    <div class="content-section-header">Meta Description</div>',
-                '    <div class="content-section-body">' + metaText + '</div>',
-                '  </div>',
-                '  <div class="tags-row">',
-                '    <div class="pill">H1: ' + h1Sample + '</div>',
-                '    <div class="pill">Robots: ' + (result.robots || 'none') + '</div>',
-                (result.canonical ? '    <div class="pill status-ok">Canonical</div>' : '    <div class="pill status-warn">No Canonical</div>'),
-                (result.has_viewport ? '    <div class="pill status-ok">Viewport</div>' : '    <div class="pill status-warn">No Viewport</div>'),
-                (result.has_lang ? '    <div class="pill status-ok">Lang: ' + result.lang + '</div>' : '    <div class="pill status-warn">No Lang</div>'),
-                '  </div>',
-                '  <div class="tags-row">',
-                (result.has_og_tags ? '    <div class="pill status-ok">Open Graph</div>' : '    <div class="pill status-info">No OG Tags</div>'),
-                (result.has_schema ? '    <div class="pill status-ok">Schema: ' + (result.schema_types || []).slice(0, 2).join(', ') + '</div>' : '    <div class="pill status-info">No Schema</div>'),
-                (result.has_twitter_cards ? '    <div class="pill status-ok">Twitter Card</div>' : ''),
-                '  </div>',
-                '  <div class="' + warningsClass + '">' + warningsHtml + '</div>',
-                '</div>'
-            ].join('');
-
-            cardsContainer.appendChild(card);
-        });
-        
-        siteGroup.innerHTML = headerHtml;
-        siteGroup.appendChild(cardsContainer);
-        cards.appendChild(siteGroup);
-    });
+    // Cards are grouped, filtered and sorted by the results worker and
+    // rendered as they scroll into view
+    seoResultsView.setResults(lastSeoResults);
 
     // Issues panel with severity
     if (issuesPanel) {
@@ -608,7 +658,7 @@ function displaySeoResults(results, sitemapDebug) {
         }
         
         // New: Broken links recommendation
-        var brokenLinkCount = results.filter(function(r) { return r.broken_links > 0; }).length;
+        var brokenLinkCount = summaryData.broken_link_pages;
         if (brokenLinkCount > 0) {
             recommendations.push({
                 severity: 'high',
@@ -619,7 +669,7 @@ function displaySeoResults(results, sitemapDebug) {
         }
         
         // New: Robots.txt recommendation
-        var noRobots = results.filter(function(r) { return !r.has_robots_txt; }).length;
+        var noRobots = summaryData.no_robots_pages;
         if (noRobots > 0) {
             recommendations.push({
                 severity: 'medium',
@@ -630,7 +680,7 @@ function displaySeoResults(results, sitemapDebug) {
         }
         
         // New: Sitemap recommendation
-        var noSitemap = results.filter(function(r) { return !r.has_sitemap; }).length;
+        var noSitemap = summaryData.no_sitemap_pages;
         if (noSitemap > 0) {
             recommendations.push({
                 severity: 'medium',
@@ -641,7 +691,7 @@ function displaySeoResults(results, sitemapDebug) {
         }
         
         // New: Image optimization
-        var imgNoDimensions = results.filter(function(r) { return r.images_no_dimensions > 0; }).length;
+        var imgNoDimensions = summaryData.images_no_dimensions_pages;
         if (imgNoDimensions > 0) {
             recommendations.push({
                 severity: 'low',
@@ -652,7 +702,7 @@ function displaySeoResults(results, sitemapDebug) {
         }
         
         // New: Large page size
-        var largePagesCount = results.filter(function(r) { return r.page_size_kb > 500; }).length;
+        var largePagesCount = summaryData.large_pages;
         if (largePagesCount > 0) {
             recommendations.push({
                 severity: 'medium',
@@ -725,4 +775,5 @@ function displaySeoResults(results, sitemapDebug) {
 
 window.checkWebsites = checkWebsites;
 window.runSeoAudit = runSeoAudit;
+window.rescoreSeoAudit = rescoreSeoAudit;
 window.displaySeoResults = displaySeoResults;
@@ -8,11 +8,24 @@ function printSeoReport() {
     window.print();
 }
 
+// Stored audits are exported by the server, streamed straight to a download
+// (large audits never have to fit in one string here). Returns false when
+// the results only exist in the browser (history entries, re-scored audits).
+function downloadServerExport(format) {
+    if (!lastSeoRunId) return false;
+    var link = document.createElement('a');
+    link.href = '/seo-audit/' + encodeURIComponent(lastSeoRunId) + '/export/' + format;
+    link.click();
+    showToast('Export started.', 'success');
+    return true;
+}
+
 function exportSeoJson() {
     if (!lastSeoResults.length) {
         showToast('Run an SEO audit first.', 'error');
         return;
     }
+    if (downloadServerExport('json')) return;
     var blob = new Blob([JSON.stringify(lastSeoResults, null, 2)], { type: 'application/json' });
     var link = document.createElement('a');
     link.href = URL.createObjectURL(blob);
@@ -27,6 +40,7 @@ function exportSeoCsv() {
         showToast('Run an SEO audit first.', 'error');
         return;
     }
+    if (downloadServerExport('csv')) return;
 
     var headers = [
         'url', 'seo_score', 'status_code', 'status_message', 'response_time', 
@@ -46,7 +60,7 @@ function exportSeoCsv() {
     };
 
     var rows = lastSeoResults.map(function(r) {
-        var score = calculateSeoScore(r);
+        var score = getPageScore(r);
         return [
             r.url,
             score,
@@ -96,6 +110,7 @@ function exportSeoPerSiteCsv() {
         showToast('Run an SEO audit first.', 'error');
         return;
     }
+    if (downloadServerExport('zip')) return;
     
     var escapeCsv = function(val) {
         var v = (val === null || val === undefined ? '' : val).toString();
@@ -125,7 +140,7 @@ function exportSeoPerSiteCsv() {
         
         var host = hosts[downloadIndex];
         var rows = grouped[host].map(function(r) {
-            var score = calculateSeoScore(r);
+            var score = getPageScore(r);
             return [
                 r.url,
                 score,
@@ -181,25 +196,22 @@ function exportExecutiveSummary() {
         showToast('Run an SEO audit first.', 'error');
         return;
     }
+    if (downloadServerExport('md')) return;
 
-    // Calculate overall stats
-    var total = lastSeoResults.length;
-    var totalScore = 0;
+    // Overall stats come from the precomputed audit summary
+    var summary = lastSeoSummary || summarizeSeoResults(lastSeoResults);
+    var total = summary.total;
     var issueCount = { high: 0, medium: 0, low: 0 };
-    var warningCounts = {};
+    var warningCounts = summary.warning_counts || {};
 
-    lastSeoResults.forEach(function(r) {
-        totalScore += calculateSeoScore(r);
-        (r.warnings || []).forEach(function(w) {
-            warningCounts[w] = (warningCounts[w] || 0) + 1;
-            var sev = getSeverityClass(w);
-            if (sev === 'severity-high') issueCount.high++;
-            else if (sev === 'severity-medium') issueCount.medium++;
-            else issueCount.low++;
-        });
+    Object.keys(warningCounts).forEach(function(w) {
+        var sev = getSeverityClass(w);
+        if (sev === 'severity-high') issueCount.high += warningCounts[w];
+        else if (sev === 'severity-medium') issueCount.medium += warningCounts[w];
+        else issueCount.low += warningCounts[w];
     });
 
-    var avgScore = Math.round(totalScore / total);
+    var avgScore = summary.avg_score;
     var scoreLabel = getScoreLabel(avgScore);
 
     var report = '# SEO Audit Executive Summary\n\n';
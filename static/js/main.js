@@ -2,7 +2,7 @@
    MAIN - ZenStatus
    ==============================================
    Application initialization
-   Depends on: storage.js (ZenStorage), ui.js, api.js
+   Depends on: storage.js (ZenHistory), ui.js, api.js
 */
 
 // Initialize on DOM ready
@@ -18,140 +18,110 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 // ============================================
-// AUDIT HISTORY (using ZenStorage)
+// AUDIT HISTORY (using ZenHistory)
 // ============================================
 
-var HISTORY_KEY = 'zenStatusAuditHistory';
 var MAX_HISTORY = 10;
+// Hostnames kept in a history entry for the list (the rest are counted)
+var HISTORY_SITES_SHOWN = 3;
 
 function initAuditHistory() {
     var historyContainer = document.getElementById('historyContainer');
     if (!historyContainer) return;
     
-    // Hide history container if storage not available
-    if (!ZenStorage.isAvailable()) {
+    // Hide history container if IndexedDB is not available
+    if (!ZenHistory.isAvailable()) {
         historyContainer.style.display = 'none';
         return;
     }
     
-    updateHistoryUI();
+    updateHistoryUI().catch(function() {
+        historyContainer.style.display = 'none';
+    });
 }
 
-function saveAuditToHistory(results) {
+function saveAuditToHistory(results, summary) {
     if (!results || results.length === 0) return;
-    if (!ZenStorage.isAvailable()) return;
+    if (!ZenHistory.isAvailable()) return;
     
-    var history = getAuditHistory();
+    var sites = summary ? Object.keys(summary.sites) : [...new Set(results.map(function(r) {
+        return getHostname(r.url);
+    }))];
+    // Only this small entry is read to list history; results load when opened
     var entry = {
         id: Date.now(),
         date: new Date().toISOString(),
         pageCount: results.length,
-        sites: [...new Set(results.map(function(r) {
-            try { return new URL(r.url).hostname; } catch(e) { return 'unknown'; }
-        }))],
-        avgScore: Math.round(results.reduce(function(sum, r) {
-            return sum + calculateSeoScore(r);
-        }, 0) / results.length),
-        results: results
+        sites: sites.slice(0, HISTORY_SITES_SHOWN),
+        siteCount: sites.length,
+        avgScore: summary ? summary.avg_score : summarizeSeoResults(results).avg_score
     };
     
-    history.unshift(entry);
-    if (history.length > MAX_HISTORY) {
-        history = history.slice(0, MAX_HISTORY);
-    }
-    
-    if (!ZenStorage.setJSON(HISTORY_KEY, history)) {
-        // Storage full, remove oldest entries
-        history = history.slice(0, 5);
-        ZenStorage.setJSON(HISTORY_KEY, history);
-    }
-    
-    updateHistoryUI();
-    showToast('Audit saved to history', 'success');
+    ZenHistory.save(entry, { summary: summary || null, results: results }, MAX_HISTORY).then(function() {
+        updateHistoryUI();
+        showToast('Audit saved to history', 'success');
+    }).catch(function(e) {
+        console.error('Error saving audit to history:', e);
+        showToast('Could not save audit to history', 'error');
+    });
 }
 
 function getAuditHistory() {
-    return ZenStorage.getJSON(HISTORY_KEY, []);
+    return ZenHistory.list();
 }
 
 function loadAuditFromHistory(id) {
-    try {
-        console.log('=== loadAuditFromHistory START ===');
-        console.log('Loading audit with id:', id);
-        var history = getAuditHistory();
-        console.log('History entries:', history.length);
-        var entry = history.find(function(h) { return h.id === id; });
-        console.log('Found entry:', entry ? 'yes' : 'no');
-        
-        if (entry && entry.results && entry.results.length > 0) {
-            console.log('Results count:', entry.results.length);
-            // Update global variable
-            if (typeof window.lastSeoResults !== 'undefined') {
-                window.lastSeoResults = entry.results;
-            }
-            lastSeoResults = entry.results;
-            
-            // Check if displaySeoResults exists
-            if (typeof window.displaySeoResults === 'function') {
-                console.log('Calling window.displaySeoResults...');
-                try {
-                    window.displaySeoResults(entry.results, null);
-                    console.log('displaySeoResults completed successfully');
-                    showToast('Loaded audit from ' + new Date(entry.date).toLocaleDateString(), 'success');
-                } catch (displayError) {
-                    console.error('Error in displaySeoResults:', displayError);
-                    showToast('Error displaying results: ' + displayError.message, 'error');
-                }
-            } else if (typeof displaySeoResults === 'function') {
-                console.log('Calling local displaySeoResults...');
-                displaySeoResults(entry.results, null);
-                showToast('Loaded audit from ' + new Date(entry.date).toLocaleDateString(), 'success');
-            } else {
-                console.error('displaySeoResults function not found');
-                showToast('Error: Display function not available', 'error');
-            }
-        } else {
-            console.log('No results in entry');
+    ZenHistory.get(id).then(function(entry) {
+        if (!entry || !entry.results || entry.results.length === 0) {
             showToast('No results found in history entry', 'error');
+            return;
         }
-        console.log('=== loadAuditFromHistory END ===');
-    } catch (e) {
+        
+        lastSeoResults = entry.results;
+        lastSeoRunId = null;
+        lastSeoJobId = null;
+        displaySeoResults(entry.results, null, entry.summary);
+        displaySampleEstimate(null);
+        showToast('Loaded audit from ' + new Date(id).toLocaleDateString(), 'success');
+    }).catch(function(e) {
         console.error('Error in loadAuditFromHistory:', e);
         showToast('Error loading audit: ' + e.message, 'error');
-    }
+    });
 }
 
 function clearAuditHistory() {
-    if (!ZenStorage.isAvailable()) return;
-    ZenStorage.removeItem(HISTORY_KEY);
-    updateHistoryUI();
-    showToast('History cleared', 'info');
+    if (!ZenHistory.isAvailable()) return;
+    ZenHistory.clear().then(function() {
+        updateHistoryUI();
+        showToast('History cleared', 'info');
+    });
 }
 
 function updateHistoryUI() {
     var historyList = document.getElementById('historyList');
-    if (!historyList) return;
-    
-    var history = getAuditHistory();
-    
-    if (history.length === 0) {
-        historyList.innerHTML = '<div class="history-empty">No saved audits</div>';
-        return;
-    }
-    
-    var html = history.map(function(h) {
-        var date = new Date(h.date);
-        var dateStr = date.toLocaleDateString() + ' ' + date.toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
-        var sites = h.sites.slice(0, 2).join(', ') + (h.sites.length > 2 ? '...' : '');
-        return '<div class="history-item" onclick="loadAuditFromHistory(' + h.id + ')">' +
-            '<div class="history-item-date">' + dateStr + '</div>' +
-            '<div class="history-item-info">' + h.pageCount + ' pages | Avg Score: ' + h.avgScore + '</div>' +
-            '<div class="history-item-sites">' + sites + '</div>' +
-            '</div>';
-    }).join('');
+    if (!historyList) return Promise.resolve();
     
-    html += '<div class="history-clear" onclick="clearAuditHistory()">Clear History</div>';
-    historyList.innerHTML = html;
+    return getAuditHistory().then(function(history) {
+        if (history.length === 0) {
+            historyList.innerHTML = '<div class="history-empty">No saved audits</div>';
+            return;
+        }
+        
+        var html = history.map(function(h) {
+            var date = new Date(h.date);
+            var dateStr = date.toLocaleDateString() + ' ' + date.toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
+            var siteCount = h.siteCount || h.sites.length;
+            var sites = h.sites.slice(0, 2).join(', ') + (siteCount > 2 ? '...' : '');
+            return '<div class="history-item" onclick="loadAuditFromHistory(' + h.id + ')">' +
+                '<div class="history-item-date">' + dateStr + '</div>' +
+                '<div class="history-item-info">' + h.pageCount + ' pages | Avg Score: ' + h.avgScore + '</div>' +
+                '<div class="history-item-sites">' + sites + '</div>' +
+                '</div>';
+        }).join('');
+        
+        html += '<div class="history-clear" onclick="clearAuditHistory()">Clear History</div>';
+        historyList.innerHTML = html;
+    });
 }
 
 // ============================================
@@ -192,13 +162,11 @@ function triggerFileUpload() {
 // FILTER & SORT
 // ============================================
 
-var currentFilter = 'all';
-var currentSort = 'default';
+// Filtering and sorting run in the results worker (see results-view.js);
+// the view resets to 'all' / 'default' whenever new results are shown
 
 function filterCards(filter) {
-    console.log('filterCards called with:', filter);
-    currentFilter = filter;
-    applyFilterSort();
+    seoResultsView.setOptions({ filter: filter });
     
     // Update active button - use querySelectorAll to find the clicked button
     document.querySelectorAll('.filter-btn').forEach(function(btn) {
@@ -211,49 +179,7 @@ function filterCards(filter) {
 }
 
 function sortCards(sortBy) {
-    currentSort = sortBy;
-    applyFilterSort();
-}
-
-function applyFilterSort() {
-    var cards = Array.from(document.querySelectorAll('.seo-card'));
-    
-    // First, filter the cards
-    cards.forEach(function(card) {
-        var score = parseInt(card.dataset.score || 0);
-        var hasIssues = card.dataset.hasIssues === 'true';
-        
-        var show = true;
-        if (currentFilter === 'issues' && !hasIssues) show = false;
-        if (currentFilter === 'good' && score < 70) show = false;
-        if (currentFilter === 'poor' && score >= 70) show = false;  // Show only scores < 70
-        
-        card.style.display = show ? '' : 'none';
-    });
-    
-    // Then sort the visible cards within each site-group
-    if (currentSort !== 'default') {
-        document.querySelectorAll('.site-group .seo-cards').forEach(function(container) {
-            var sortableCards = Array.from(container.querySelectorAll('.seo-card'));
-            
-            sortableCards.sort(function(a, b) {
-                var scoreA = parseInt(a.dataset.score || 0);
-                var scoreB = parseInt(b.dataset.score || 0);
-                var issuesA = parseInt(a.dataset.issueCount || 0);
-                var issuesB = parseInt(b.dataset.issueCount || 0);
-                
-                if (currentSort === 'score-asc') return scoreA - scoreB;
-                if (currentSort === 'score-desc') return scoreB - scoreA;
-                if (currentSort === 'issues') return issuesB - issuesA;
-                return 0;
-            });
-            
-            // Re-append in sorted order
-            sortableCards.forEach(function(card) {
-                container.appendChild(card);
-            });
-        });
-    }
+    seoResultsView.setOptions({ sort: sortBy });
 }
 
 // ============================================
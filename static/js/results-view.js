@@ -0,0 +1,274 @@
+/* ==============================================
+   RESULTS VIEW - ZenStatus
+   ==============================================
+   Virtualized SEO result cards. The results worker decides which cards
+   show and in what order; only the lines near the viewport are in the
+   DOM, so thousands of pages scroll as smoothly as ten.
+*/
+
+var ESTIMATED_SITE_HEIGHT = 110;
+var ESTIMATED_CARD_HEIGHT = 560;
+var OVERSCAN_PX = 1200;
+// Space below each site's box (margin-bottom of .site-group)
+var SITE_GROUP_GAP = 48;
+
+// ============================================
+// VIRTUAL LIST
+// ============================================
+
+// Lays rows out in lines (a site header, or up to `columns` cards side by
+// side, as in the .seo-cards grid) and keeps only the visible lines
+// rendered. Line heights are measured once rendered and cached by line key.
+function VirtualList(container) {
+    this.container = container;
+    this.rows = [];
+    this.lines = [];
+    this.offsets = [];
+    this.heights = {};
+    this.rendered = {};
+    this.columns = 0;
+    this.frame = null;
+
+    container.innerHTML = '';
+    container.classList.add('virtual-list');
+    this.probe = document.createElement('div');
+    this.probe.className = 'seo-cards virtual-probe';
+    container.appendChild(this.probe);
+
+    var self = this;
+    this.onScroll = function() { self.schedule(); };
+    window.addEventListener('scroll', this.onScroll, { passive: true });
+    window.addEventListener('resize', this.onScroll);
+    window.addEventListener('beforeprint', function() { self.renderAll(); });
+    window.addEventListener('afterprint', function() { self.clear(); self.schedule(); });
+}
+
+VirtualList.prototype.readColumns = function() {
+    var template = getComputedStyle(this.probe).gridTemplateColumns || '';
+    return Math.max(1, template.split(' ').filter(Boolean).length);
+};
+
+VirtualList.prototype.setRows = function(rows) {
+    this.rows = rows;
+    this.columns = this.readColumns();
+    this.buildLines();
+    this.schedule();
+};
+
+VirtualList.prototype.buildLines = function() {
+    var lines = [];
+    var current = null;
+    for (var i = 0; i < this.rows.length; i++) {
+        var row = this.rows[i];
+        if (row.type === 'site') {
+            if (lines.length) lines[lines.length - 1].last = true;
+            lines.push({
+                key: ['site', row.host, row.pages, row.ok, row.with_warnings, row.avg_score].join(':'),
+                site: row,
+                cards: []
+            });
+            current = null;
+            continue;
+        }
+        if (!current || current.cards.length >= this.columns) {
+            current = { key: '', cards: [] };
+            lines.push(current);
+        }
+        current.cards.push(row);
+    }
+    if (lines.length) lines[lines.length - 1].last = true;
+    lines.forEach(function(line) {
+        if (!line.site) {
+            line.key = 'cards:' + line.cards.map(function(card) { return card.index; }).join(',');
+        }
+        line.key += line.last ? ':last' : '';
+    });
+    this.lines = lines;
+    this.computeOffsets();
+};
+
+VirtualList.prototype.lineHeight = function(line) {
+    var height = this.heights[line.key];
+    if (height !== undefined) return height;
+    return line.site ? ESTIMATED_SITE_HEIGHT : ESTIMATED_CARD_HEIGHT;
+};
+
+VirtualList.prototype.computeOffsets = function() {
+    var offsets = new Array(this.lines.length);
+    var top = 0;
+    for (var i = 0; i < this.lines.length; i++) {
+        offsets[i] = top;
+        top += this.lineHeight(this.lines[i]);
+    }
+    this.offsets = offsets;
+    this.container.style.height = top + 'px';
+};
+
+VirtualList.prototype.schedule = function() {
+    var self = this;
+    if (this.frame) return;
+    this.frame = requestAnimationFrame(function() {
+        self.frame = null;
+        self.render();
+    });
+};
+
+VirtualList.prototype.firstVisible = function(top) {
+    // Binary search for the first line ending below `top`
+    var lo = 0, hi = this.lines.length - 1, found = this.lines.length;
+    while (lo <= hi) {
+        var mid = (lo + hi) >> 1;
+        if (this.offsets[mid] + this.lineHeight(this.lines[mid]) > top) {
+            found = mid;
+            hi = mid - 1;
+        } else {
+            lo = mid + 1;
+        }
+    }
+    return found;
+};
+
+VirtualList.prototype.createLine = function(line) {
+    var el = document.createElement('div');
+    el.className = 'virtual-line site-segment' + (line.site ? ' site-segment-first' : '') + (line.last ? ' site-segment-last' : '');
+    el.innerHTML = line.site ? siteHeaderHtml(line.site) :
+        '<div class="seo-cards">' + line.cards.map(function(card) {
+            return seoCardHtml(seoResultsView.results[card.index], card.index, card.number);
+        }).join('') + '</div>';
+    return el;
+};
+
+VirtualList.prototype.render = function() {
+    // Nothing to measure while the report is hidden
+    if (!this.container.offsetParent) return;
+    var columns = this.readColumns();
+    if (columns !== this.columns) {
+        this.columns = columns;
+        this.buildLines();
+    }
+
+    var rect = this.container.getBoundingClientRect();
+    var top = -rect.top - OVERSCAN_PX;
+    var bottom = -rect.top + window.innerHeight + OVERSCAN_PX;
+    var wanted = {};
+    var added = [];
+    for (var i = this.firstVisible(top); i < this.lines.length && this.offsets[i] < bottom; i++) {
+        var line = this.lines[i];
+        wanted[line.key] = i;
+        if (!this.rendered[line.key]) {
+            var el = this.createLine(line);
+            this.container.appendChild(el);
+            this.rendered[line.key] = el;
+            added.push(line);
+        }
+    }
+    for (var key in this.rendered) {
+        if (!(key in wanted)) {
+            this.container.removeChild(this.rendered[key]);
+            delete this.rendered[key];
+        }
+    }
+
+    // Measure new lines; if estimates were off, lay out again
+    var changed = false;
+    var self = this;
+    added.forEach(function(line) {
+        var height = self.rendered[line.key].offsetHeight + (line.last ? SITE_GROUP_GAP : 0);
+        if (self.heights[line.key] !== height) {
+            self.heights[line.key] = height;
+            changed = true;
+        }
+    });
+    if (changed) this.computeOffsets();
+    for (var k in wanted) {
+        this.rendered[k].style.transform = 'translateY(' + this.offsets[wanted[k]] + 'px)';
+    }
+};
+
+VirtualList.prototype.clear = function() {
+    for (var key in this.rendered) {
+        this.container.removeChild(this.rendered[key]);
+    }
+    this.rendered = {};
+    this.container.classList.remove('virtual-print');
+};
+
+// Printing needs every card in the document flow
+VirtualList.prototype.renderAll = function() {
+    this.clear();
+    this.container.classList.add('virtual-print');
+    var self = this;
+    this.lines.forEach(function(line) {
+        var el = self.createLine(line);
+        self.container.appendChild(el);
+        self.rendered[line.key] = el;
+    });
+};
+
+// ============================================
+// RESULTS VIEW
+// ============================================
+
+// Results live here (indexed like in the worker); the worker turns them
+// into rows for the current filter and sort, the list renders the rows.
+var seoResultsView = {
+    results: [],
+    worker: null,
+    list: null,
+    version: 0,
+    pending: [],
+    flushQueued: false,
+
+    init: function() {
+        if (this.worker) return;
+        var container = document.getElementById('seoCards');
+        this.list = new VirtualList(container);
+        this.worker = new Worker('/static/js/results-worker.js');
+        var self = this;
+        this.worker.onmessage = function(event) {
+            var view = event.data;
+            // Views computed for a replaced result set are dropped
+            if (view.type !== 'view' || view.version !== self.version) return;
+            self.list.setRows(view.rows);
+        };
+        container.addEventListener('dblclick', function(event) {
+            var card = event.target.closest('.seo-card');
+            if (card) openDetailedAudit(self.results[Number(card.dataset.index)]);
+        });
+    },
+
+    // Replace all results (audit complete, history entry, re-score)
+    setResults: function(results) {
+        this.init();
+        this.results = results.slice();
+        this.pending = [];
+        this.version++;
+        this.list.heights = {};
+        this.list.clear();
+        this.list.setRows([]);
+        this.worker.postMessage({ type: 'set', results: this.results });
+    },
+
+    // Add results as they stream in; batched to one worker message per frame
+    append: function(result) {
+        this.init();
+        this.results.push(result);
+        this.pending.push(result);
+        if (this.flushQueued) return;
+        this.flushQueued = true;
+        var self = this;
+        requestAnimationFrame(function() {
+            self.flushQueued = false;
+            if (!self.pending.length) return;
+            self.worker.postMessage({ type: 'add', results: self.pending });
+            self.pending = [];
+        });
+    },
+
+    setOptions: function(options) {
+        this.init();
+        this.worker.postMessage({ type: 'options', filter: options.filter, sort: options.sort });
+    }
+};
+
+window.seoResultsView = seoResultsView;
@@ -0,0 +1,90 @@
+/* ==============================================
+   RESULTS WORKER - ZenStatus
+   ==============================================
+   Scores, groups, filters and sorts SEO results off the main thread.
+   Posts back the rows of the results view (site headers and card
+   indexes) for the virtual list in results-view.js to render.
+*/
+
+importScripts('/static/js/scoring.js');
+
+var entries = [];
+var filter = 'all';
+var sort = 'default';
+var version = 0;
+
+function toEntry(result, index) {
+    var warnings = result.warnings || [];
+    return {
+        index: index,
+        host: getHostname(result.url),
+        score: getPageScore(result),
+        issues: warnings.length,
+        ok: result.status_message === 'OK'
+    };
+}
+
+function matchesFilter(entry) {
+    if (filter === 'issues') return entry.issues > 0;
+    if (filter === 'good') return entry.score >= 70;
+    if (filter === 'poor') return entry.score < 70;
+    return true;
+}
+
+function compareEntries(a, b) {
+    if (sort === 'score-asc') return a.score - b.score;
+    if (sort === 'score-desc') return b.score - a.score;
+    if (sort === 'issues') return b.issues - a.issues;
+    return 0;
+}
+
+function buildView() {
+    var groups = {};
+    entries.forEach(function(entry) {
+        if (!groups[entry.host]) groups[entry.host] = [];
+        groups[entry.host].push(entry);
+    });
+
+    var rows = [];
+    var number = 0;
+    Object.keys(groups).sort().forEach(function(host) {
+        var group = groups[host];
+        var scoreSum = 0, ok = 0, withWarnings = 0;
+        group.forEach(function(entry) {
+            // Card numbers follow the unfiltered, unsorted order
+            entry.number = ++number;
+            scoreSum += entry.score;
+            if (entry.ok) ok++;
+            if (entry.issues > 0) withWarnings++;
+        });
+        rows.push({
+            type: 'site', host: host, pages: group.length, ok: ok,
+            with_warnings: withWarnings, avg_score: Math.round(scoreSum / group.length)
+        });
+
+        var visible = group.filter(matchesFilter);
+        if (sort !== 'default') visible.sort(compareEntries);
+        visible.forEach(function(entry) {
+            rows.push({ type: 'card', index: entry.index, number: entry.number });
+        });
+    });
+    return rows;
+}
+
+self.onmessage = function(event) {
+    var message = event.data;
+    if (message.type === 'set') {
+        entries = message.results.map(toEntry);
+        filter = 'all';
+        sort = 'default';
+        version++;
+    } else if (message.type === 'add') {
+        message.results.forEach(function(result) {
+            entries.push(toEntry(result, entries.length));
+        });
+    } else if (message.type === 'options') {
+        if (message.filter) filter = message.filter;
+        if (message.sort) sort = message.sort;
+    }
+    self.postMessage({ type: 'view', version: version, rows: buildView() });
+};
@@ -0,0 +1,169 @@
+/* ==============================================
+   SCORING - ZenStatus
+   ==============================================
+   Page scores, score bands and the fallback summary. No DOM access:
+   also loaded by the results worker (results-worker.js)
+*/
+
+// SEO Score calculation helper
+function calculateSeoScore(result) {
+    var score = 100;
+    var warnings = result.warnings || [];
+    
+    // CRITICAL ISSUES - Major SEO impact
+    // Page accessibility & indexability (-20 points each)
+    if (result.status_code >= 400) score -= 20;
+    if (result.status_code >= 500) score -= 25;
+    if (result.robots && result.robots.includes('noindex')) score -= 20;
+    if (!result.https) score -= 15;
+    
+    // Missing essential meta tags (-12 points each)
+    if (!result.title) score -= 12;
+    if (!result.meta_description) score -= 12;
+    if (result.h1_count === 0) score -= 12;
+    
+    // HIGH PRIORITY ISSUES - Significant SEO impact
+    // Poor quality meta tags (-8 points each)
+    if (result.title && result.title_length < 30) score -= 8;
+    if (result.title && result.title_length > 60) score -= 8;
+    if (result.meta_description && result.meta_description_length < 120) score -= 8;
+    if (result.meta_description && result.meta_description_length > 160) score -= 8;
+    
+    // Content & structure issues (-7 points each)
+    if (result.h1_count > 1) score -= 7;
+    if (!result.canonical) score -= 7;
+    if (!result.has_viewport) score -= 7;
+    if (result.word_count < 300) score -= 7;
+    
+    // MEDIUM PRIORITY ISSUES - Moderate SEO impact
+    // Technical SEO (-5 points each)
+    if (!result.has_sitemap) score -= 5;
+    if (!result.has_robots_txt) score -= 4;
+    if (result.redirect_count > 0) score -= 4;
+    if (result.url_has_underscores) score -= 3;
+    
+    // Image optimization (scale with severity)
+    if (result.images_missing_alt > 0) {
+        var altPenalty = Math.min(10, Math.floor(result.images_missing_alt / 5) + 3);
+        score -= altPenalty;
+    }
+    if (result.images_no_dimensions > 10) {
+        score -= Math.min(7, Math.floor(result.images_no_dimensions / 10) + 2);
+    }
+    if (result.images_not_lazy > 10) {
+        score -= Math.min(6, Math.floor(result.images_not_lazy / 15) + 2);
+    }
+    
+    // Link issues
+    if (result.broken_links > 0) {
+        score -= Math.min(8, result.broken_links * 2);
+    }
+    
+    // LOW PRIORITY ISSUES - Minor SEO impact (-3 points each)
+    if (!result.has_lang) score -= 3;
+    if (!result.has_og_tags) score -= 3;
+    if (!result.has_schema) score -= 3;
+    if (!result.has_twitter_cards) score -= 2;
+    
+    // Performance issues
+    if (result.render_blocking_count > 20) {
+        score -= Math.min(8, Math.floor(result.render_blocking_count / 10));
+    }
+    if (result.response_time) {
+        var responseTime = parseFloat(result.response_time);
+        if (responseTime > 3) score -= 6;
+        else if (responseTime > 2) score -= 4;
+        else if (responseTime > 1) score -= 2;
+    }
+    if (result.page_size_kb > 2000) {
+        score -= Math.min(5, Math.floor((result.page_size_kb - 2000) / 500));
+    }
+    
+    return Math.max(0, Math.min(100, score));
+}
+
+// Page score: precomputed by the server (seo_score), calculated locally
+// only for audits saved to history before server-side scoring existed
+function getPageScore(result) {
+    if (typeof result.seo_score === 'number') return result.seo_score;
+    return calculateSeoScore(result);
+}
+
+function getHostname(url) {
+    try { return new URL(url).hostname || 'unknown'; } catch (e) { return 'unknown'; }
+}
+
+// Fallback summary with the same shape as the server's 'complete' summary,
+// used when loading legacy history entries that were saved without one
+function summarizeSeoResults(results) {
+    var summary = {
+        total: results.length, site_count: 0, ok_pages: 0, avg_score: 0, avg_response: 0, avg_words: 0,
+        missing_titles: 0, missing_descriptions: 0, missing_h1: 0, https_pages: 0, pages_with_issues: 0,
+        broken_link_pages: 0, no_robots_pages: 0, no_sitemap_pages: 0, images_no_dimensions_pages: 0, large_pages: 0,
+        distribution: { excellent: 0, good: 0, average: 0, poor: 0, critical: 0 },
+        top_warnings: [], warning_counts: {}, sites: {}
+    };
+    var scoreSum = 0, respSum = 0, respCount = 0, wordSum = 0, wordCount = 0;
+
+    results.forEach(function(r) {
+        var score = getPageScore(r);
+        var warnings = r.warnings || [];
+        var isOk = r.status_message === 'OK';
+        scoreSum += score;
+        summary.distribution[getScoreClass(score).replace('score-', '')]++;
+        if (isOk) summary.ok_pages++;
+        if (r.response_time && r.response_time !== 'N/A') { respSum += parseFloat(r.response_time); respCount++; }
+        if (typeof r.word_count === 'number' && r.word_count > 0) { wordSum += r.word_count; wordCount++; }
+        if (!r.title) summary.missing_titles++;
+        if (!r.meta_description) summary.missing_descriptions++;
+        if (r.h1_count === 0) summary.missing_h1++;
+        if (r.https) summary.https_pages++;
+        if (warnings.length > 0) summary.pages_with_issues++;
+        if (r.broken_links > 0) summary.broken_link_pages++;
+        if (!r.has_robots_txt) summary.no_robots_pages++;
+        if (!r.has_sitemap) summary.no_sitemap_pages++;
+        if (r.images_no_dimensions > 0) summary.images_no_dimensions_pages++;
+        if (r.page_size_kb > 500) summary.large_pages++;
+        warnings.forEach(function(w) {
+            summary.warning_counts[w] = (summary.warning_counts[w] || 0) + 1;
+        });
+
+        var host = getHostname(r.url);
+        var site = summary.sites[host] || (summary.sites[host] = { pages: 0, ok: 0, with_warnings: 0, avg_score: 0, _sum: 0 });
+        site.pages++;
+        site._sum += score;
+        if (isOk) site.ok++;
+        if (warnings.length > 0) site.with_warnings++;
+    });
+
+    Object.keys(summary.sites).forEach(function(host) {
+        var site = summary.sites[host];
+        site.avg_score = Math.round(site._sum / site.pages);
+        delete site._sum;
+    });
+    summary.site_count = Object.keys(summary.sites).length;
+    summary.avg_score = results.length ? Math.round(scoreSum / results.length) : 0;
+    summary.avg_response = respCount ? respSum / respCount : 0;
+    summary.avg_words = wordCount ? Math.round(wordSum / wordCount) : 0;
+    summary.top_warnings = Object.keys(summary.warning_counts)
+        .sort(function(a, b) { return summary.warning_counts[b] - summary.warning_counts[a]; })
+        .slice(0, 8)
+        .map(function(w) { return { text: w, count: summary.warning_counts[w] }; });
+    return summary;
+}
+
+function getScoreClass(score) {
+    if (score >= 90) return 'score-excellent';
+    if (score >= 70) return 'score-good';
+    if (score >= 50) return 'score-average';
+    if (score >= 30) return 'score-poor';
+    return 'score-critical';
+}
+
+function getScoreLabel(score) {
+    if (score >= 90) return 'Excellent';
+    if (score >= 70) return 'Good';
+    if (score >= 50) return 'Average';
+    if (score >= 30) return 'Poor';
+    return 'Critical';
+}
@@ -1,7 +1,8 @@
 /* ==============================================
    STORAGE - ZenStatus
    ==============================================
-   Unified localStorage wrapper with safe fallbacks
+   Unified localStorage wrapper with safe fallbacks, and the IndexedDB
+   store for audit history (ZenHistory)
    This module MUST be loaded first before any other JS
 */
 
@@ -197,3 +198,200 @@ var ZenStorage = (function() {
 
 // Make it globally accessible
 window.ZenStorage = ZenStorage;
+
+// ============================================
+// AUDIT HISTORY STORE (IndexedDB)
+// ============================================
+
+// One record per audit in two object stores: 'summaries' holds the small
+// entries the history list shows, 'payloads' the full results (gzip
+// compressed where CompressionStream exists). Listing history reads only
+// summaries; an audit's results are read and decompressed when it is opened.
+var ZenHistory = (function() {
+    'use strict';
+
+    var DB_NAME = 'zenstatus';
+    var DB_VERSION = 1;
+    // Audit history kept by ZenStorage before IndexedDB; imported once
+    var LEGACY_KEY = 'zenStatusAuditHistory';
+
+    var _dbPromise = null;
+
+    function _request(req) {
+        return new Promise(function(resolve, reject) {
+            req.onsuccess = function() { resolve(req.result); };
+            req.onerror = function() { reject(req.error); };
+        });
+    }
+
+    function _done(tx) {
+        return new Promise(function(resolve, reject) {
+            tx.oncomplete = function() { resolve(); };
+            tx.onerror = function() { reject(tx.error); };
+            tx.onabort = function() { reject(tx.error || new Error('Transaction aborted')); };
+        });
+    }
+
+    /**
+     * Check if IndexedDB exists (opening it may still fail, e.g. in private windows)
+     * @returns {boolean}
+     */
+    function isAvailable() {
+        try {
+            return typeof window.indexedDB !== 'undefined' && window.indexedDB !== null;
+        } catch (e) {
+            return false;
+        }
+    }
+
+    function _open() {
+        if (_dbPromise) return _dbPromise;
+        _dbPromise = new Promise(function(resolve, reject) {
+            var req;
+            try {
+                req = window.indexedDB.open(DB_NAME, DB_VERSION);
+            } catch (e) {
+                reject(e);
+                return;
+            }
+            req.onupgradeneeded = function() {
+                var db = req.result;
+                if (!db.objectStoreNames.contains('summaries')) {
+                    db.createObjectStore('summaries', { keyPath: 'id' });
+                }
+                if (!db.objectStoreNames.contains('payloads')) {
+                    db.createObjectStore('payloads', { keyPath: 'id' });
+                }
+            };
+            req.onsuccess = function() { resolve(req.result); };
+            req.onerror = function() { reject(req.error); };
+            req.onblocked = function() { reject(new Error('History database is blocked by another tab')); };
+        }).then(_importLegacy);
+        _dbPromise.catch(function(e) {
+            console.log('ZenHistory: IndexedDB not available -', e && e.message);
+        });
+        return _dbPromise;
+    }
+
+    function _encode(value) {
+        var json = JSON.stringify(value);
+        if (typeof CompressionStream === 'undefined') {
+            return Promise.resolve({ encoding: 'json', data: json });
+        }
+        var stream = new Blob([json]).stream().pipeThrough(new CompressionStream('gzip'));
+        return new Response(stream).blob().then(function(blob) {
+            return { encoding: 'gzip', data: blob };
+        });
+    }
+
+    function _decode(record) {
+        if (record.encoding !== 'gzip') {
+            return Promise.resolve(JSON.parse(record.data));
+        }
+        var stream = record.data.stream().pipeThrough(new DecompressionStream('gzip'));
+        return new Response(stream).text().then(JSON.parse);
+    }
+
+    // Compress first: a transaction commits as soon as it has nothing left
+    // to do, so it cannot wait for the compression stream
+    function _put(db, summary, payload) {
+        return _encode(payload).then(function(encoded) {
+            var tx = db.transaction(['summaries', 'payloads'], 'readwrite');
+            tx.objectStore('summaries').put(summary);
+            tx.objectStore('payloads').put({ id: summary.id, encoding: encoded.encoding, data: encoded.data });
+            return _done(tx);
+        });
+    }
+
+    function _importLegacy(db) {
+        var legacy = ZenStorage.getJSON(LEGACY_KEY, null);
+        if (!Array.isArray(legacy) || legacy.length === 0) return db;
+        return Promise.all(legacy.map(function(entry) {
+            var payload = { summary: entry.summary || null, results: entry.results || [] };
+            delete entry.summary;
+            delete entry.results;
+            return _put(db, entry, payload);
+        })).then(function() {
+            ZenStorage.removeItem(LEGACY_KEY);
+            return db;
+        }, function(e) {
+            console.log('ZenHistory: Could not import saved audits -', e && e.message);
+            return db;
+        });
+    }
+
+    function _summaries(db) {
+        return _request(db.transaction('summaries').objectStore('summaries').getAll()).then(function(rows) {
+            return rows.sort(function(a, b) { return b.id - a.id; });
+        });
+    }
+
+    /**
+     * History list entries, newest first (no results)
+     * @returns {Promise<Array>}
+     */
+    function list() {
+        return _open().then(_summaries);
+    }
+
+    /**
+     * An audit's stored payload
+     * @param {number} id - Summary id
+     * @returns {Promise<*>} The payload, or null if the audit is gone
+     */
+    function get(id) {
+        return _open().then(function(db) {
+            return _request(db.transaction('payloads').objectStore('payloads').get(id));
+        }).then(function(record) {
+            return record ? _decode(record) : null;
+        });
+    }
+
+    /**
+     * Save an audit, then drop the oldest beyond `keep`
+     * @param {Object} summary - History list entry; must have a numeric id
+     * @param {*} payload - Data loaded back with get()
+     * @param {number} keep - Number of audits to keep
+     * @returns {Promise}
+     */
+    function save(summary, payload, keep) {
+        return _open().then(function(db) {
+            return _put(db, summary, payload).then(function() {
+                return _summaries(db);
+            }).then(function(rows) {
+                var stale = rows.slice(keep);
+                if (stale.length === 0) return;
+                var tx = db.transaction(['summaries', 'payloads'], 'readwrite');
+                stale.forEach(function(row) {
+                    tx.objectStore('summaries').delete(row.id);
+                    tx.objectStore('payloads').delete(row.id);
+                });
+                return _done(tx);
+            });
+        });
+    }
+
+    /**
+     * Remove all saved audits
+     * @returns {Promise}
+     */
+    function clear() {
+        return _open().then(function(db) {
+            var tx = db.transaction(['summaries', 'payloads'], 'readwrite');
+            tx.objectStore('summaries').clear();
+            tx.objectStore('payloads').clear();
+            return _done(tx);
+        });
+    }
+
+    // Public API
+    return {
+        isAvailable: isAvailable,
+        list: list,
+        get: get,
+        save: save,
+        clear: clear
+    };
+})();
+
+window.ZenHistory = ZenHistory;
@@ -133,102 +133,9 @@ function clearAll() {
     document.getElementById('seoResults').classList.remove('active');
 }
 
-// SEO Score calculation helper
-function calculateSeoScore(result) {
-    var score = 100;
-    var warnings = result.warnings || [];
-    
-    // CRITICAL ISSUES - Major SEO impact
-    // Page accessibility & indexability (-20 points each)
-    if (result.status_code >= 400) score -= 20;
-    if (result.status_code >= 500) score -= 25;
-    if (result.robots && result.robots.includes('noindex')) score -= 20;
-    if (!result.https) score -= 15;
-    
-    // Missing essential meta tags (-12 points each)
-    if (!result.title) score -= 12;
-    if (!result.meta_description) score -= 12;
-    if (result.h1_count === 0) score -= 12;
-    
-    // HIGH PRIORITY ISSUES - Significant SEO impact
-    // Poor quality meta tags (-8 points each)
-    if (result.title && result.title_length < 30) score -= 8;
-    if (result.title && result.title_length > 60) score -= 8;
-    if (result.meta_description && result.meta_description_length < 120) score -= 8;
-    if (result.meta_description && result.meta_description_length > 160) score -= 8;
-    
-    // Content & structure issues (-7 points each)
-    if (result.h1_count > 1) score -= 7;
-    if (!result.canonical) score -= 7;
-    if (!result.has_viewport) score -= 7;
-    if (result.word_count < 300) score -= 7;
-    
-    // MEDIUM PRIORITY ISSUES - Moderate SEO impact
-    // Technical SEO (-5 points each)
-    if (!result.has_sitemap) score -= 5;
-    if (!result.has_robots_txt) score -= 4;
-    if (result.redirect_count > 0) score -= 4;
-    if (result.url_has_underscores) score -= 3;
-    
-    // Image optimization (scale with severity)
-    if (result.images_missing_alt > 0) {
-        var altPenalty = Math.min(10, Math.floor(result.images_missing_alt / 5) + 3);
-        score -= altPenalty;
-    }
-    if (result.images_no_dimensions > 10) {
-        score -= Math.min(7, Math.floor(result.images_no_dimensions / 10) + 2);
-    }
-    if (result.images_not_lazy > 10) {
-        score -= Math.min(6, Math.floor(result.images_not_lazy / 15) + 2);
-    }
-    
-    // Link issues
-    if (result.broken_links > 0) {
-        score -= Math.min(8, result.broken_links * 2);
-    }
-    
-    // LOW PRIORITY ISSUES - Minor SEO impact (-3 points each)
-    if (!result.has_lang) score -= 3;
-    if (!result.has_og_tags) score -= 3;
-    if (!result.has_schema) score -= 3;
-    if (!result.has_twitter_cards) score -= 2;
-    
-    // Performance issues
-    if (result.render_blocking_count > 20) {
-        score -= Math.min(8, Math.floor(result.render_blocking_count / 10));
-    }
-    if (result.response_time) {
-        var responseTime = parseFloat(result.response_time);
-        if (responseTime > 3) score -= 6;
-        else if (responseTime > 2) score -= 4;
-        else if (responseTime > 1) score -= 2;
-    }
-    if (result.page_size_kb > 2000) {
-        score -= Math.min(5, Math.floor((result.page_size_kb - 2000) / 500));
-    }
-    
-    return Math.max(0, Math.min(100, score));
-}
-
-function getScoreClass(score) {
-    if (score >= 90) return 'score-excellent';
-    if (score >= 70) return 'score-good';
-    if (score >= 50) return 'score-average';
-    if (score >= 30) return 'score-poor';
-    return 'score-critical';
-}
-
-function getScoreLabel(score) {
-    if (score >= 90) return 'Excellent';
-    if (score >= 70) return 'Good';
-    if (score >= 50) return 'Average';
-    if (score >= 30) return 'Poor';
-    return 'Critical';
-}
-
 function getSeverityClass(warning) {
     var highSeverity = ['Missing title', 'Missing H1', 'Missing meta description', 'Noindex set', 'Page Error', 'Missing viewport', 'Not using HTTPS', 'Broken internal links'];
-    var mediumSeverity = ['Title too long', 'Description too long', 'Multiple H1 tags', 'No canonical tag', 'No Open Graph', 'No structured data', 'No schema', 'Redirect chain', 'No robots.txt', 'No sitemap'];
+    var mediumSeverity = ['Title too long', 'Description too long', 'Multiple H1 tags', 'No canonical tag', 'No Open Graph', 'No structured data', 'No schema', 'Redirect chain', 'No robots.txt', 'No sitemap', 'Duplicate title', 'Duplicate meta description', 'Near-duplicate content'];
     
     if (highSeverity.some(function(h) { return warning.includes(h); })) return 'severity-high';
     if (mediumSeverity.some(function(m) { return warning.includes(m); })) return 'severity-medium';
@@ -248,10 +155,11 @@ function getIssuePriority(warning) {
 }
 
 // Executive Summary Generator
-function generateExecutiveSummary(results, avgScore, topWarnings, scoreDistribution) {
-    var total = results.length;
-    var excellentCount = scoreDistribution.excellent + scoreDistribution.good;
-    var poorCount = scoreDistribution.poor + scoreDistribution.critical;
+function generateExecutiveSummary(summary) {
+    var total = summary.total;
+    var avgScore = summary.avg_score;
+    var topWarnings = summary.top_warnings || [];
+    var poorCount = summary.distribution.poor + summary.distribution.critical;
     
     var summaryParts = [];
     
@@ -267,10 +175,7 @@ function generateExecutiveSummary(results, avgScore, topWarnings, scoreDistribut
     }
     
     // Page breakdown
-    summaryParts.push(' Audited <strong>' + total + ' pages</strong> across ' + Object.keys(results.reduce(function(acc, r) {
-        try { acc[new URL(r.url).hostname] = true; } catch(e) {}
-        return acc;
-    }, {})).length + ' domain(s).');
+    summaryParts.push(' Audited <strong>' + total + ' pages</strong> across ' + summary.site_count + ' domain(s).');
     
     // Top priorities
     if (topWarnings.length > 0) {
@@ -311,6 +216,7 @@ function openDetailedAudit(result) {
             var tag = document.createElement('span');
             tag.className = 'keyword-tag';
             tag.textContent = kw.keyword + ' (' + kw.count + ')';
+            if (typeof kw.score === 'number') tag.title = 'TF-IDF weight: ' + kw.score;
             topKeywordsDiv.appendChild(tag);
         });
     } else {
@@ -357,6 +263,17 @@ function openDetailedAudit(result) {
         brokenLinksSection.style.display = 'none';
     }
     
+    var pending = needsPageDetails(result);
+    populateDetailLists(result, pending);
+    if (pending) loadPageDetails(result);
+    
+    // Show modal
+    modal.classList.remove('hidden');
+    document.body.style.overflow = 'hidden';
+}
+
+// Image and render-blocking resource lists of the detail modal
+function populateDetailLists(result, pending) {
     // Populate Images
     var imagesDiv = document.getElementById('detailedImages');
     var imagesSummaryDiv = document.getElementById('imagesSummary');
@@ -420,7 +337,8 @@ function openDetailedAudit(result) {
     } else if (result.total_images > 0) {
         imagesSection.style.display = 'block';
         imagesSummaryDiv.innerHTML = '<p><strong>' + result.total_images + ' total images</strong></p>';
-        imagesDiv.innerHTML = '<p class="text-muted">Detailed image information not available for this audit.</p>';
+        imagesDiv.innerHTML = pending ? '<p class="text-muted">Loading image details...</p>' :
+            '<p class="text-muted">Detailed image information not available for this audit.</p>';
     } else {
         imagesSection.style.display = 'none';
     }
@@ -445,14 +363,31 @@ function openDetailedAudit(result) {
     } else if (result.render_blocking_count > 0) {
         renderBlockingSection.style.display = 'block';
         renderBlockingDiv.innerHTML = '<p><strong>' + result.render_blocking_count + ' render-blocking resources found</strong></p>' +
-            '<p class="text-muted">Detailed resource information not available for this audit.</p>';
+            (pending ? '<p class="text-muted">Loading resource details...</p>' :
+            '<p class="text-muted">Detailed resource information not available for this audit.</p>');
     } else {
         renderBlockingSection.style.display = 'none';
     }
-    
-    // Show modal
-    modal.classList.remove('hidden');
-    document.body.style.overflow = 'hidden';
+}
+
+// Summary-only audits leave the detail lists on the server
+function needsPageDetails(result) {
+    if (result.images_details || result.render_blocking_resources || !lastSeoJobId) return false;
+    return result.total_images > 0 || result.render_blocking_count > 0;
+}
+
+function loadPageDetails(result) {
+    fetch('/seo-audit/' + lastSeoJobId + '/page?url=' + encodeURIComponent(result.url))
+        .then(function(response) { return response.ok ? response.json() : null; })
+        .catch(function() { return null; })
+        .then(function(detail) {
+            if (detail) {
+                // Kept on the result, so reopening the page needs no request
+                result.images_details = detail.images_details;
+                result.render_blocking_resources = detail.render_blocking_resources;
+            }
+            if (currentAuditData === result) populateDetailLists(result, false);
+        });
 }
 
 function closeDetailedAudit() {
@@ -487,7 +422,11 @@ function getIssueFix(warning) {
         'No Open Graph': '📱 Add Open Graph meta tags for better social media sharing.',
         'No structured data': '🔍 Implement Schema.org structured data to enhance search results.',
         'URL too long': '💡 Keep URLs under 75 characters for better usability.',
-        'URL contains underscores': '💡 Replace underscores with hyphens in URLs (e.g., my-page instead of my_page).'
+        'URL contains underscores': '💡 Replace underscores with hyphens in URLs (e.g., my-page instead of my_page).',
+        'Duplicate title': '💡 Give every page a unique title that describes its own content.',
+        'Duplicate meta description': '💡 Write a distinct meta description for each page instead of reusing one.',
+        'Near-duplicate content': '💡 Merge near-identical pages, differentiate their content, or point them to one canonical URL.',
+        'Host unavailable': '🔌 The site stopped responding during the audit, so its remaining pages were skipped. Check the server and re-run the audit.'
     };
     
     for (var key in fixes) {
@@ -543,6 +482,8 @@ window.handleClearClick = handleClearClick;
 window.cancelCurrentOperation = cancelCurrentOperation;
 window.showToast = showToast;
 window.calculateSeoScore = calculateSeoScore;
+window.getPageScore = getPageScore;
+window.summarizeSeoResults = summarizeSeoResults;
 window.getScoreClass = getScoreClass;
 window.getSeverityClass = getSeverityClass;
 window.openDetailedAudit = openDetailedAudit;
@@ -0,0 +1,53 @@
+import threading
+from concurrent.futures import FIRST_COMPLETED, as_completed, wait
+
+from executor import FairExecutor
+
+
+def _queued_job(executor, count=3):
+    # One worker, held busy by another job, so the job's tasks stay queued
+    release = threading.Event()
+    executor.submit('busy', release.wait)
+    futures = [executor.submit('job', lambda: 'ran') for _ in range(count)]
+    return release, futures
+
+
+def _cancel_soon(executor, key, delay=0.2):
+    timer = threading.Timer(delay, executor.cancel, (key,))
+    timer.start()
+    return timer
+
+
+def test_cancel_wakes_wait():
+    executor = FairExecutor(max_workers=1)
+    release, futures = _queued_job(executor)
+    try:
+        timer = _cancel_soon(executor, 'job')
+        done, _ = wait(futures, timeout=2, return_when=FIRST_COMPLETED)
+        timer.join()
+        assert done
+        assert all(future.cancelled() for future in futures)
+    finally:
+        release.set()
+
+
+def test_cancel_wakes_as_completed():
+    executor = FairExecutor(max_workers=1)
+    release, futures = _queued_job(executor)
+    try:
+        timer = _cancel_soon(executor, 'job')
+        finished = list(as_completed(futures, timeout=2))
+        timer.join()
+        assert len(finished) == len(futures)
+    finally:
+        release.set()
+
+
+def test_cancel_leaves_other_jobs_running():
+    executor = FairExecutor(max_workers=1)
+    release, futures = _queued_job(executor)
+    other = executor.submit('other', lambda: 'ran')
+    assert executor.cancel('job') == len(futures)
+    release.set()
+    assert other.result(timeout=2) == 'ran'
+    assert executor.queued() == 0
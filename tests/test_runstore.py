@@ -0,0 +1,44 @@
+from runstore import SQLiteRunStore, diff_runs
+
+
+def _page(url, warnings, score=80):
+    return {'url': url, 'seo_score': score, 'status_code': 200, 'response_time': '0.5s', 'warnings': warnings}
+
+
+def _diff(tmp_path, base_pages, head_pages):
+    store = SQLiteRunStore(str(tmp_path / 'runs.db'))
+    store.save_run('base', [], {'results': base_pages})
+    store.save_run('head', [], {'results': head_pages})
+    return list(diff_runs(store, 'base', 'head'))
+
+
+def test_warning_order_is_not_a_change(tmp_path):
+    records = _diff(
+        tmp_path,
+        [_page('https://example.com/', ['Duplicate title', 'Missing H1'])],
+        [_page('https://example.com/', ['Missing H1', 'Duplicate title'])],
+    )
+    assert [record['type'] for record in records] == ['summary']
+    assert records[-1]['unchanged'] == 1
+
+
+def test_old_unsorted_rows_compare_as_sets(tmp_path):
+    store = SQLiteRunStore(str(tmp_path / 'runs.db'))
+    store.save_run('base', [], {'results': [_page('https://example.com/', ['b', 'a'])]})
+    store.save_run('head', [], {'results': [_page('https://example.com/', ['a', 'b'])]})
+    # A row written before warnings were stored sorted
+    store._db().execute("UPDATE pages SET warnings = ? WHERE run_id = 'base'", ('b\na',))
+    records = list(diff_runs(store, 'base', 'head'))
+    assert records[-1]['changed'] == 0
+
+
+def test_warning_changes_are_reported(tmp_path):
+    records = _diff(
+        tmp_path,
+        [_page('https://example.com/', ['Missing H1', 'No canonical tag'])],
+        [_page('https://example.com/', ['Missing H1', 'Thin content'])],
+    )
+    changed = records[0]
+    assert changed['type'] == 'changed'
+    assert changed['warnings_added'] == ['Thin content']
+    assert changed['warnings_resolved'] == ['No canonical tag']
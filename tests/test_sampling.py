@@ -0,0 +1,37 @@
+from sampling import SitemapSampler
+
+
+def _fill(sampler, sitemaps=3, prefixes=10, pages=5):
+    for sitemap in range(sitemaps):
+        for prefix in range(prefixes):
+            for page in range(pages):
+                sampler.add(f'https://example.com/s{sitemap}p{prefix}/{page}', f'https://example.com/sitemap-{sitemap}.xml')
+
+
+def test_overflow_prefixes_fold_per_sitemap():
+    sampler = SitemapSampler(sample_size=50, max_strata=4, seed=1)
+    _fill(sampler)
+    prefixes = [key for key in sampler.strata if key[1] != '*']
+    overflow = [key for key in sampler.strata if key[1] == '*']
+    assert len(prefixes) == 4
+    # Each sitemap keeps its own overflow stratum instead of one shared ('*', '*')
+    assert sorted(sitemap for sitemap, _ in overflow) == [f'https://example.com/sitemap-{n}.xml' for n in range(3)]
+    assert ('*', '*') not in sampler.strata
+    assert sum(stratum['seen'] for stratum in sampler.strata.values()) == sampler.population == 150
+
+
+def test_overflow_strata_are_bounded():
+    sampler = SitemapSampler(sample_size=50, max_strata=2, seed=1)
+    _fill(sampler, sitemaps=5)
+    overflow = [key for key in sampler.strata if key[1] == '*' and key[0] != '*']
+    assert len(overflow) == 2
+    assert ('*', '*') in sampler.strata
+    assert len(sampler.strata) == 2 + 2 + 1
+
+
+def test_draw_covers_every_stratum():
+    sampler = SitemapSampler(sample_size=40, max_strata=4, seed=2)
+    _fill(sampler)
+    sample = sampler.draw()
+    assert len(sample.urls) == 40
+    assert all(urls for _, urls in sample.strata.values())
@@ -0,0 +1,151 @@
+import types
+
+import pytest
+
+requests = pytest.importorskip('requests')
+
+import transport
+
+
+class FakeHTTPError(Exception):
+    pass
+
+
+class FakeTimeout(FakeHTTPError):
+    pass
+
+
+class FakeNetworkError(FakeHTTPError):
+    pass
+
+
+class FakeConnectError(FakeNetworkError):
+    pass
+
+
+class FakeProtocolError(FakeHTTPError):
+    pass
+
+
+class FakeInvalidURL(Exception):
+    pass
+
+
+# The parts of the httpx API transport.py uses
+fake_httpx = types.SimpleNamespace(
+    HTTPError=FakeHTTPError,
+    TimeoutException=FakeTimeout,
+    NetworkError=FakeNetworkError,
+    ConnectError=FakeConnectError,
+    InvalidURL=FakeInvalidURL,
+)
+
+
+class _Url:
+    def __init__(self, url):
+        self.url = url
+
+    def __str__(self):
+        return self.url
+
+
+class FakeResponse:
+    def __init__(self, url):
+        self.url = _Url(url)
+        self.status_code = 200
+        self.headers = {'content-type': 'text/html'}
+        self.http_version = 'HTTP/2'
+        self.text = '<html></html>'
+        self.content = b'<html></html>'
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    """Stands in for httpx.Client: raises `error` if set, else answers 200."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.sent = []
+
+    def build_request(self, method, url, headers=None, timeout=None):
+        return (method, url)
+
+    def send(self, request, follow_redirects=True, stream=False):
+        self.sent.append(request)
+        if self.error is not None:
+            raise self.error
+        return FakeResponse(request[1])
+
+
+@pytest.fixture
+def http2(monkeypatch):
+    """HTTP/2 enabled with a stub client; HTTP/1.1 calls are recorded instead of sent."""
+    client = FakeClient()
+    http1_calls = []
+
+    def fake_http1(method, url, timeout, headers, allow_redirects, stream):
+        http1_calls.append((method, url))
+        return 'http1-response'
+
+    monkeypatch.setattr(transport, 'httpx', fake_httpx)
+    monkeypatch.setattr(transport, 'HTTP2_ENABLED', True)
+    monkeypatch.setattr(transport, '_client', client)
+    monkeypatch.setattr(transport, '_fetch_http1', fake_http1)
+    return client, http1_calls
+
+
+def test_http2_response_is_adapted(http2):
+    client, http1_calls = http2
+    response = transport.fetch('GET', 'https://example.com/')
+    assert response.url == 'https://example.com/'
+    assert response.status_code == 200
+    assert response.http_version == 'HTTP/2'
+    assert response.text == '<html></html>'
+    with response:
+        pass
+    assert response._response.closed
+    assert not http1_calls
+
+
+def test_timeout_maps_to_requests_timeout(http2):
+    client, http1_calls = http2
+    client.error = FakeTimeout('read timed out')
+    with pytest.raises(requests.exceptions.Timeout):
+        transport.fetch('GET', 'https://example.com/')
+    assert not http1_calls
+
+
+@pytest.mark.parametrize('error', [FakeConnectError('refused'), FakeNetworkError('reset')])
+def test_network_errors_map_to_requests_connection_error(http2, error):
+    client, http1_calls = http2
+    client.error = error
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.fetch('GET', 'https://example.com/')
+    assert not http1_calls
+
+
+@pytest.mark.parametrize('error', [FakeProtocolError('bad frame'), FakeInvalidURL('bad redirect')])
+def test_other_httpx_errors_fall_back_to_http1(http2, error):
+    client, http1_calls = http2
+    client.error = error
+    assert transport.fetch('HEAD', 'https://example.com/') == 'http1-response'
+    assert http1_calls == [('HEAD', 'https://example.com/')]
+
+
+def test_http1_only_without_http2(monkeypatch):
+    calls = []
+    monkeypatch.setattr(transport, 'HTTP2_ENABLED', False)
+    monkeypatch.setattr(transport, '_fetch_http1', lambda *args: calls.append(args) or 'http1-response')
+    assert transport.fetch('GET', 'https://example.com/') == 'http1-response'
+    assert len(calls) == 1
+
+
+def test_http1_reports_protocol_version(monkeypatch):
+    response = types.SimpleNamespace(raw=types.SimpleNamespace(version=10))
+    monkeypatch.setattr(transport.requests, 'request', lambda *args, **kwargs: response)
+    assert transport._fetch_http1('GET', 'https://example.com/', 10, None, True, False).http_version == 'HTTP/1.0'
+    response.raw.version = None
+    assert transport._fetch_http1('GET', 'https://example.com/', 10, None, True, False).http_version == 'HTTP/1.1'
@@ -0,0 +1,120 @@
+"""
+ZenStatus - HTTP Transport
+==========================
+Page, link-check and asset requests of the audit engine.
+
+When httpx is installed with HTTP/2 support (pip install "httpx[http2]"),
+requests go through one shared client that speaks HTTP/2 where the server
+offers it, so the many requests of a sitemap audit are multiplexed over a
+few connections per origin instead of queueing behind HTTP/1.1's
+per-host connection cap. Servers without HTTP/2 are negotiated down to
+HTTP/1.1 on the same client, and without httpx everything goes through
+`requests` as before. Set ZENSTATUS_HTTP2=0 to force `requests`.
+
+fetch() returns a response with the attributes the engine uses (url,
+status_code, headers, text, content, http_version) and raises `requests`
+exceptions on either transport, so callers handle errors the same way.
+"""
+
+import importlib.util
+import os
+import threading
+
+import requests
+
+try:
+    import httpx
+except ImportError:  # Optional: HTTP/1.1 through requests only
+    httpx = None
+
+
+# Connections kept open across all origins by the HTTP/2 client
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE = 40
+
+HTTP2_ENABLED = (
+    httpx is not None
+    and importlib.util.find_spec('h2') is not None
+    and os.environ.get('ZENSTATUS_HTTP2', '1') != '0'
+)
+
+_client = None
+_client_lock = threading.Lock()
+
+_REQUESTS_VERSIONS = {10: 'HTTP/1.0', 11: 'HTTP/1.1'}
+
+
+def _http2_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE)
+                )
+    return _client
+
+
+class _HTTPXResponse:
+    """An httpx response with requests-style `url` (a str) and context-manager close."""
+
+    def __init__(self, response):
+        self._response = response
+        self.url = str(response.url)
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.http_version = response.http_version
+
+    @property
+    def text(self):
+        return self._response.text
+
+    @property
+    def content(self):
+        return self._response.content
+
+    def close(self):
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _fetch_http2(method, url, timeout, headers, allow_redirects, stream):
+    client = _http2_client()
+    try:
+        request = client.build_request(method, url, headers=headers, timeout=timeout)
+        response = client.send(request, follow_redirects=allow_redirects, stream=stream)
+    except httpx.TimeoutException as exc:
+        raise requests.exceptions.Timeout(str(exc)) from exc
+    except (httpx.ConnectError, httpx.NetworkError) as exc:
+        raise requests.exceptions.ConnectionError(str(exc)) from exc
+    return _HTTPXResponse(response)
+
+
+def _fetch_http1(method, url, timeout, headers, allow_redirects, stream):
+    response = requests.request(method, url, timeout=timeout, headers=headers,
+                                allow_redirects=allow_redirects, stream=stream)
+    raw_version = getattr(response.raw, 'version', None)
+    response.http_version = _REQUESTS_VERSIONS.get(raw_version, 'HTTP/1.1')
+    return response
+
+
+def fetch(method, url, timeout=10, headers=None, allow_redirects=True, stream=False):
+    """
+    Send one request over HTTP/2 when available, else HTTP/1.1. With stream,
+    the body is not read; use the response as a context manager to release
+    the connection.
+    """
+    if HTTP2_ENABLED:
+        try:
+            return _fetch_http2(method, url, timeout, headers, allow_redirects, stream)
+        except (httpx.HTTPError, httpx.InvalidURL):
+            # Protocol errors, bad redirects etc.: retry the request over plain HTTP/1.1
+            pass
+    return _fetch_http1(method, url, timeout, headers, allow_redirects, stream)
@@ -0,0 +1,76 @@
+"""
+ZenStatus - Audit Worker
+========================
+Audits work units from the shared queue (see workqueue.py).
+
+Start any number of these, on this machine or others that can reach the
+queue; each leases a unit, audits its URLs and reports the raw results
+back to the job's owner:
+
+    ZENSTATUS_QUEUE=sqlite:////var/lib/zenstatus/queue.db python worker.py
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+
+from auditor import JOB_CONCURRENCY, audit_pages, local_jobs
+from workqueue import open_work_queue
+
+
+def worker_name(job_id=None):
+    """
+    Lease owner name: host and process, plus the job for units audited by a
+    job's own process (several jobs of one web process lease side by side).
+    """
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{name}:{job_id}" if job_id else name
+
+
+def process_unit(queue, worker_id, concurrency=JOB_CONCURRENCY):
+    """Lease and audit one unit; returns False if the queue had nothing to do."""
+    unit = queue.lease(worker_id)
+    if unit is None:
+        return False
+    unit_id, job_id, urls, details = unit
+    remaining = list(reversed(urls))
+
+    def next_urls(count):
+        return [remaining.pop() for _ in range(min(count, len(remaining)))]
+
+    # Pages run under the job's executor key, and stop with the job when it
+    # lives in this process, so AuditJob.cancel() reaches them
+    job = local_jobs.get(job_id)
+    cancelled = job.cancelled if job is not None else None
+    results = list(audit_pages(next_urls, job_id, cancelled, concurrency, details))
+    queue.complete(unit_id, worker_id, results)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='zenstatus-worker', description='Audit work units from a shared queue.')
+    parser.add_argument('--queue', help='queue URL (default: $ZENSTATUS_QUEUE)')
+    parser.add_argument('--threads', type=int, default=JOB_CONCURRENCY, help='pages in flight at most (each host is further limited adaptively)')
+    parser.add_argument('--once', action='store_true', help='exit when the queue is empty')
+    args = parser.parse_args(argv)
+
+    try:
+        queue = open_work_queue(args.queue)
+    except ValueError as e:
+        parser.error(str(e))
+    if queue is None:
+        parser.error('no queue configured (use --queue or ZENSTATUS_QUEUE)')
+    worker_id = worker_name()
+    print(f"Worker {worker_id} waiting for work", file=sys.stderr)
+    while True:
+        if process_unit(queue, worker_id, max(1, args.threads)):
+            continue
+        if args.once:
+            return 0
+        time.sleep(1.0)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
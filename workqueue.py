@@ -0,0 +1,254 @@
+"""
+ZenStatus - Work Queue
+======================
+Sharded audit execution across worker processes and machines.
+
+A job's URLs are split into work units on a shared queue. Workers (see
+worker.py) lease a unit, audit its pages and report the raw results back;
+the process that owns the job folds them in as they arrive. Leases expire,
+so units held by a worker that died are handed out again.
+
+Backends are chosen with a queue URL (ZENSTATUS_QUEUE), e.g.
+sqlite:////var/lib/zenstatus/queue.db. SQLite (WAL mode) covers several
+processes on one machine or nodes sharing a filesystem; other backends
+register a class in QUEUE_BACKENDS implementing the WorkQueue methods.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+
+# Seconds a worker may hold a unit before it is handed to another worker
+LEASE_SECONDS = 600
+# Leases per unit before it is given up on
+MAX_ATTEMPTS = 3
+UNIT_SIZE = 25
+# Units queued ahead of the workers per job (keeps crawl mode discovering links)
+MAX_QUEUED_UNITS = 8
+POLL_INTERVAL = 0.5
+
+
+class WorkQueue(ABC):
+    """Interface of a work queue backend."""
+
+    @abstractmethod
+    def enqueue(self, job_id, urls, details=True):
+        """Add a unit of URLs for a job (details: audit_website()'s flag); returns the unit ID."""
+
+    @abstractmethod
+    def lease(self, worker_id, lease_seconds=LEASE_SECONDS):
+        """Lease the next available unit as (unit_id, job_id, urls, details), or None."""
+
+    @abstractmethod
+    def complete(self, unit_id, worker_id, results):
+        """Store a unit's results and mark it done; False if the lease was lost."""
+
+    @abstractmethod
+    def fetch_results(self, job_id, cursor=0, limit=500):
+        """Results stored after `cursor`: returns (results, new_cursor)."""
+
+    @abstractmethod
+    def open_units(self, job_id):
+        """Number of the job's units not yet done or given up."""
+
+    @abstractmethod
+    def drop_job(self, job_id):
+        """Remove a job's units and results."""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Work queue in a SQLite database file (one connection per thread)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self._db().executescript("""
+            CREATE TABLE IF NOT EXISTS units (
+                unit_id TEXT PRIMARY KEY,
+                job_id TEXT NOT NULL,
+                urls TEXT NOT NULL,
+                details INTEGER NOT NULL DEFAULT 1,
+                status TEXT NOT NULL DEFAULT 'pending',
+                owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS units_status ON units (status, created);
+            CREATE INDEX IF NOT EXISTS units_job ON units (job_id, status);
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                unit_id TEXT NOT NULL,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS results_job ON results (job_id, id);
+        """)
+        # Queues created before units carried the details flag
+        columns = {row[1] for row in self._db().execute('PRAGMA table_info(units)')}
+        if 'details' not in columns:
+            self._db().execute('ALTER TABLE units ADD COLUMN details INTEGER NOT NULL DEFAULT 1')
+
+    def _db(self):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self.local.db = db
+        return db
+
+    def _connect(self):
+        return _Transaction(self._db())
+
+    def enqueue(self, job_id, urls, details=True):
+        unit_id = uuid.uuid4().hex
+        with self._connect() as db:
+            db.execute(
+                'INSERT INTO units (unit_id, job_id, urls, details, created) VALUES (?, ?, ?, ?, ?)',
+                (unit_id, job_id, json.dumps(list(urls)), int(bool(details)), time.time())
+            )
+        return unit_id
+
+    def lease(self, worker_id, lease_seconds=LEASE_SECONDS):
+        now = time.time()
+        with self._connect() as db:
+            # Units whose lease ran out too often are given up on
+            db.execute(
+                "UPDATE units SET status = 'failed' WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, MAX_ATTEMPTS)
+            )
+            row = db.execute(
+                "SELECT unit_id, job_id, urls, details FROM units "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY created LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE units SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE unit_id = ?",
+                (worker_id, now + lease_seconds, row[0])
+            )
+        return row[0], row[1], json.loads(row[2]), bool(row[3])
+
+    def complete(self, unit_id, worker_id, results):
+        with self._connect() as db:
+            updated = db.execute(
+                "UPDATE units SET status = 'done' WHERE unit_id = ? AND owner = ? AND status = 'leased'",
+                (unit_id, worker_id)
+            ).rowcount
+            if not updated:
+                return False
+            job_id = db.execute('SELECT job_id FROM units WHERE unit_id = ?', (unit_id,)).fetchone()[0]
+            db.executemany(
+                'INSERT INTO results (job_id, unit_id, payload) VALUES (?, ?, ?)',
+                [(job_id, unit_id, json.dumps(result)) for result in results]
+            )
+        return True
+
+    def fetch_results(self, job_id, cursor=0, limit=500):
+        with self._connect() as db:
+            rows = db.execute(
+                'SELECT id, payload FROM results WHERE job_id = ? AND id > ? ORDER BY id LIMIT ?',
+                (job_id, cursor, limit)
+            ).fetchall()
+        if not rows:
+            return [], cursor
+        return [json.loads(payload) for _, payload in rows], rows[-1][0]
+
+    def open_units(self, job_id):
+        with self._connect() as db:
+            return db.execute(
+                "SELECT COUNT(*) FROM units WHERE job_id = ? AND status IN ('pending', 'leased')",
+                (job_id,)
+            ).fetchone()[0]
+
+    def drop_job(self, job_id):
+        with self._connect() as db:
+            db.execute('DELETE FROM units WHERE job_id = ?', (job_id,))
+            db.execute('DELETE FROM results WHERE job_id = ?', (job_id,))
+
+
+class _Transaction:
+    """Context manager running a block in one IMMEDIATE transaction."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE')
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+QUEUE_BACKENDS = {
+    'sqlite': SQLiteWorkQueue,
+}
+
+
+def open_work_queue(url=None):
+    """
+    Work queue for a queue URL (default: the ZENSTATUS_QUEUE environment
+    variable); None when sharded execution is not configured.
+    """
+    url = url or os.environ.get('ZENSTATUS_QUEUE')
+    if not url:
+        return None
+    scheme, sep, location = url.partition('://')
+    if not sep or scheme not in QUEUE_BACKENDS:
+        raise ValueError(f"Unsupported work queue URL: {url}")
+    if scheme == 'sqlite' and location.startswith('/'):
+        # sqlite:///relative.db or sqlite:////absolute/path.db
+        location = location[1:]
+    return QUEUE_BACKENDS[scheme](location)
+
+
+def run_sharded_job(job, queue, unit_size=UNIT_SIZE, local_worker=None, poll_interval=POLL_INTERVAL):
+    """
+    Drive an AuditJob through the work queue: its URLs (or crawl frontier)
+    are enqueued a few units ahead of the workers, and results are folded
+    into the job as workers report them. Yields each result, or None while
+    waiting so callers can send keep-alives.
+
+    local_worker(queue) is called when no results are waiting; it may audit
+    a unit itself (returning True), so the job progresses with no workers.
+    """
+    cursor = 0
+    try:
+        while True:
+            open_units = queue.open_units(job.id)
+            while open_units < MAX_QUEUED_UNITS:
+                batch = job.next_batch(unit_size)
+                if not batch:
+                    break
+                queue.enqueue(job.id, batch, job.details)
+                open_units += 1
+
+            results, cursor = queue.fetch_results(job.id, cursor)
+            for result in results:
+                yield job.add(result)
+            if results:
+                continue
+            if not open_units:
+                # Units are marked done in the same transaction that stores their results
+                results, cursor = queue.fetch_results(job.id, cursor)
+                if not results:
+                    break
+                for result in results:
+                    yield job.add(result)
+                continue
+            if local_worker is None or not local_worker(queue):
+                yield None
+                time.sleep(poll_interval)
+    finally:
+        queue.drop_job(job.id)